@@ -0,0 +1,123 @@
+"""
+Compares the database part of the lesson flow on the supported backends.
+
+Every flow is one user passing one lesson: loading the profile, finding the next lesson, loading it with
+questions and saving the result, each step in its own session like in the API. Flows run concurrently,
+so the numbers show how the backend copes with parallel writers.
+
+Backends:
+    sqlite-default - SQLite with its default rollback journal and no busy timeout
+    sqlite-tuned   - SQLite with the configured pragmas (WAL, synchronous=NORMAL, busy_timeout, mmap)
+    postgresql     - only when BENCH_POSTGRES_URL is set. Its tables are DROPPED and recreated!
+
+Usage: python -m benchmarks.db_backends [--users 200] [--concurrency 20] [--lessons 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from src.database.engine import create_engine, sqlite_pragmas
+from src.database.models import Base, PLanguageModel, LessonModel, QuestionModel, AnswerModel, UserModel
+from src.repository import LessonsRepository
+
+SQLITE_DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'busy_timeout': 0, 'mmap_size': 0}
+
+
+async def prepare(engine: AsyncEngine, users: int, lessons: int, questions: int = 10) -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(engine) as session:
+        session.add(PLanguageModel(language_id=1, name='Python'))
+        for lesson_id in range(1, lessons + 1):
+            session.add(LessonModel(
+                lesson_id=lesson_id,
+                title=f'Lesson {lesson_id}',
+                description='',
+                language_id=1,
+                questions=[
+                    QuestionModel(
+                        question_text=f'Question {number}',
+                        answers=[AnswerModel(answer_text=f'Answer {answer}', is_correct=int(answer == 0)) for answer in range(4)]
+                    )
+                    for number in range(questions)
+                ]
+            ))
+        session.add_all(
+            UserModel(user_id=user_id, first_name=f'User {user_id}', timezone='UTC', active_language_id=1)
+            for user_id in range(1, users + 1)
+        )
+        await session.commit()
+
+
+async def lesson_flow(session_factory: async_sessionmaker, user_id: int) -> None:
+    async with session_factory() as session:
+        await LessonsRepository(session).get_user_with_language(user_id)
+    async with session_factory() as session:
+        lesson = await LessonsRepository(session).get_unfinished_lesson_with_tests(user_id, 1)
+    async with session_factory() as session:
+        await LessonsRepository(session).get_lesson_by_id(lesson.lesson_id)
+    async with session_factory() as session:
+        await LessonsRepository(session).save_user_progress(user_id, lesson.lesson_id, 100, 100)
+
+
+async def run_backend(engine: AsyncEngine, users: int, concurrency: int, lessons: int) -> dict:
+    await prepare(engine, users, lessons)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], {}
+
+    async def timed_flow(user_id: int):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await lesson_flow(session_factory, user_id)
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed_flow(user_id) for user_id in range(1, users + 1)))
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+
+    latencies.sort()
+    return {
+        'flows/s': len(latencies) / elapsed,
+        'p50 ms': statistics.median(latencies) * 1000 if latencies else 0,
+        'p95 ms': latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0,
+        'failed': sum(errors.values()),
+        'errors': errors,
+    }
+
+
+async def main(users: int, concurrency: int, lessons: int):
+    with tempfile.TemporaryDirectory() as directory:
+        backends = {
+            'sqlite-default': create_engine(f'sqlite+aiosqlite:///{directory}/default.db', pragmas=SQLITE_DEFAULT_PRAGMAS),
+            'sqlite-tuned': create_engine(f'sqlite+aiosqlite:///{directory}/tuned.db', pragmas=sqlite_pragmas()),
+        }
+        if os.getenv('BENCH_POSTGRES_URL'):
+            backends['postgresql'] = create_engine(os.getenv('BENCH_POSTGRES_URL'))
+
+        print(f'{users} flows, concurrency {concurrency}, {lessons} lessons')
+        print(f"{'backend':<16}{'flows/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'failed':>8}")
+        for name, engine in backends.items():
+            result = await run_backend(engine, users, concurrency, lessons)
+            print(f"{name:<16}{result['flows/s']:>10.1f}{result['p50 ms']:>10.1f}{result['p95 ms']:>10.1f}{result['failed']:>8}"
+                  + (f"  {result['errors']}" if result['errors'] else ''))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Lesson flow benchmark per database backend')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--lessons', type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.concurrency, args.lessons))
@@ -0,0 +1,143 @@
+"""
+Microbenchmarks of the CPU-bound code run on every request: mappers, response schemas, ServiceResult
+and the encoding of cached values, on lessons with 10, 100 and 1000 questions.
+
+Every case reports the best time per call out of --repeat runs. Results can be saved as JSON and later runs
+compared with them: a case slower than the baseline by more than --threshold fails the run (exit code 1).
+Cases faster than --min-duration are dominated by timer and interpreter noise, their changes are only reported.
+Compare only runs made on the same machine.
+
+Usage:
+    python -m benchmarks.hot_paths [--sizes 10 100 1000] [--output baseline.json]
+    python -m benchmarks.hot_paths --baseline baseline.json [--threshold 0.3] [--min-duration 2] [--filter mapper]
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+import timeit
+from typing import Callable
+
+from benchmarks.redis_codecs import make_lesson
+from src.cache import encode_value, decode_value
+from src.schemas.tests_schemas import LessonResultResponse
+from src.services import LessonsService, ServiceResult
+from src.services.mappers import LessonsMapper, UserMapper
+
+PROFILE = {
+    'user_id': 42, 'first_name': 'Test', 'streak': 3, 'xp': 1200, 'timezone': 'Europe/Kyiv',
+    'last_lesson_date': None, 'active_language_id': 1, 'active_language_name': 'Python',
+}
+
+
+def lesson_cases(questions: int) -> dict[str, Callable[[], object]]:
+    lesson = make_lesson(questions)
+    correct_answers = LessonsService._get_correct_answers(lesson)
+    lesson_data = LessonsMapper.to_lesson_cache(lesson, correct_answers)
+    encoded = encode_value(lesson_data)
+    stored = encoded.decode() if isinstance(encoded, bytes) else encoded
+    questions_json = lesson_data['questions_json'].encode()
+    questions_msgpack = LessonsMapper.to_questions_msgpack(questions_json)
+
+    return {
+        'LessonsService._get_correct_answers': lambda: LessonsService._get_correct_answers(lesson),
+        'LessonsMapper.to_lesson_cache': lambda: LessonsMapper.to_lesson_cache(lesson, correct_answers),
+        'LessonsMapper.to_start_lesson_response_raw': lambda: LessonsMapper.to_start_lesson_response_raw('4242', questions_json),
+        'LessonsMapper.to_start_lesson_response_msgpack': lambda: LessonsMapper.to_start_lesson_response_msgpack('4242', questions_msgpack),
+        'LessonsMapper.to_questions_msgpack': lambda: LessonsMapper.to_questions_msgpack(questions_json),
+        'encode_value(lesson)': lambda: encode_value(lesson_data),
+        'decode_value(lesson)': lambda: decode_value(stored),
+    }
+
+
+def common_cases() -> dict[str, Callable[[], object]]:
+    result = LessonResultResponse(xp_earned=200, success_percent=100)
+    stored_result = encode_value({'xp_earned': 200, 'success_percent': 100})
+    stored_result = stored_result.decode() if isinstance(stored_result, bytes) else stored_result
+
+    return {
+        'UserMapper.to_user_cache_auth_response': lambda: UserMapper.to_user_cache_auth_response(PROFILE, True),
+        'ServiceResult.success': lambda: ServiceResult.success(result),
+        'ServiceResult.success_raw': lambda: ServiceResult.success_raw(b'{}'),
+        'LessonsMapper.to_lesson_result_response': lambda: LessonsMapper.to_lesson_result_response(xp_earned=200, success_percent=100),
+        'encode_value(lesson_result)': lambda: encode_value({'xp_earned': 200, 'success_percent': 100}),
+        'decode_value(lesson_result)': lambda: decode_value(stored_result),
+    }
+
+
+def all_cases(sizes: list[int]) -> dict[str, Callable[[], object]]:
+    cases = common_cases()
+    for questions in sizes:
+        cases.update({f'{name}[{questions}]': case for name, case in lesson_cases(questions).items()})
+    return cases
+
+
+def measure(case: Callable[[], object], repeat: int) -> float:
+    """
+    Returns the best seconds per call. Every run lasts at least 0.2 s.
+    """
+    timer = timeit.Timer(case)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float, min_duration: float = 0) -> list[str]:
+    """
+    Prints the results next to the baseline and returns the cases slower than it by more than the threshold,
+    of the cases taking at least `min_duration` seconds per call in the baseline.
+    """
+    regressions = []
+    print(f"{'case':<58}{'us/call':>11}{'baseline':>11}{'change':>9}")
+    for name, seconds in results.items():
+        line = f'{name:<58}{seconds * 1_000_000:>11.2f}'
+        if name in baseline:
+            change = seconds / baseline[name] - 1
+            line += f'{baseline[name] * 1_000_000:>11.2f}{change:>+9.0%}'
+            if change > threshold:
+                if baseline[name] >= min_duration:
+                    regressions.append(name)
+                    line += '  REGRESSION'
+                else:
+                    line += '  (too fast to compare)'
+        print(line)
+    return regressions
+
+
+def main(args: argparse.Namespace) -> int:
+    # sampled events of the measured code must not log
+    logging.disable(logging.CRITICAL)
+    cases = {name: case for name, case in all_cases(args.sizes).items() if not args.filter or args.filter in name}
+    results = {name: measure(case, args.repeat) for name, case in cases.items()}
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+    regressions = compare(results, baseline, args.threshold, args.min_duration / 1_000_000)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'results': results,
+            }, file, indent=2)
+    if regressions:
+        print(f'{len(regressions)} cases slower than the baseline by more than {args.threshold:.0%}: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Hot path microbenchmarks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='questions per lesson')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', help='run only the cases containing this text')
+    parser.add_argument('--output', help='save the results as JSON, e.g. to use as a baseline')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare with')
+    # run to run noise of the fast cases reaches 20% even on an idle machine
+    parser.add_argument('--threshold', type=float, default=0.3, help='allowed slowdown against the baseline')
+    parser.add_argument('--min-duration', type=float, default=2,
+                        help='microseconds per call below which a slowdown does not fail the run')
+    sys.exit(main(parser.parse_args()))
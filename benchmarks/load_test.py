@@ -0,0 +1,185 @@
+"""
+Load test of the lesson flow with virtual users.
+
+Every virtual user goes through the flow of a new Telegram user, answering questions in random order
+until each is solved. The server must not verify Telegram initData (AUTH_INSECURE_DEV=true) nor rate limit
+(RATE_LIMITS_ENABLED=false), virtual users answer without pauses and share one address:
+    POST /user/auth -> PATCH /user/{user_id}/change-language (users without a language) ->
+    GET /lessons/actual-lesson/{user_id} -> POST /lessons/start -> POST /lessons/check per answer ->
+    GET /lessons/result/{session_id}
+
+Targets:
+    in-process (default) - the app over the ASGI transport with a fake Redis and a temporary SQLite database,
+                           or the database of --database-url. Its tables are DROPPED and recreated!
+    --url                - a running server. It must have lessons of --language-id, users are created from --first-user-id
+
+Usage: python -m benchmarks.load_test [--users 200] [--concurrency 20] [--lessons 20] [--questions 10]
+                                      [--database-url URL | --url http://127.0.0.1:8000]
+"""
+import argparse
+import asyncio
+import logging
+import math
+import os
+import random
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fakeredis.aioredis import FakeRedis
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from benchmarks.db_backends import prepare
+from src.cache import CircuitBreakerRedis
+from src.cache.lesson_cache import clear_local_caches
+from src.database.engine import create_engine
+
+
+class FakeBreakerRedis(CircuitBreakerRedis, FakeRedis):
+    """
+    In-process fake Redis behind the same circuit breaker as the real client.
+    """
+
+
+class FlowError(Exception):
+    pass
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+
+    def record(self, route: str, seconds: float, ok: bool) -> None:
+        self.latencies.setdefault(route, []).append(seconds)
+        if not ok:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """
+    Nearest-rank percentile of already sorted values.
+    """
+    return sorted_values[max(0, math.ceil(percent / 100 * len(sorted_values)) - 1)]
+
+
+async def call(client: AsyncClient, stats: RouteStats, route: str, method: str, url: str, **kwargs) -> dict:
+    start = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    stats.record(route, time.perf_counter() - start, response.is_success)
+    if not response.is_success:
+        raise FlowError(f'{route}: {response.status_code} {response.text[:200]}')
+    return response.json()
+
+
+async def virtual_user(client: AsyncClient, stats: RouteStats, user_id: int, language_id: int, rng: random.Random) -> None:
+    auth = await call(client, stats, 'POST /user/auth', 'POST', '/api/user/auth',
+                      json={'user_id': user_id, 'first_name': f'Load {user_id}'})
+    headers = {'Authorization': f"Bearer {auth['access_token']}"}
+    if not auth['user']['active_language']:
+        await call(client, stats, 'PATCH /user/{user_id}/change-language', 'PATCH', f'/api/user/{user_id}/change-language',
+                   json={'language_id': language_id}, headers=headers)
+    lesson = await call(client, stats, 'GET /lessons/actual-lesson/{user_id}', 'GET', f'/api/lessons/actual-lesson/{user_id}',
+                        headers=headers)
+    started = await call(client, stats, 'POST /lessons/start', 'POST', '/api/lessons/start',
+                         json={'user_id': user_id, 'lesson_id': lesson['lesson_id']}, headers=headers)
+
+    session_id = started['session_id']
+    for question in started['questions']:
+        answers = [answer['answer_id'] for answer in question['answers']]
+        rng.shuffle(answers)
+        for answer_id in answers:
+            checked = await call(client, stats, 'POST /lessons/check', 'POST', '/api/lessons/check',
+                                 json={'session_id': session_id, 'question_id': question['question_id'], 'answer_id': answer_id},
+                                 headers=headers)
+            if checked['is_correct']:
+                break
+    await call(client, stats, 'GET /lessons/result/{session_id}', 'GET', f'/api/lessons/result/{session_id}', headers=headers)
+
+
+@asynccontextmanager
+async def in_process_client(database_url: str | None, lessons: int, questions: int) -> AsyncIterator[AsyncClient]:
+    os.environ.setdefault('RATE_LIMITS_ENABLED', 'false')
+    os.environ.setdefault('AUTH_INSECURE_DEV', 'true')
+    os.environ.setdefault('JWT_SECRET', 'load-test-secret')
+    import main
+    from src.config import get_db, get_redis_client, get_progress_queue
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(database_url or f'sqlite+aiosqlite:///{directory}/load.db')
+        await prepare(engine, 0, lessons, questions)
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        redis = FakeBreakerRedis(decode_responses=True)
+
+        async def get_load_db():
+            async with sessions() as session:
+                yield session
+
+        main.app.dependency_overrides.update({
+            get_db: get_load_db,
+            get_redis_client: lambda: redis,
+            get_progress_queue: lambda: None,
+        })
+        clear_local_caches()
+        try:
+            async with AsyncClient(transport=ASGITransport(app=main.app), base_url='http://load-test') as client:
+                yield client
+        finally:
+            main.app.dependency_overrides.clear()
+            await engine.dispose()
+
+
+async def run(client: AsyncClient, users: int, concurrency: int, first_user_id: int, language_id: int, seed: int) -> None:
+    stats = RouteStats()
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = {}
+
+    async def run_user(user_id: int):
+        async with semaphore:
+            try:
+                await virtual_user(client, stats, user_id, language_id, random.Random(seed + user_id))
+            except Exception as e:
+                reason = str(e) if isinstance(e, FlowError) else type(e).__name__
+                failures[reason] = failures.get(reason, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_user(user_id) for user_id in range(first_user_id, first_user_id + users)))
+    elapsed = time.perf_counter() - start
+
+    requests = sum(len(latencies) for latencies in stats.latencies.values())
+    print(f'{users} users, concurrency {concurrency}: {(users - sum(failures.values())) / elapsed:.1f} flows/s, '
+          f'{requests / elapsed:.1f} requests/s, {sum(failures.values())} failed flows in {elapsed:.1f}s')
+    print(f"{'route':<40}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for route, latencies in stats.latencies.items():
+        latencies.sort()
+        print(f'{route:<40}{len(latencies):>10}{stats.errors.get(route, 0):>8}{len(latencies) / elapsed:>9.1f}'
+              + ''.join(f'{percentile(latencies, percent) * 1000:>9.1f}' for percent in (50, 95, 99)))
+    for reason, count in failures.items():
+        print(f'failed {count}x: {reason}')
+
+
+async def main(args: argparse.Namespace):
+    # the app and httpx log every request at INFO
+    logging.disable(logging.INFO)
+    if args.url:
+        async with AsyncClient(base_url=args.url, timeout=30) as client:
+            await run(client, args.users, args.concurrency, args.first_user_id, args.language_id, args.seed)
+        return
+    async with in_process_client(args.database_url, args.lessons, args.questions) as client:
+        await run(client, args.users, args.concurrency, args.first_user_id, 1, args.seed)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Lesson flow load test')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--lessons', type=int, default=20, help='in-process only')
+    parser.add_argument('--questions', type=int, default=10, help='questions per lesson, in-process only')
+    parser.add_argument('--database-url', help='in-process only, e.g. postgresql+asyncpg://...; tables are dropped!')
+    parser.add_argument('--url', help='base URL of a running server, e.g. http://127.0.0.1:8000')
+    parser.add_argument('--language-id', type=int, default=1, help='language of the lessons on the server')
+    parser.add_argument('--first-user-id', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,81 @@
+"""
+Compares the JSON and MessagePack bodies of POST /lessons/start: payload size and encode time.
+
+Two encode paths are measured for each format:
+    splice - what the API does: the questions are encoded once when the lesson is cached,
+             a request only splices the session id in front of them
+    model  - encoding a full StartLessonResponse, e.g. for a lesson that is not cached locally
+
+Usage: python -m benchmarks.payload_formats [--questions 10 100 1000] [--answers 4] [--repeat 2000]
+"""
+import argparse
+import timeit
+import uuid
+
+import msgpack
+from pydantic import TypeAdapter
+
+from src.schemas.tests_schemas import StartLessonResponse, QuestionResponse
+from src.services.mappers import LessonsMapper
+
+_QUESTIONS_ADAPTER = TypeAdapter(list[QuestionResponse])
+
+
+def make_response(questions: int, answers: int) -> StartLessonResponse:
+    return StartLessonResponse.model_validate({
+        'session_id': str(uuid.uuid4()),
+        'questions': [
+            {
+                'question_id': number,
+                'text': f'What does the expression number {number} print when it is run?',
+                'answers': [
+                    {'answer_id': number * answers + answer, 'answer_text': f'Answer {answer} to question {number}'}
+                    for answer in range(answers)
+                ]
+            }
+            for number in range(questions)
+        ]
+    })
+
+
+def measure(questions: int, answers: int, repeat: int) -> dict[str, tuple[int, float]]:
+    """
+    Returns {path: (body bytes, microseconds per encode)}.
+    """
+    response = make_response(questions, answers)
+    session_id = response.session_id
+    questions_json = _QUESTIONS_ADAPTER.dump_json(response.questions)
+    questions_msgpack = LessonsMapper.to_questions_msgpack(questions_json)
+
+    encoders = {
+        'json splice': lambda: LessonsMapper.to_start_lesson_response_raw(session_id, questions_json),
+        'msgpack splice': lambda: LessonsMapper.to_start_lesson_response_msgpack(session_id, questions_msgpack),
+        'json model': lambda: response.model_dump_json().encode(),
+        'msgpack model': lambda: msgpack.packb(response.model_dump(mode='json')),
+    }
+    results = {}
+    for name, encode in encoders.items():
+        seconds = min(timeit.repeat(encode, number=repeat, repeat=3)) / repeat
+        results[name] = (len(encode()), seconds * 1_000_000)
+
+    assert msgpack.unpackb(encoders['msgpack splice']()) == response.model_dump(mode='json')
+    return results
+
+
+def main(question_counts: list[int], answers: int, repeat: int):
+    print(f'{answers} answers per question, best of 3 x {repeat} encodes')
+    print(f"{'questions':>10}  {'path':<16}{'bytes':>10}{'vs json':>9}{'us/encode':>12}")
+    for questions in question_counts:
+        results = measure(questions, answers, max(1, repeat // max(1, questions // 10)))
+        for name, (size, micros) in results.items():
+            json_size = results[name.replace('msgpack', 'json')][0]
+            print(f'{questions:>10}  {name:<16}{size:>10}{size / json_size:>8.0%}{micros:>12.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='JSON vs MessagePack lesson payload benchmark')
+    parser.add_argument('--questions', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--answers', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+    main(args.questions, args.answers, args.repeat)
@@ -0,0 +1,81 @@
+"""
+Compares the Redis value codecs (src/cache/codec.py) per key family: value size, encode and decode time.
+
+Decoding starts from str, as the client returns values with decode_responses=True.
+`session:*` and `user:*` are hashes and do not go through the codecs.
+
+Usage: python -m benchmarks.redis_codecs [--questions 10 100] [--repeat 5000]
+"""
+import argparse
+import timeit
+
+from src.cache import CODECS, decode_value
+from src.database.models import LessonModel, QuestionModel, AnswerModel
+from src.services.mappers import LessonsMapper
+
+
+def make_lesson(questions: int, answers: int = 4) -> LessonModel:
+    """
+    In-memory lesson with ids assigned, the first answer of every question is the correct one.
+    """
+    return LessonModel(
+        lesson_id=1,
+        title='Lesson',
+        description='',
+        language_id=1,
+        questions=[
+            QuestionModel(
+                question_id=number,
+                question_text=f'What does the expression number {number} print when it is run?',
+                answers=[
+                    AnswerModel(answer_id=number * answers + answer, answer_text=f'Answer {answer} to question {number}',
+                                is_correct=int(answer == 0))
+                    for answer in range(answers)
+                ]
+            )
+            for number in range(questions)
+        ]
+    )
+
+
+def make_lesson_value(questions: int, answers: int = 4) -> dict:
+    lesson = make_lesson(questions, answers)
+    correct_answers = {question.question_id: question.answers[0].answer_id for question in lesson.questions}
+    return LessonsMapper.to_lesson_cache(lesson, correct_answers)
+
+
+def key_families(question_counts: list[int]) -> dict[str, dict]:
+    families = {f'lesson ({questions} questions)': make_lesson_value(questions) for questions in question_counts}
+    families['lesson_result'] = {'xp_earned': 200, 'success_percent': 100}
+    return families
+
+
+def measure(value: dict, repeat: int) -> dict[str, tuple[int, float, float]]:
+    """
+    Returns {codec: (value bytes, microseconds per encode, microseconds per decode)}.
+    """
+    results = {}
+    for name, codec in CODECS.items():
+        encoded = codec.encode(value)
+        stored = encoded.decode() if isinstance(encoded, bytes) else encoded
+        assert decode_value(stored) == decode_value(CODECS['json'].encode(value))
+        encode = min(timeit.repeat(lambda: codec.encode(value), number=repeat, repeat=3)) / repeat
+        decode = min(timeit.repeat(lambda: decode_value(stored), number=repeat, repeat=3)) / repeat
+        results[name] = (len(stored.encode()), encode * 1_000_000, decode * 1_000_000)
+    return results
+
+
+def main(question_counts: list[int], repeat: int):
+    print(f'best of 3 x {repeat} calls')
+    print(f"{'key family':<26}{'codec':<8}{'bytes':>9}{'encode us':>11}{'decode us':>11}")
+    for family, value in key_families(question_counts).items():
+        for name, (size, encode, decode) in measure(value, repeat).items():
+            print(f'{family:<26}{name:<8}{size:>9}{encode:>11.2f}{decode:>11.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Redis value codec benchmark per key family')
+    parser.add_argument('--questions', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--repeat', type=int, default=5000)
+    args = parser.parse_args()
+    main(args.questions, args.repeat)
@@ -4,6 +4,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.routes import v1_router
 from src.config import lifespan
+from src.metrics import MetricsMiddleware, metrics_endpoint
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 app = FastAPI(lifespan=lifespan)
@@ -16,4 +17,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# outermost, so the latency includes the other middleware
+app.add_middleware(MetricsMiddleware)
+
+app.add_api_route('/metrics', metrics_endpoint, include_in_schema=False)
 app.include_router(v1_router, prefix='/api', tags=['v1'])
\ No newline at end of file
@@ -1 +1,5 @@
-from .jwt import JWTManager
\ No newline at end of file
+from .jwt import JWTManager
+from .telegram import verify_init_data, TELEGRAM_BOT_TOKEN, AUTH_INSECURE_DEV
+from .verified_tokens import VerifiedTokenCache, verified_tokens
+from .dependencies import get_current_user_id, ensure_same_user, require_admin, ADMIN_USER_IDS
+from .settings import check_auth_settings
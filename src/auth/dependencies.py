@@ -0,0 +1,41 @@
+import os
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from .verified_tokens import verified_tokens
+
+# comma separated ids of the users allowed to write lessons, questions and languages
+ADMIN_USER_IDS = frozenset(int(user_id) for user_id in os.getenv('ADMIN_USER_IDS', '').split(',') if user_id.strip())
+
+_bearer = HTTPBearer(auto_error=False)
+_CHALLENGE = {'WWW-Authenticate': 'Bearer'}
+
+
+async def get_current_user_id(credentials: HTTPAuthorizationCredentials | None = Depends(_bearer)) -> int:
+    """
+    Dependency of the protected routes: id of the user the bearer token was issued to by /user/auth.
+    """
+    if credentials is None:
+        raise HTTPException(status_code=401, detail='Not authenticated', headers=_CHALLENGE)
+    try:
+        return verified_tokens.verify(credentials.credentials)
+    except ValueError:
+        raise HTTPException(status_code=401, detail='Invalid or expired token', headers=_CHALLENGE)
+
+
+def ensure_same_user(user_id: int, current_user_id: int) -> None:
+    """
+    Rejects requests acting on behalf of another user than the authenticated one.
+    """
+    if user_id != current_user_id:
+        raise HTTPException(status_code=403, detail='Not allowed for another user')
+
+
+async def require_admin(current_user_id: int = Depends(get_current_user_id)) -> int:
+    """
+    Dependency of the content writing routes: only users of ADMIN_USER_IDS pass.
+    """
+    if current_user_id not in ADMIN_USER_IDS:
+        raise HTTPException(status_code=403, detail='Admin rights required')
+    return current_user_id
@@ -1,21 +1,32 @@
+import logging
 import os
-from datetime import timedelta, datetime
+from datetime import timedelta, datetime, timezone
 
-from jose import jwt
+from dotenv import load_dotenv
+from jose import jwt, JWTError
 
+load_dotenv()
+logger = logging.getLogger('auth')
+
+# required, shared by all the workers: tokens issued by one of them are accepted by the others and after restarts
 JWT_SECRET = os.getenv('JWT_SECRET')
-JWT_ALGORITHM = os.getenv('JWT_ALGORITHM')
+JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
+JWT_EXPIRE_MINUTES = int(os.getenv('JWT_EXPIRE_MINUTES', 600))
+
 
 class JWTManager:
     @staticmethod
     def create_access_token(
-            data: dict
+            data: dict,
+            expires_delta: timedelta = timedelta(minutes=JWT_EXPIRE_MINUTES)
     ) -> str:
         """
         Create a JWT access token with the given data and expiration time.
         """
+        if not JWT_SECRET:
+            raise RuntimeError('JWT_SECRET is not set')
         to_encode = data.copy()
-        expire = datetime.now() + timedelta(minutes=600)
+        expire = datetime.now(timezone.utc) + expires_delta
         to_encode.update({"exp": expire})
         encoded_jwt = jwt.encode(
             to_encode,
@@ -25,14 +36,32 @@ class JWTManager:
         return encoded_jwt
 
     @staticmethod
-    def verify_token(token: str) -> int:
+    def create_user_token(user_id: int) -> str:
+        return JWTManager.create_access_token({"sub": str(user_id)})
+
+    @staticmethod
+    def decode_token(token: str) -> dict:
+        """
+        Returns the claims of a valid, unexpired token. Raises ValueError otherwise.
+        """
+        if not JWT_SECRET:
+            raise ValueError("Invalid token")
         try:
-            payload = jwt.decode(
+            return jwt.decode(
                 token,
                 JWT_SECRET,
                 algorithms=[JWT_ALGORITHM]
             )
-            return payload.get("sub")
-        except Exception as e:
-            print(f"JWT Error: {e}")
+        except JWTError as e:
+            logger.debug(f"JWT Error: {e}")
+            raise ValueError("Invalid token")
+
+    @staticmethod
+    def verify_token(token: str) -> int:
+        """
+        Returns the user id of a valid token. Raises ValueError otherwise.
+        """
+        subject = JWTManager.decode_token(token).get("sub")
+        if not subject or not subject.isdigit():
             raise ValueError("Invalid token")
+        return int(subject)
@@ -0,0 +1,18 @@
+import logging
+
+from .jwt import JWT_SECRET
+from .telegram import TELEGRAM_BOT_TOKEN, AUTH_INSECURE_DEV
+
+logger = logging.getLogger('auth')
+
+
+def check_auth_settings() -> None:
+    """
+    Refuses to start the app with authentication misconfigured. Raises RuntimeError.
+    """
+    if not JWT_SECRET:
+        raise RuntimeError('JWT_SECRET must be set, the same for every worker')
+    if AUTH_INSECURE_DEV:
+        logger.warning('AUTH_INSECURE_DEV is true, Telegram initData is NOT verified at login')
+    elif not TELEGRAM_BOT_TOKEN:
+        raise RuntimeError('TELEGRAM_BOT_TOKEN must be set to verify Telegram logins (or AUTH_INSECURE_DEV=true in development)')
@@ -0,0 +1,49 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+from urllib.parse import parse_qsl
+
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger('auth')
+
+# token of the bot serving the Mini App, initData is signed with it
+TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
+# seconds an initData stays valid after Telegram issued it, 0 disables the check
+TELEGRAM_AUTH_MAX_AGE = int(os.getenv('TELEGRAM_AUTH_MAX_AGE', 86400))
+# true lets /user/auth log anyone in as any user without initData, for tests and local load tests only
+AUTH_INSECURE_DEV = os.getenv('AUTH_INSECURE_DEV', 'false').lower() == 'true'
+
+
+def verify_init_data(init_data: str, bot_token: str, max_age: int = TELEGRAM_AUTH_MAX_AGE) -> dict:
+    """
+    Checks the HMAC of the Telegram Mini App initData and returns its `user` object.
+    Raises ValueError for unsigned, forged or expired data.
+    See https://core.telegram.org/bots/webapps#validating-data-received-via-the-mini-app
+    """
+    try:
+        fields = dict(parse_qsl(init_data, keep_blank_values=True, strict_parsing=True))
+    except ValueError:
+        raise ValueError('Malformed initData')
+    received_hash = fields.pop('hash', '')
+
+    data_check_string = '\n'.join(f'{name}={value}' for name, value in sorted(fields.items()))
+    secret_key = hmac.new(b'WebAppData', bot_token.encode(), hashlib.sha256).digest()
+    expected_hash = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected_hash, received_hash):
+        raise ValueError('Invalid initData signature')
+
+    auth_date = fields.get('auth_date', '')
+    if max_age and (not auth_date.isdigit() or time.time() - int(auth_date) > max_age):
+        raise ValueError('initData has expired')
+
+    try:
+        user = json.loads(fields['user'])
+        int(user['id'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('initData has no user')
+    return user
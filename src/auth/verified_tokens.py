@@ -0,0 +1,39 @@
+import hashlib
+import time
+
+from src.cache import LocalCache
+from .jwt import JWTManager, JWT_EXPIRE_MINUTES
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of tokens whose signature was already checked, so a request with a known token
+    costs a SHA-256 digest instead of the signature verification. Entries are keyed by the digest,
+    the tokens themselves are not kept, and are dropped once the token expires.
+    Invalid tokens are never cached.
+    """
+    def __init__(self, max_size: int = 10000, ttl: float = JWT_EXPIRE_MINUTES * 60):
+        self._cache = LocalCache(max_size, ttl)
+
+    def verify(self, token: str) -> int:
+        """
+        Returns the user id of a valid token. Raises ValueError otherwise.
+        """
+        key = hashlib.sha256(token.encode()).digest()
+        entry = self._cache.get(key)
+        if entry:
+            user_id, expires_at = entry
+            if expires_at > time.time():
+                return user_id
+            self._cache.delete(key)
+
+        claims = JWTManager.decode_token(token)
+        subject = claims.get('sub')
+        if not subject or not subject.isdigit() or 'exp' not in claims:
+            raise ValueError('Invalid token')
+        user_id = int(subject)
+        self._cache.set(key, (user_id, claims['exp']))
+        return user_id
+
+
+verified_tokens = VerifiedTokenCache()
@@ -0,0 +1,10 @@
+from .local_cache import LocalCache
+from .keys import CACHE_NAMESPACE, DATA_NAMESPACE, progress_stream_key, legacy_progress_stream_keys, lesson_key, session_key, lesson_result_key, user_key, languages_catalog_key, \
+    lessons_catalog_key, lessons_catalog_cursor_key, warmup_lock_key, CATALOG_TAG, lesson_tag, language_tag, global_leaderboard_key, \
+    language_leaderboard_key, weekly_leaderboard_key, streak_sweep_key, streak_timezones_key, user_fill_lock_key, rate_limit_key, daily_completion_key
+from .lesson_cache import local_lesson_cache, local_catalog_cache, listen_for_invalidations
+from .tagged_cache import TaggedCache
+from .user_cache import UserProfileCache
+from .circuit_breaker import CircuitBreaker, CircuitBreakerRedis, CircuitOpenError
+from .catalog_cache import CatalogCache, CatalogEntry, CATALOG_CACHE_CONTROL
+from .codec import encode_value, decode_value, value_codec, CODECS
@@ -0,0 +1,66 @@
+import hashlib
+import os
+from typing import NamedTuple
+
+from redis.asyncio import Redis
+
+from .keys import CATALOG_TAG
+from .lesson_cache import local_catalog_cache
+from .tagged_cache import TaggedCache
+
+# Lets Telegram webviews and CDNs reuse catalog responses for a minute, then revalidate them with the ETag
+CATALOG_CACHE_CONTROL = os.getenv('CATALOG_CACHE_CONTROL', 'public, max-age=60')
+
+
+class CatalogEntry(NamedTuple):
+    etag: str
+    body: bytes
+
+    @classmethod
+    def from_body(cls, body: bytes) -> 'CatalogEntry':
+        return cls(f'"{hashlib.sha256(body).hexdigest()[:32]}"', body)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {'ETag': self.etag, 'Cache-Control': CATALOG_CACHE_CONTROL}
+
+    def matches(self, if_none_match: str | None) -> bool:
+        """
+        Tells if an `If-None-Match` header value names this entry, so it can be answered with 304.
+        """
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        # If-None-Match uses the weak comparison: W/"x" matches "x"
+        return any(tag.strip().removeprefix('W/') == self.etag for tag in if_none_match.split(','))
+
+
+class CatalogCache:
+    """
+    Cache of encoded catalog responses together with their ETags. The ETag is computed once,
+    when the response is cached, and both are kept in Redis and in the local cache of every worker
+    until the catalog tag is invalidated. A conditional request is then answered without the database,
+    without decoding anything and, on a local hit, without Redis.
+    """
+    def __init__(self, redis_client: Redis, ttl: int):
+        self._cache = TaggedCache(redis_client)
+        self.ttl = ttl
+
+    async def get(self, key: str) -> CatalogEntry | None:
+        entry = local_catalog_cache.get(key)
+        if entry:
+            return entry
+        cached = await self._cache.get(key)
+        if not cached:
+            return None
+        etag, _, body = cached.partition('\n')
+        entry = CatalogEntry(etag, body.encode())
+        local_catalog_cache.set(key, entry, (CATALOG_TAG,))
+        return entry
+
+    async def set(self, key: str, body: bytes) -> CatalogEntry:
+        entry = CatalogEntry.from_body(body)
+        await self._cache.set(key, f'{entry.etag}\n{body.decode()}', (CATALOG_TAG,), ex=self.ttl)
+        local_catalog_cache.set(key, entry, (CATALOG_TAG,))
+        return entry
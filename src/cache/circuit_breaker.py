@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import time
+
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import ConnectionError, TimeoutError
+
+from src.metrics import record_dependency_call, REDIS
+
+logger = logging.getLogger('circuit_breaker')
+
+
+class CircuitOpenError(ConnectionError):
+    """
+    Raised instead of calling Redis while the circuit is open.
+    A ConnectionError, so callers handle it like Redis being unreachable.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops calling Redis after `failure_threshold` consecutive failures (connection errors and timeouts)
+    for `reset_timeout` seconds. After that one trial call is let through: its success closes the circuit,
+    its failure opens it again. Every call is limited to `command_timeout` seconds, which also covers
+    stalls the socket timeout does not see, e.g. a slow server answering a long script.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10, command_timeout: float = 0.5):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.command_timeout = command_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        # bumped whenever the circuit opens, results of calls started before tell nothing about Redis now
+        self._generation = 0
+
+    @property
+    def state(self) -> str:
+        if self._failures < self.failure_threshold:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    async def call(self, command):
+        """
+        Awaits the `command` coroutine function through the breaker.
+        """
+        state = self.state
+        if state == self.OPEN or (state == self.HALF_OPEN and self._trial_running):
+            raise CircuitOpenError('Redis circuit is open')
+
+        is_trial = state == self.HALF_OPEN
+        generation = self._generation
+        if is_trial:
+            self._trial_running = True
+        try:
+            result = await asyncio.wait_for(command(), self.command_timeout)
+        except (ConnectionError, TimeoutError, asyncio.TimeoutError) as e:
+            if generation == self._generation:
+                self._record_failure(e)
+            if isinstance(e, asyncio.TimeoutError):
+                raise TimeoutError(f'Redis command timed out after {self.command_timeout}s') from e
+            raise
+        finally:
+            if is_trial:
+                self._trial_running = False
+        if generation == self._generation:
+            if self._failures >= self.failure_threshold:
+                logger.info('Redis is reachable again, circuit closed')
+            self._failures = 0
+        return result
+
+    def _record_failure(self, error: Exception) -> None:
+        self._failures = min(self._failures + 1, self.failure_threshold)
+        if self._failures == self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._generation += 1
+            logger.error(f'Redis circuit opened for {self.reset_timeout}s: {error!r}')
+
+
+class CircuitBreakerPipeline(Pipeline):
+    breaker: CircuitBreaker
+
+    async def execute(self, raise_on_error: bool = True):
+        start = time.perf_counter()
+        try:
+            return await self.breaker.call(lambda: super(CircuitBreakerPipeline, self).execute(raise_on_error))
+        finally:
+            record_dependency_call(REDIS, time.perf_counter() - start)
+
+
+class CircuitBreakerRedis(Redis):
+    """
+    Redis client running every command, script and pipeline through a CircuitBreaker.
+    Calls are counted and timed for the metrics, a pipeline is one call.
+    Pub/sub connections are not guarded, their listeners reconnect on their own.
+    """
+    def __init__(self, *args, breaker: CircuitBreaker | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.breaker = breaker or CircuitBreaker()
+
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await self.breaker.call(lambda: super(CircuitBreakerRedis, self).execute_command(*args, **options))
+        finally:
+            record_dependency_call(REDIS, time.perf_counter() - start)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> Pipeline:
+        pipe = CircuitBreakerPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+        pipe.breaker = self.breaker
+        return pipe
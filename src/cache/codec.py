@@ -0,0 +1,62 @@
+"""
+Encoding of the structured values kept in Redis as strings (`lesson:*` data, `lesson_result:*`).
+Sessions and user profiles are hashes and are not encoded as a whole.
+
+REDIS_CODEC selects the codec new values are written with:
+    json   - stdlib json, untagged, the format written before the codecs existed (default)
+    orjson - orjson, values start with the `o:` tag
+
+Values are decoded by their tag whatever codec is configured, so workers of two releases share
+the cache during a rollout. This release reads both but writes json, so workers of the previous
+release can still read its values. Set REDIS_CODEC=orjson once every worker runs this release.
+"""
+import json
+import os
+from typing import Any, Callable
+
+import orjson
+
+
+class Codec:
+    def __init__(self, name: str, tag: bytes, dumps: Callable[[Any], bytes | str], loads: Callable[[str | bytes], Any]):
+        self.name = name
+        self.tag = tag
+        self._tag_str = tag.decode()
+        self._dumps = dumps
+        self._loads = loads
+
+    def encode(self, value: Any) -> bytes | str:
+        encoded = self._dumps(value)
+        if not self.tag:
+            return encoded
+        return self.tag + encoded if isinstance(encoded, bytes) else self._tag_str + encoded
+
+    def decode(self, value: str | bytes) -> Any:
+        return self._loads(value[len(self.tag):] if self.tag else value)
+
+    def tagged(self, value: str | bytes) -> bool:
+        return value.startswith(self.tag if isinstance(value, bytes) else self._tag_str)
+
+
+JSON_CODEC = Codec('json', b'', lambda value: json.dumps(value), json.loads)
+# int keys (question ids) are written as strings, like json does
+ORJSON_CODEC = Codec('orjson', b'o:', lambda value: orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS), orjson.loads)
+
+CODECS = {codec.name: codec for codec in (JSON_CODEC, ORJSON_CODEC)}
+# tagged codecs first, untagged json matches every value
+_DECODERS = sorted(CODECS.values(), key=lambda codec: not codec.tag)
+
+value_codec = CODECS[os.getenv('REDIS_CODEC', JSON_CODEC.name)]
+
+
+def encode_value(value: Any) -> bytes | str:
+    return value_codec.encode(value)
+
+
+def decode_value(value: str | bytes) -> Any:
+    """
+    Decodes a value written by any of the codecs. Raises ValueError for malformed values.
+    """
+    for codec in _DECODERS:
+        if codec.tagged(value):
+            return codec.decode(value)
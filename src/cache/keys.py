@@ -0,0 +1,107 @@
+import os
+
+# Bump when the layout of any cached value changes, so the new code never reads values written by the old one
+CACHE_SCHEMA_VERSION = 5
+# All cache keys live under this namespace. Entries of older namespaces are never read again and just expire.
+CACHE_NAMESPACE = os.getenv('CACHE_NAMESPACE', f'v{CACHE_SCHEMA_VERSION}')
+# Data Redis is the source of truth for lives under this fixed namespace instead, so schema bumps do not lose it
+DATA_NAMESPACE = os.getenv('DATA_NAMESPACE', 'data')
+
+
+def lesson_key(lesson_id: int) -> str:
+    return f"{CACHE_NAMESPACE}:lesson:{lesson_id}:data"
+
+
+# Sessions, results and daily completion claims are live state, a cache schema bump must not drop lessons in progress
+def session_key(session_id: str) -> str:
+    return f"{DATA_NAMESPACE}:session:{session_id}"
+
+
+def lesson_result_key(session_id: str) -> str:
+    return f"{DATA_NAMESPACE}:lesson_result:{session_id}"
+
+
+def user_key(user_id: int) -> str:
+    return f"{CACHE_NAMESPACE}:user:{user_id}"
+
+
+def languages_catalog_key() -> str:
+    return f"{CACHE_NAMESPACE}:catalog:languages"
+
+
+def warmup_lock_key(release_id: str | None = None) -> str:
+    if release_id:
+        return f"{CACHE_NAMESPACE}:warmup:{release_id}"
+    return f"{CACHE_NAMESPACE}:warmup"
+
+
+def lessons_catalog_key(language_id: int | None, cursor: int, limit: int) -> str:
+    return f"{CACHE_NAMESPACE}:catalog:lessons:{language_id or 'all'}:{cursor}:{limit}"
+
+
+def lessons_catalog_cursor_key(language_id: int | None, cursor: int, limit: int) -> str:
+    """
+    Marks a cursor returned as `next_cursor` of a cached page, only the pages of such cursors are cached.
+    """
+    return f"{CACHE_NAMESPACE}:catalog:lessons:{language_id or 'all'}:{cursor}:{limit}:cursor"
+
+
+def tag_key(tag: str) -> str:
+    return f"{CACHE_NAMESPACE}:tag:{tag}"
+
+
+# Cache tags, see TaggedCache
+CATALOG_TAG = 'catalog'
+
+
+def lesson_tag(lesson_id: int) -> str:
+    return f"lesson:{lesson_id}"
+
+
+def language_tag(language_id: int) -> str:
+    return f"language:{language_id}"
+
+
+# Leaderboards are updated in place and only rebuilt from the database when lost, so a cache schema bump must not drop them
+def global_leaderboard_key() -> str:
+    return f"{DATA_NAMESPACE}:leaderboard:global"
+
+
+def language_leaderboard_key(language_id: int) -> str:
+    return f"{DATA_NAMESPACE}:leaderboard:language:{language_id}"
+
+
+def weekly_leaderboard_key(week: str) -> str:
+    return f"{DATA_NAMESPACE}:leaderboard:weekly:{week}"
+
+
+def streak_sweep_key(timezone: str, local_date: str) -> str:
+    return f"{CACHE_NAMESPACE}:streak_sweep:{timezone}:{local_date}"
+
+
+def streak_timezones_key() -> str:
+    return f"{CACHE_NAMESPACE}:streak_sweep:timezones"
+
+
+def user_fill_lock_key(user_id: int) -> str:
+    return f"{CACHE_NAMESPACE}:user:{user_id}:fill"
+
+
+def daily_completion_key(user_id: int, local_date: str) -> str:
+    return f"{DATA_NAMESPACE}:user:{user_id}:completed:{local_date}"
+
+
+def rate_limit_key(route: str, scope: str, identity: str) -> str:
+    return f"{CACHE_NAMESPACE}:rate_limit:{route}:{scope}:{identity}"
+
+
+def progress_stream_key() -> str:
+    return f"{DATA_NAMESPACE}:stream:lesson_results"
+
+
+def legacy_progress_stream_keys() -> list[str]:
+    """
+    Streams of completed lessons written by releases keeping them in the cache namespace.
+    """
+    namespaces = {f'v{version}' for version in range(1, CACHE_SCHEMA_VERSION + 1)} | {CACHE_NAMESPACE}
+    return [f"{namespace}:stream:lesson_results" for namespace in sorted(namespaces)]
@@ -0,0 +1,52 @@
+import asyncio
+import logging
+from typing import Iterable
+
+from redis.asyncio import Redis
+
+from .local_cache import LocalCache
+
+logger = logging.getLogger('lesson_cache')
+
+INVALIDATION_CHANNEL = 'cache:invalidate'
+LISTEN_TIMEOUT = 30  # seconds
+
+# Decoded lesson payloads (the content of `lesson_key(id)`) kept in front of Redis, tagged like the Redis entries
+local_lesson_cache = LocalCache(max_size=512, ttl=300)
+# Encoded catalog responses with their ETags (see CatalogCache)
+local_catalog_cache = LocalCache(max_size=256, ttl=300)
+_LOCAL_CACHES = (local_lesson_cache, local_catalog_cache)
+
+
+def invalidate_local_tags(tags: Iterable[str]) -> None:
+    for cache in _LOCAL_CACHES:
+        cache.invalidate_tags(tags)
+
+
+def clear_local_caches() -> None:
+    for cache in _LOCAL_CACHES:
+        cache.clear()
+
+
+async def listen_for_invalidations(redis_client: Redis, retry_delay: float = 1.0) -> None:
+    """
+    Background task that evicts entries from the local caches when another worker invalidates their tags.
+    Messages published while the subscription was down are lost, so the local caches
+    are cleared after every (re)subscription.
+    """
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                clear_local_caches()
+                logger.info("Subscribed to cache invalidations")
+                while True:
+                    # an explicit timeout instead of listen(), which would hit the socket timeout when idle
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=LISTEN_TIMEOUT)
+                    if message and message.get('type') == 'message':
+                        invalidate_local_tags(str(message.get('data')).split())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Cache invalidation listener failed: {e}")
+            await asyncio.sleep(retry_delay)
@@ -0,0 +1,93 @@
+import logging
+from typing import Iterable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from .keys import tag_key
+from .lesson_cache import invalidate_local_tags, INVALIDATION_CHANNEL
+
+logger = logging.getLogger('tagged_cache')
+
+# KEYS[1..ARGV[1]] - tag keys, the rest - entry keys read from the tags.
+# Deletes the entries and removes them from the tags, tags left empty are deleted too.
+# Entries are passed in KEYS instead of being read by the script, so it only touches the keys it declares.
+# Returns the number of deleted entries.
+_INVALIDATE_TAGS_SCRIPT = """
+local tags = tonumber(ARGV[1])
+local deleted = 0
+for i = tags + 1, #KEYS do
+    deleted = deleted + redis.call('DEL', KEYS[i])
+end
+for i = 1, tags do
+    for j = tags + 1, #KEYS do
+        redis.call('SREM', KEYS[i], KEYS[j])
+    end
+    if redis.call('SCARD', KEYS[i]) == 0 then
+        redis.call('DEL', KEYS[i])
+    end
+end
+return deleted
+"""
+# entry keys passed to one script call
+_INVALIDATE_BATCH_SIZE = 500
+
+
+class TaggedCache:
+    """
+    Redis cache where every entry is registered under one or more tags, e.g. `lesson:1`, `language:2`
+    or `catalog`. Write paths invalidate tags instead of tracking every key derived from the changed data.
+    A tag is a Redis set of keys, expiring together with the entries stored under it.
+    Reads and writes of entries degrade to cache misses while Redis is unavailable,
+    invalidations fail, so callers never leave stale entries behind unnoticed.
+    """
+    def __init__(self, redis_client: Redis):
+        self._redis_client = redis_client
+        self._invalidate_script = redis_client.register_script(_INVALIDATE_TAGS_SCRIPT)
+
+    async def get(self, key: str) -> str | None:
+        try:
+            return await self._redis_client.get(key)
+        except RedisError as e:
+            logger.warning(f"Cache read of {key} failed: {e!r}")
+            return None
+
+    async def set(self, key: str, value: str, tags: Iterable[str], ex: int) -> None:
+        await self.set_many([(key, value, tags)], ex)
+
+    async def set_many(self, entries: Iterable[tuple[str, str, Iterable[str]]], ex: int) -> None:
+        """
+        Stores many (key, value, tags) entries with one pipelined round trip.
+        """
+        try:
+            async with self._redis_client.pipeline(transaction=False) as pipe:
+                for key, value, tags in entries:
+                    pipe.set(key, value, ex=ex)
+                    for tag in tags:
+                        pipe.sadd(tag_key(tag), key)
+                        pipe.expire(tag_key(tag), ex)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Cache write failed: {e!r}")
+
+    async def invalidate(self, *tags: str) -> int:
+        """
+        Drops every entry tagged with any of the tags from Redis and from the local cache of every worker.
+        The members of the tags are read first and deleted by the script in a second step.
+        Returns the number of deleted Redis entries.
+        """
+        invalidate_local_tags(tags)
+        tag_keys = [tag_key(tag) for tag in tags]
+        async with self._redis_client.pipeline(transaction=False) as pipe:
+            for key in tag_keys:
+                pipe.smembers(key)
+            entries = sorted(set().union(*await pipe.execute()))
+        deleted = 0
+        # entries tagged after the members were read stay registered under their tags
+        for start in range(0, max(len(entries), 1), _INVALIDATE_BATCH_SIZE):
+            deleted += await self._invalidate_script(
+                keys=tag_keys + entries[start:start + _INVALIDATE_BATCH_SIZE],
+                args=[len(tag_keys)]
+            )
+        await self._redis_client.publish(INVALIDATION_CHANNEL, ' '.join(tags))
+        return deleted
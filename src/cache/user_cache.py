@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from .keys import user_key, user_fill_lock_key
+
+logger = logging.getLogger('user_cache')
+
+# KEYS[1] - user profile key, KEYS[2] - profile fill lock key
+# ARGV[1] - lock token, ARGV[2] - profile ttl (seconds), ARGV[3..] - pairs of field and value
+# Stores the profile only while the fill lock is still ours: a write-through update of a missing profile
+# drops the lock, so a fill that read the database before that update can not store stale data.
+_FILL_PROFILE_SCRIPT = """
+if redis.call('GET', KEYS[2]) ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1], KEYS[2])
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+# KEYS[1] - user profile key, KEYS[2] - profile fill lock key
+# ARGV - pairs of field and value
+# Updates only an already cached profile, otherwise invalidates a concurrent fill.
+_UPDATE_PROFILE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('HSET', KEYS[1], unpack(ARGV))
+    return 1
+end
+redis.call('DEL', KEYS[2])
+return 0
+"""
+
+_INT_FIELDS = ('user_id', 'streak', 'xp', 'active_language_id')
+
+
+def _encode(profile: dict) -> list:
+    fields = []
+    for field, value in profile.items():
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        fields.extend((field, '' if value is None else value))
+    return fields
+
+
+def _decode(raw: dict[str, str]) -> dict:
+    profile: dict[str, Any] = {field: value if value != '' else None for field, value in raw.items()}
+    for field in _INT_FIELDS:
+        if profile.get(field) is not None:
+            profile[field] = int(profile[field])
+    if profile.get('last_lesson_date'):
+        profile['last_lesson_date'] = datetime.fromisoformat(profile['last_lesson_date'])
+    return profile
+
+
+class UserProfileCache:
+    """
+    Read-through / write-through cache of user profiles, one Redis hash per user.
+    Profiles are plain dicts (see UserMapper.to_user_profile_cache). Write paths update the cached
+    fields in place and never create a profile, reads fill missing profiles under a lock,
+    so concurrent requests for the same user hit the database once.
+    While Redis is unavailable profiles are loaded from the database and writes are skipped.
+    """
+    def __init__(self, redis_client: Redis, ttl: int = 3600, fill_lock_ms: int = 2000,
+                 fill_wait: float = 0.05, fill_wait_attempts: int = 10):
+        self._redis_client = redis_client
+        self.ttl = ttl
+        self.fill_lock_ms = fill_lock_ms
+        self.fill_wait = fill_wait
+        self.fill_wait_attempts = fill_wait_attempts
+        self._fill_script = redis_client.register_script(_FILL_PROFILE_SCRIPT)
+        self._update_script = redis_client.register_script(_UPDATE_PROFILE_SCRIPT)
+
+    async def get(self, user_id: int) -> dict | None:
+        raw = await self._redis_client.hgetall(user_key(user_id))
+        return _decode(raw) if raw else None
+
+    async def get_or_load(self, user_id: int, loader: Callable[[int], Awaitable[dict | None]]) -> dict | None:
+        """
+        Returns the cached profile, loading it with `loader` on a miss. Only the request holding the
+        fill lock loads and stores the profile, others wait for it a little and then load it themselves
+        without storing.
+        """
+        try:
+            return await self._get_or_fill(user_id, loader)
+        except RedisError as e:
+            logger.warning(f"Profile cache unavailable, loading user {user_id} from the database: {e!r}")
+            return await loader(user_id)
+
+    async def _get_or_fill(self, user_id: int, loader: Callable[[int], Awaitable[dict | None]]) -> dict | None:
+        profile = await self.get(user_id)
+        if profile:
+            return profile
+
+        for _ in range(self.fill_wait_attempts):
+            token = uuid.uuid4().hex
+            if await self._redis_client.set(user_fill_lock_key(user_id), token, nx=True, px=self.fill_lock_ms):
+                profile = await loader(user_id)
+                if profile:
+                    await self._fill_script(
+                        keys=[user_key(user_id), user_fill_lock_key(user_id)],
+                        args=[token, self.ttl, *_encode(profile)]
+                    )
+                else:
+                    await self._redis_client.delete(user_fill_lock_key(user_id))
+                return profile
+            await asyncio.sleep(self.fill_wait)
+            profile = await self.get(user_id)
+            if profile:
+                return profile
+        return await loader(user_id)
+
+    async def set(self, profile: dict) -> None:
+        """
+        Stores the whole profile, e.g. of a new user.
+        """
+        key = user_key(profile['user_id'])
+        try:
+            async with self._redis_client.pipeline(transaction=True) as pipe:
+                pipe.delete(key, user_fill_lock_key(profile['user_id']))
+                pipe.hset(key, mapping=dict(zip(*[iter(_encode(profile))] * 2)))
+                pipe.expire(key, self.ttl)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Profile of user {profile['user_id']} not cached: {e!r}")
+
+    async def update(self, user_id: int, **fields) -> None:
+        """
+        Write-through update of a cached profile. Profiles that are not cached are left missing.
+        """
+        await self.update_many({user_id: fields})
+
+    async def update_many(self, updates: dict[int, dict]) -> None:
+        if not updates:
+            return
+        try:
+            async with self._redis_client.pipeline(transaction=False) as pipe:
+                for user_id, fields in updates.items():
+                    await self._update_script(
+                        keys=[user_key(user_id), user_fill_lock_key(user_id)],
+                        args=_encode(fields),
+                        client=pipe
+                    )
+                await pipe.execute()
+        except RedisError as e:
+            # cached profiles stay stale until they expire
+            logger.warning(f"Cached profiles of {len(updates)} users not updated: {e!r}")
@@ -0,0 +1,42 @@
+"""
+Imports lesson bundles (a lesson with its questions and answers) from JSON or NDJSON files.
+Files ending with .ndjson or .jsonl are read as NDJSON, one bundle per line.
+
+Usage: python -m src.commands.import_lessons FILE [FILE ...]
+"""
+import asyncio
+import logging
+import sys
+
+from src.config import get_redis_client
+from src.config.database import AsyncSessionLocal
+from src.repository import LessonsRepository
+from src.services import LessonsService
+
+
+async def main(paths: list[str]) -> int:
+    failed = 0
+    for path in paths:
+        with open(path, 'rb') as file:
+            content = file.read()
+        async with AsyncSessionLocal() as session:
+            result = await LessonsService(LessonsRepository(session), get_redis_client()).import_lessons(
+                content, ndjson=path.endswith(('.ndjson', '.jsonl'))
+            )
+        if not result.is_success:
+            print(f'{path}: {result.error}')
+            failed += 1
+            continue
+        print(f'{path}: imported {len(result.data.imported)} lessons, {len(result.data.errors)} failed')
+        for error in result.data.errors:
+            print(f'  bundle {error.index}: {error.error}')
+        failed += len(result.data.errors)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print(__doc__.strip())
+        sys.exit(2)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(asyncio.run(main(sys.argv[1:])))
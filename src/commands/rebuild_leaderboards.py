@@ -0,0 +1,24 @@
+"""
+Rebuilds the XP leaderboards in Redis from the database.
+
+Usage: python -m src.commands.rebuild_leaderboards
+"""
+import asyncio
+import logging
+
+from src.config import get_redis_client
+from src.config.database import AsyncSessionLocal
+from src.repository import LeaderboardRepository
+from src.services import LeaderboardService
+
+
+async def main():
+    async with AsyncSessionLocal() as session:
+        counts = await LeaderboardService(LeaderboardRepository(session), get_redis_client()).rebuild()
+    for leaderboard, count in counts.items():
+        print(f'{leaderboard}: {count} users')
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(main())
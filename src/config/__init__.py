@@ -1,3 +1,4 @@
 from .lifespan import lifespan
 from .redis_connection import get_redis_client
-from .database import get_db
\ No newline at end of file
+from .database import get_db
+from .progress_queue import get_progress_queue
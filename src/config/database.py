@@ -1,16 +1,14 @@
-from environs import Env
-from sqlalchemy import URL
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
-Base = declarative_base()
-
-env = Env()
-env.read_env('.env')
+from src.database.engine import create_engine
+from src.metrics import instrument_engine
 
-DATABASE_URL = "sqlite+aiosqlite:///database.db" # for testing purposes  TODO: REMOVE AIOSQLITE!!!!
+Base = declarative_base()
 
-engine = create_async_engine(DATABASE_URL, echo=False, connect_args={"check_same_thread": False})
+# backend, pool and SQLite pragmas are configured through the environment, see src/database/engine.py
+engine = create_engine()
+instrument_engine(engine)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -20,4 +18,4 @@ AsyncSessionLocal = async_sessionmaker(
 
 async def get_db():
     async with AsyncSessionLocal() as session:
-        yield session
+        yield session
\ No newline at end of file
@@ -1,11 +1,30 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 
-from .redis_connection import ping_redis_server, flush_redis_cache
+from src.auth import check_auth_settings
+from src.cache import listen_for_invalidations
+from src.workers import run_progress_writer, run_streak_sweeper
+from .database import AsyncSessionLocal
+from .progress_queue import get_progress_queue
+from .redis_connection import ping_redis_server, get_redis_client
+from .warmup import warm_up_cache
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await ping_redis_server()
-    await flush_redis_cache()
-    yield
\ No newline at end of file
+    check_auth_settings()
+    if await ping_redis_server():
+        await warm_up_cache(get_redis_client())
+    background_tasks = [
+        asyncio.create_task(listen_for_invalidations(get_redis_client())),
+        asyncio.create_task(run_streak_sweeper(AsyncSessionLocal, get_redis_client())),
+    ]
+    if get_progress_queue():
+        background_tasks.append(asyncio.create_task(run_progress_writer(get_progress_queue(), AsyncSessionLocal, get_redis_client())))
+    yield
+    for task in background_tasks:
+        task.cancel()
+    for task in background_tasks:
+        with suppress(asyncio.CancelledError):
+            await task
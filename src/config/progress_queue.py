@@ -0,0 +1,10 @@
+from src.workers import ProgressQueue, RedisStreamProgressQueue, WRITE_BEHIND_ENABLED
+from .redis_connection import get_redis_client
+
+progress_queue = RedisStreamProgressQueue(get_redis_client()) if WRITE_BEHIND_ENABLED else None
+
+def get_progress_queue() -> ProgressQueue | None:
+    """
+    Returns the queue of completed lesson results, or None when results are written inline.
+    """
+    return progress_queue
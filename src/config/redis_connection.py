@@ -3,39 +3,52 @@ import logging
 from dotenv import load_dotenv
 import os
 
+from src.cache import CircuitBreaker, CircuitBreakerRedis
+
 load_dotenv()
 HOST = os.getenv('REDIS_HOST')
 PORT = int(os.getenv('REDIS_PORT'))
 REDIS_USERNAME = os.getenv('REDIS_USERNAME')
 REDIS_PASSWORD = os.getenv('REDIS_PASSWORD')
+# seconds; blocking reads (the progress queue) must finish within the timeouts
+REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', 1.0))
+REDIS_CONNECT_TIMEOUT = float(os.getenv('REDIS_CONNECT_TIMEOUT', 1.0))
+REDIS_COMMAND_TIMEOUT = float(os.getenv('REDIS_COMMAND_TIMEOUT', 1.0))
+REDIS_BREAKER_FAILURES = int(os.getenv('REDIS_BREAKER_FAILURES', 5))
+REDIS_BREAKER_RESET = float(os.getenv('REDIS_BREAKER_RESET', 10))
 
 logger = logging.getLogger('redis_connection')
-redis_client = aioredis.Redis(
+redis_client = CircuitBreakerRedis(
     host=HOST,
     port=PORT,
     decode_responses=True,
     username=REDIS_USERNAME,
     password=REDIS_PASSWORD,
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+    breaker=CircuitBreaker(
+        failure_threshold=REDIS_BREAKER_FAILURES,
+        reset_timeout=REDIS_BREAKER_RESET,
+        command_timeout=REDIS_COMMAND_TIMEOUT
+    ),
 )
 
-async def ping_redis_server():
+async def ping_redis_server() -> bool:
+    """
+    Checks Redis at startup. The app starts without Redis too: caches fall back to the database
+    until the circuit breaker lets commands through again.
+    """
     try:
         await redis_client.ping()
         logger.info("Redis server is reachable")
+        return True
     except Exception as e:
-        logger.error(f"Error connecting to Redis server: {e}")
-        raise ConnectionError("Could not connect to Redis server") from e
-
-async def flush_redis_cache():
-    try:
-        await redis_client.flushdb()
-        logger.info("Redis cache cleared successfully")
-    except Exception as e:
-        logger.error(f"Error clearing Redis cache: {e}")
-        raise RuntimeError("Could not clear Redis cache") from e
+        logger.error(f"Error connecting to Redis server, starting without cache: {e}")
+        return False
 
 def get_redis_client() -> aioredis.Redis:
     """
-    Returns the Redis client instance.
+    Returns the Redis client instance. Its commands fail fast with CircuitOpenError
+    (a redis ConnectionError) while Redis is considered down.
     """
     return redis_client
\ No newline at end of file
@@ -0,0 +1,47 @@
+import logging
+import os
+import uuid
+
+from redis.asyncio import Redis
+
+from src.cache import warmup_lock_key, global_leaderboard_key
+from src.repository import LessonsRepository, PLanguageRepository, LeaderboardRepository
+from src.services import LessonsService, PLanguageService, LeaderboardService
+from .database import AsyncSessionLocal
+
+logger = logging.getLogger('warmup')
+
+# id of the deployed release (e.g. the git sha), every release warms the cache up once
+RELEASE_ID = os.getenv('RELEASE_ID')
+WARMUP_LOCK_TTL = 300  # 5 minutes to finish the warm-up
+# 10 days with a release id, same as the lesson cache. Without one the warm-up is only shared
+# by the workers starting together, so the next deploy warms the cache up again.
+WARMUP_DONE_TTL = 864000 if RELEASE_ID else WARMUP_LOCK_TTL
+
+
+async def warm_up_cache(redis_client: Redis) -> bool:
+    """
+    Preloads lessons and the language catalog into the current cache namespace
+    and rebuilds the leaderboards from the database when Redis lost them.
+    Only one worker per release does it: the one that takes the Redis lock first.
+    Returns True if this worker did the warm-up.
+    """
+    worker_id = uuid.uuid4().hex
+    if not await redis_client.set(warmup_lock_key(RELEASE_ID), worker_id, nx=True, ex=WARMUP_LOCK_TTL):
+        logger.info("Cache warm-up is done by another worker")
+        return False
+
+    try:
+        async with AsyncSessionLocal() as session:
+            lessons_count = await LessonsService(LessonsRepository(session), redis_client).warm_up_cache()
+            languages_count = await PLanguageService(PLanguageRepository(session), redis_client).warm_up_cache()
+            if not await redis_client.exists(global_leaderboard_key()):
+                await LeaderboardService(LeaderboardRepository(session), redis_client).rebuild()
+        await redis_client.set(warmup_lock_key(RELEASE_ID), 'done', ex=WARMUP_DONE_TTL)
+        logger.info(f"Cache warmed up: {lessons_count} lessons, {languages_count} languages")
+        return True
+    except Exception as e:
+        # let the next starting worker try again, requests fall back to read-through meanwhile
+        await redis_client.delete(warmup_lock_key(RELEASE_ID))
+        logger.error(f"Cache warm-up failed: {e}")
+        return False
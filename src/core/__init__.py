@@ -1 +1,2 @@
 from .service_result import handle_service_result
+from .content_negotiation import negotiate_media_type, JSON, MSGPACK
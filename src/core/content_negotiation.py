@@ -0,0 +1,33 @@
+from fastapi import Header
+
+from src.services.service_result import JSON_MEDIA_TYPE as JSON, MSGPACK_MEDIA_TYPE as MSGPACK
+
+_MSGPACK_TYPES = (MSGPACK, 'application/x-msgpack')
+
+
+def _quality(accept: str, media_types: tuple[str, ...]) -> float:
+    for media_range in accept.split(','):
+        media_type, *params = (part.strip() for part in media_range.split(';'))
+        if media_type.lower() in media_types:
+            for param in params:
+                name, _, value = param.partition('=')
+                if name.strip() == 'q':
+                    try:
+                        return float(value)
+                    except ValueError:
+                        return 0.0
+            return 1.0
+    return 0.0
+
+
+def negotiate_media_type(accept: str | None = Header(None)) -> str:
+    """
+    Dependency choosing the response encoding of the lesson routes: MessagePack when the client
+    explicitly prefers it in `Accept`, JSON otherwise.
+    """
+    if not accept:
+        return JSON
+    msgpack_quality = _quality(accept, _MSGPACK_TYPES)
+    if msgpack_quality > 0 and msgpack_quality >= _quality(accept, (JSON,)):
+        return MSGPACK
+    return JSON
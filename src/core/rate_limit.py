@@ -0,0 +1,140 @@
+import logging
+import math
+import os
+import time
+from typing import NamedTuple
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.routing import APIRoute, APIRouter
+from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+from redis.exceptions import RedisError
+
+from src.auth import verified_tokens
+from src.cache import rate_limit_key
+from src.config import get_redis_client
+from src.metrics import Counter, log_event
+
+logger = logging.getLogger('rate_limit')
+
+# false turns every limit off, e.g. for load tests whose virtual users share one address
+RATE_LIMITS_ENABLED = os.getenv('RATE_LIMITS_ENABLED', 'true').lower() != 'false'
+# Per-IP buckets key on request.client.host, the address of the peer. Behind a reverse proxy that is the proxy
+# for every request, unless uvicorn runs with `--proxy-headers --forwarded-allow-ips=<proxy addresses>`
+# and takes the client address from X-Forwarded-For. Turn them on only once that is set up.
+RATE_LIMITS_PER_IP = os.getenv('RATE_LIMITS_PER_IP', 'false').lower() == 'true'
+
+rate_limited_requests = Counter('http_requests_rate_limited_total', 'Requests rejected with 429', ('route', 'scope'))
+
+# Token buckets of one request, taken all or nothing so a rejected request costs no tokens.
+# A bucket is a hash of `tokens` and `ts` (time of the last update) expiring once it would be full again.
+# KEYS: buckets, ARGV[1]: now in seconds, ARGV[2i], ARGV[2i + 1]: rate (tokens per second) and burst of KEYS[i].
+# Returns 0 when allowed, otherwise {index of the exhausted bucket, milliseconds until it has a token}.
+_TAKE_TOKENS_SCRIPT = """
+local now = tonumber(ARGV[1])
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local rate, burst = tonumber(ARGV[i * 2]), tonumber(ARGV[i * 2 + 1])
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or burst
+    local elapsed = math.max(0, now - (tonumber(bucket[2]) or now))
+    tokens = math.min(burst, tokens + elapsed * rate)
+    if tokens < 1 then
+        return {i, math.ceil((1 - tokens) / rate * 1000)}
+    end
+    levels[i] = tokens
+end
+for i, key in ipairs(KEYS) do
+    local rate, burst = tonumber(ARGV[i * 2]), tonumber(ARGV[i * 2 + 1])
+    redis.call('HSET', key, 'tokens', tostring(levels[i] - 1), 'ts', ARGV[1])
+    redis.call('EXPIRE', key, math.ceil(burst / rate) + 1)
+end
+return 0
+"""
+
+
+class Bucket(NamedTuple):
+    # tokens added per second, i.e. the sustained requests per second
+    rate: float
+    # most requests allowed at once after a quiet period
+    burst: int
+
+
+class RouteLimits(NamedTuple):
+    """
+    Buckets of a route. `per_user` applies to requests with a valid bearer token, `per_ip` to every request
+    by the client address (only with RATE_LIMITS_PER_IP), `total` to the route as a whole and sheds load
+    whatever the clients are.
+    """
+    per_user: Bucket | None = None
+    per_ip: Bucket | None = None
+    total: Bucket | None = None
+
+
+class RateLimiter:
+    """
+    Route dependency rejecting requests over the limits with 429 and `Retry-After`.
+    It runs before the other dependencies of the route, so a rejected request builds no service
+    nor database session and costs one Redis script call. When Redis is unavailable requests are let through.
+    """
+    def __init__(self, route: str, limits: RouteLimits):
+        self.route = route
+        self.limits = limits
+        self._script: AsyncScript | None = None
+
+    def _buckets(self, request: Request) -> list[tuple[str, str, Bucket]]:
+        buckets = []
+        if self.limits.per_user:
+            credentials = request.headers.get('authorization', '')
+            scheme, _, token = credentials.partition(' ')
+            if scheme.lower() == 'bearer' and token:
+                try:
+                    # a cache hit for known tokens, invalid ones are rejected by the route itself
+                    buckets.append(('user', str(verified_tokens.verify(token)), self.limits.per_user))
+                except ValueError:
+                    pass
+        if self.limits.per_ip and RATE_LIMITS_PER_IP and request.client:
+            buckets.append(('ip', request.client.host, self.limits.per_ip))
+        if self.limits.total:
+            buckets.append(('total', 'all', self.limits.total))
+        return buckets
+
+    async def __call__(self, request: Request, redis_client: Redis = Depends(get_redis_client)) -> None:
+        buckets = self._buckets(request)
+        if not buckets:
+            return
+        if self._script is None or self._script.registered_client is not redis_client:
+            self._script = redis_client.register_script(_TAKE_TOKENS_SCRIPT)
+
+        args = [time.time()]
+        for _, _, bucket in buckets:
+            args += [bucket.rate, bucket.burst]
+        try:
+            result = await self._script(keys=[rate_limit_key(self.route, scope, identity) for scope, identity, _ in buckets], args=args)
+        except RedisError as e:
+            log_event(logger, 'rate_limit_skipped', level=logging.WARNING, route=self.route, error=type(e).__name__)
+            return
+        if not result:
+            return
+
+        index, retry_after_ms = result
+        scope = buckets[int(index) - 1][0]
+        rate_limited_requests.labels(self.route, scope).inc()
+        raise HTTPException(
+            status_code=429,
+            detail='Too many requests',
+            headers={'Retry-After': str(max(1, math.ceil(int(retry_after_ms) / 1000)))}
+        )
+
+
+def apply_rate_limits(router: APIRouter, limits: dict[str, RouteLimits]) -> None:
+    """
+    Puts a RateLimiter in front of the dependencies of the `router` routes with a path in `limits`.
+    Must be called before the router is included in the app, which copies the route dependencies.
+    """
+    if not RATE_LIMITS_ENABLED:
+        logger.warning('RATE_LIMITS_ENABLED is false, requests are not rate limited')
+        return
+    for route in router.routes:
+        if isinstance(route, APIRoute) and route.path in limits:
+            route.dependencies.insert(0, Depends(RateLimiter(route.path, limits[route.path])))
@@ -1,7 +1,30 @@
-from fastapi import HTTPException
+import msgpack
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
 from src.services import ServiceResult
+from .content_negotiation import MSGPACK
+
 
-def handle_service_result(result: ServiceResult):
+def handle_service_result(result: ServiceResult, media_type: str | None = None):
+    """
+    Turns the service result into the response. `media_type` is set by routes negotiating
+    the encoding (see negotiate_media_type), their responses vary by the Accept header.
+    """
+    headers = dict(result.headers or {})
+    if media_type:
+        headers['Vary'] = 'Accept'
     if result.is_success:
+        if result.status_code == 304:
+            return Response(status_code=304, headers=headers)
+        if result.raw is not None:
+            # already encoded by the service, skip response_model validation and serialization
+            return Response(content=result.raw, media_type=result.media_type, headers=headers)
+        if media_type == MSGPACK and isinstance(result.data, BaseModel):
+            return Response(content=msgpack.packb(result.data.model_dump(mode='json')), media_type=MSGPACK, headers=headers)
+        if headers:
+            return JSONResponse(content=jsonable_encoder(result.data), headers=headers)
         return result.data
-    raise HTTPException(status_code=result.status_code if result.status_code else 500, detail=result.error)
\ No newline at end of file
+    raise HTTPException(status_code=result.status_code if result.status_code else 500, detail=result.error)
@@ -1,12 +1,11 @@
 import asyncio
 from logging.config import fileConfig
 
-from environs import Env
-from sqlalchemy import pool, URL
+from sqlalchemy import pool
 from sqlalchemy.engine import Connection
-from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 
+from src.database.engine import create_engine, database_url
 from src.database.models import *
 
 config = context.config
@@ -14,20 +13,10 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-env = Env()
-env.read_env('.env')
+url = database_url().render_as_string(hide_password=False)
 
-# url = URL.create( # for production
-#     drivername='postgresql+asyncpg',
-#     username=env.str('POSTGRES_USER'),
-#     password=env.str('POSTGRES_PASSWORD'),
-#     host=env.str('POSTGRES_HOST'),
-#     database=env.str('POSTGRES_DB'),
-#     port=5432
-# ).render_as_string(hide_password=False)
-url = "sqlite+aiosqlite:///database.db" # for testing purposes
-
-config.set_main_option("sqlalchemy.url", str(url))
+# percent signs of an escaped password would be taken for config interpolation
+config.set_main_option("sqlalchemy.url", url.replace('%', '%%'))
 
 target_metadata = Base.metadata
 
@@ -69,9 +58,8 @@ async def run_async_migrations() -> None:
 
     """
 
-    connectable = async_engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
+    connectable = create_engine(
+        config.get_main_option("sqlalchemy.url"),
         poolclass=pool.NullPool,
     )
 
@@ -0,0 +1,46 @@
+"""lesson sessions
+
+Revision ID: 5b9e2f4c7d1a
+Revises: a3f5c8d1e2b7
+Create Date: 2026-10-18 16:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9e2f4c7d1a'
+down_revision: Union[str, Sequence[str], None] = 'a3f5c8d1e2b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('lesson_sessions',
+    sa.Column('session_id', sa.String(length=64), nullable=False, comment='ID of the session'),
+    sa.Column('user_id', sa.BIGINT(), nullable=False, comment='ID of the user passing the lesson'),
+    sa.Column('lesson_id', sa.INTEGER(), nullable=False, comment='ID of the lesson being passed'),
+    sa.Column('language_id', sa.INTEGER(), nullable=False, comment='ID of the programming language of the lesson'),
+    sa.Column('started_at', sa.BIGINT(), nullable=False, comment='Unix timestamp of the lesson start'),
+    sa.Column('total', sa.INTEGER(), nullable=False, comment='Number of questions in the lesson'),
+    sa.Column('solved', sa.INTEGER(), nullable=False, comment='Number of questions answered correctly'),
+    sa.Column('wrong', sa.INTEGER(), nullable=False, comment='Number of questions with a wrong attempt'),
+    sa.Column('answered', sa.INTEGER(), nullable=False, comment='Number of questions with an attempt'),
+    sa.Column('completed', sa.BOOLEAN(), nullable=False, comment='Set once the lesson is completed'),
+    sa.Column('questions', sa.TEXT(), nullable=False, comment='JSON object of question id to [correct answer id, state]'),
+    sa.Column('xp_earned', sa.INTEGER(), nullable=True, comment='XP earned, set once the result is saved'),
+    sa.Column('success_percent', sa.INTEGER(), nullable=True, comment='Success percentage, set once the result is saved'),
+    sa.Column('version', sa.INTEGER(), nullable=False, comment='Row version for optimistic locking'),
+    sa.PrimaryKeyConstraint('session_id')
+    )
+    op.create_index('ix_lesson_sessions_started_at', 'lesson_sessions', ['started_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_lesson_sessions_started_at', table_name='lesson_sessions')
+    op.drop_table('lesson_sessions')
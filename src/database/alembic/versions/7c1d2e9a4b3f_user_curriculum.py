@@ -0,0 +1,37 @@
+"""user curriculum
+
+Revision ID: 7c1d2e9a4b3f
+Revises: 349e007e0957
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1d2e9a4b3f'
+down_revision: Union[str, Sequence[str], None] = '349e007e0957'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A missing row means completed_through = 0, so existing users need no backfill:
+    # their pointer moves forward on the next completed lesson.
+    op.create_table('user_curriculum',
+    sa.Column('user_id', sa.BIGINT(), nullable=False, comment='ID of the user'),
+    sa.Column('language_id', sa.INTEGER(), nullable=False, comment='ID of the programming language'),
+    sa.Column('completed_through', sa.INTEGER(), server_default='0', nullable=False, comment='Every lesson of the language with id up to this one is completed by the user'),
+    sa.ForeignKeyConstraint(['language_id'], ['programming_languages.language_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'language_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_curriculum')
@@ -0,0 +1,34 @@
+"""hot query indexes
+
+Revision ID: a3f5c8d1e2b7
+Revises: 7c1d2e9a4b3f
+Create Date: 2026-10-18 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f5c8d1e2b7'
+down_revision: Union[str, Sequence[str], None] = '7c1d2e9a4b3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_user_progress_user_id_lesson_id', 'user_progress', ['user_id', 'lesson_id'], unique=False)
+    op.create_index(op.f('ix_questions_lesson_id'), 'questions', ['lesson_id'], unique=False)
+    op.create_index(op.f('ix_answers_question_id'), 'answers', ['question_id'], unique=False)
+    op.create_index('ix_lessons_language_id_lesson_id', 'lessons', ['language_id', 'lesson_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_lessons_language_id_lesson_id', table_name='lessons')
+    op.drop_index(op.f('ix_answers_question_id'), table_name='answers')
+    op.drop_index(op.f('ix_questions_lesson_id'), table_name='questions')
+    op.drop_index('ix_user_progress_user_id_lesson_id', table_name='user_progress')
@@ -0,0 +1,51 @@
+"""backfill user curriculum
+
+Revision ID: e4a7c2b9d6f1
+Revises: 5b9e2f4c7d1a
+Create Date: 2026-10-18 18:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2b9d6f1'
+down_revision: Union[str, Sequence[str], None] = '5b9e2f4c7d1a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The next lesson is now read right after the pointer, so users with progress older than
+    # the user_curriculum table get their pointer: right before the first lesson of the language
+    # they have not completed, or at the last lesson when every lesson is completed.
+    op.execute("""
+        INSERT INTO user_curriculum (user_id, language_id, completed_through)
+        SELECT progress.user_id, lessons.language_id, COALESCE(
+            (
+                SELECT MIN(unfinished.lesson_id) - 1 FROM lessons AS unfinished
+                WHERE unfinished.language_id = lessons.language_id
+                AND NOT EXISTS (
+                    SELECT 1 FROM user_progress AS completed
+                    WHERE completed.user_id = progress.user_id AND completed.lesson_id = unfinished.lesson_id
+                )
+            ),
+            (SELECT MAX(last.lesson_id) FROM lessons AS last WHERE last.language_id = lessons.language_id)
+        )
+        FROM user_progress AS progress
+        JOIN lessons ON lessons.lesson_id = progress.lesson_id
+        WHERE NOT EXISTS (
+            SELECT 1 FROM user_curriculum AS pointer
+            WHERE pointer.user_id = progress.user_id AND pointer.language_id = lessons.language_id
+        )
+        GROUP BY progress.user_id, lessons.language_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pointers are kept up to date by the application, there is nothing to undo
+    pass
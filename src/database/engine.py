@@ -0,0 +1,96 @@
+"""
+Builds the async engine from the environment.
+
+DB_BACKEND selects the database: `sqlite` (default) or `postgresql`.
+DATABASE_URL overrides the URL built from the variables below.
+
+SQLite:
+    SQLITE_PATH            - database file, `database.db` by default
+    SQLITE_JOURNAL_MODE    - WAL lets readers work while a writer commits
+    SQLITE_SYNCHRONOUS     - NORMAL is durable with WAL except for the last commits on power loss
+    SQLITE_BUSY_TIMEOUT_MS - how long a connection waits for a lock instead of failing with `database is locked`
+    SQLITE_MMAP_SIZE       - bytes of the database file read through mmap, 0 disables it
+
+PostgreSQL (asyncpg):
+    POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT, POSTGRES_DB
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING
+    DB_STATEMENT_CACHE_SIZE - prepared statements cached per connection, set 0 behind pgbouncer
+"""
+from environs import Env
+from sqlalchemy import URL, event, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+env = Env()
+env.read_env('.env')
+
+SQLITE = 'sqlite'
+POSTGRESQL = 'postgresql'
+
+
+def database_url() -> URL:
+    url = env.str('DATABASE_URL', None)
+    if url:
+        return make_url(url)
+
+    backend = env.str('DB_BACKEND', SQLITE)
+    if backend == SQLITE:
+        return make_url(f"sqlite+aiosqlite:///{env.str('SQLITE_PATH', 'database.db')}")
+    if backend == POSTGRESQL:
+        return URL.create(
+            drivername='postgresql+asyncpg',
+            username=env.str('POSTGRES_USER'),
+            password=env.str('POSTGRES_PASSWORD'),
+            host=env.str('POSTGRES_HOST'),
+            port=env.int('POSTGRES_PORT', 5432),
+            database=env.str('POSTGRES_DB'),
+        )
+    raise ValueError(f'Unknown DB_BACKEND {backend}')
+
+
+def sqlite_pragmas() -> dict[str, str | int]:
+    return {
+        'journal_mode': env.str('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': env.str('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': env.int('SQLITE_BUSY_TIMEOUT_MS', 5000),
+        'mmap_size': env.int('SQLITE_MMAP_SIZE', 268435456),  # 256 MB
+    }
+
+
+def _apply_sqlite_pragmas(engine: AsyncEngine, pragmas: dict[str, str | int]) -> None:
+    @event.listens_for(engine.sync_engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+def create_engine(url: URL | str | None = None, pragmas: dict[str, str | int] | None = None, **kwargs) -> AsyncEngine:
+    """
+    Creates the engine for the configured (or the given) URL. Keyword arguments override the configured
+    engine options, e.g. poolclass for one-off scripts. SQLite connections get `pragmas`
+    (the configured ones by default) on connect.
+    """
+    url = make_url(url) if url is not None else database_url()
+
+    if url.get_backend_name() == SQLITE:
+        options = {'connect_args': {'check_same_thread': False}}
+    else:
+        statement_cache_size = env.int('DB_STATEMENT_CACHE_SIZE', 100)
+        url = url.update_query_dict({'prepared_statement_cache_size': str(statement_cache_size)})
+        options = {'connect_args': {'statement_cache_size': statement_cache_size}}
+        # a custom pool class (NullPool for migrations) does not take the queue pool options
+        if 'poolclass' not in kwargs:
+            options.update(
+                pool_size=env.int('DB_POOL_SIZE', 10),
+                max_overflow=env.int('DB_MAX_OVERFLOW', 20),
+                pool_timeout=env.float('DB_POOL_TIMEOUT', 30),
+                pool_recycle=env.int('DB_POOL_RECYCLE', 1800),
+                pool_pre_ping=env.bool('DB_POOL_PRE_PING', True),
+            )
+    options.update(kwargs)
+
+    engine = create_async_engine(url, echo=env.bool('DB_ECHO', False), **options)
+    if url.get_backend_name() == SQLITE:
+        _apply_sqlite_pragmas(engine, sqlite_pragmas() if pragmas is None else pragmas)
+    return engine
@@ -5,3 +5,5 @@ from .user_progress import UserProgressModel
 from .p_language import PLanguageModel
 from .question import QuestionModel
 from .answer import AnswerModel
+from .user_curriculum import UserCurriculumModel
+from .lesson_session import LessonSessionModel
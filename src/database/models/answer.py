@@ -12,5 +12,5 @@ class AnswerModel(Base):
 
 
     # relationships
-    question_id: Mapped[int] = mapped_column(ForeignKey('questions.question_id'), nullable=False, comment='ID of the question this answer belongs to')
+    question_id: Mapped[int] = mapped_column(ForeignKey('questions.question_id'), nullable=False, index=True, comment='ID of the question this answer belongs to')
     question: Mapped['QuestionModel'] = relationship(back_populates='answers')
\ No newline at end of file
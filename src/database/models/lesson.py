@@ -1,10 +1,14 @@
-from sqlalchemy import INTEGER, String, ForeignKey, BOOLEAN
+from sqlalchemy import INTEGER, String, ForeignKey, BOOLEAN, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
 
 class LessonModel(Base):
     __tablename__ = 'lessons'
+    __table_args__ = (
+        # curriculum of a language in lesson order: next lesson lookup and catalog pages
+        Index('ix_lessons_language_id_lesson_id', 'language_id', 'lesson_id'),
+    )
 
     lesson_id: Mapped[int] = mapped_column(INTEGER, primary_key=True, autoincrement=True, comment='Unique identifier for the lesson')
     title: Mapped[str] = mapped_column(String(100), nullable=False, comment='Title of the lesson')
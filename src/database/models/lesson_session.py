@@ -0,0 +1,33 @@
+from sqlalchemy import INTEGER, BIGINT, BOOLEAN, TEXT, String, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+class LessonSessionModel(Base):
+    """
+    Lesson session started while Redis was unavailable. Sessions normally live in Redis only,
+    these rows follow the same rules, see src/services/database_sessions.py.
+    Concurrent answer checks are serialized by the row version.
+    """
+    __tablename__ = 'lesson_sessions'
+    __table_args__ = (
+        # expired sessions are purged by the start time
+        Index('ix_lesson_sessions_started_at', 'started_at'),
+    )
+
+    session_id: Mapped[str] = mapped_column(String(64), primary_key=True, comment='ID of the session')
+    user_id: Mapped[int] = mapped_column(BIGINT, nullable=False, comment='ID of the user passing the lesson')
+    lesson_id: Mapped[int] = mapped_column(INTEGER, nullable=False, comment='ID of the lesson being passed')
+    language_id: Mapped[int] = mapped_column(INTEGER, nullable=False, default=0, comment='ID of the programming language of the lesson')
+    started_at: Mapped[int] = mapped_column(BIGINT, nullable=False, comment='Unix timestamp of the lesson start')
+    total: Mapped[int] = mapped_column(INTEGER, nullable=False, comment='Number of questions in the lesson')
+    solved: Mapped[int] = mapped_column(INTEGER, nullable=False, default=0, comment='Number of questions answered correctly')
+    wrong: Mapped[int] = mapped_column(INTEGER, nullable=False, default=0, comment='Number of questions with a wrong attempt')
+    answered: Mapped[int] = mapped_column(INTEGER, nullable=False, default=0, comment='Number of questions with an attempt')
+    completed: Mapped[bool] = mapped_column(BOOLEAN, nullable=False, default=False, comment='Set once the lesson is completed')
+    questions: Mapped[str] = mapped_column(TEXT, nullable=False, comment='JSON object of question id to [correct answer id, state]')
+    xp_earned: Mapped[int | None] = mapped_column(INTEGER, nullable=True, comment='XP earned, set once the result is saved')
+    success_percent: Mapped[int | None] = mapped_column(INTEGER, nullable=True, comment='Success percentage, set once the result is saved')
+    version: Mapped[int] = mapped_column(INTEGER, nullable=False, comment='Row version for optimistic locking')
+
+    __mapper_args__ = {'version_id_col': version}
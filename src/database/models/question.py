@@ -10,7 +10,7 @@ class QuestionModel(Base):
     question_text: Mapped[str] = mapped_column(String(500), nullable=False, comment='Question text')
 
     # relationships
-    lesson_id: Mapped[int] = mapped_column(ForeignKey('lessons.lesson_id'), comment="ID of the lesson this question belongs to")
+    lesson_id: Mapped[int] = mapped_column(ForeignKey('lessons.lesson_id'), index=True, comment="ID of the lesson this question belongs to")
     lesson: Mapped['LessonModel'] = relationship(back_populates='questions')
 
     answers: Mapped[list['AnswerModel']] = relationship('AnswerModel',
@@ -0,0 +1,16 @@
+from sqlalchemy import INTEGER, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+class UserCurriculumModel(Base):
+    """
+    Position of the user in the curriculum of a programming language.
+    Lessons are passed in the order of their ids, so instead of scanning the whole progress history
+    the next lesson is looked up right after `completed_through`.
+    """
+    __tablename__ = 'user_curriculum'
+
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.user_id'), primary_key=True, comment='ID of the user')
+    language_id: Mapped[int] = mapped_column(ForeignKey('programming_languages.language_id'), primary_key=True, comment='ID of the programming language')
+    completed_through: Mapped[int] = mapped_column(INTEGER, nullable=False, default=0, server_default='0', comment='Every lesson of the language with id up to this one is completed by the user')
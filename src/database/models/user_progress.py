@@ -1,12 +1,16 @@
 from datetime import datetime
 
-from sqlalchemy import INTEGER, TIMESTAMP, func, ForeignKey
+from sqlalchemy import INTEGER, TIMESTAMP, func, ForeignKey, Index
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 
 from .base import Base
 
 class UserProgressModel(Base):
     __tablename__ = 'user_progress'
+    __table_args__ = (
+        # covers the "lessons completed by the user" subquery
+        Index('ix_user_progress_user_id_lesson_id', 'user_id', 'lesson_id'),
+    )
 
     progress_id: Mapped[int] = mapped_column(INTEGER, primary_key=True, autoincrement=True, comment='Unique identifier for the user progress record')
     completed_at: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=False, default=func.now(), comment='Timestamp when the lesson was completed')
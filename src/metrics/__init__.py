@@ -0,0 +1,5 @@
+from .registry import Counter, Gauge, Histogram, Registry, REGISTRY, LATENCY_BUCKETS, CALL_COUNT_BUCKETS
+from .dependencies import RequestStats, request_stats, record_dependency_call, SQL, REDIS, SQL_QUERY_WARN_THRESHOLD
+from .sql import instrument_engine
+from .http import MetricsMiddleware, metrics_endpoint
+from .events import log_event, LOG_SAMPLE_RATE
@@ -0,0 +1,62 @@
+import os
+from contextvars import ContextVar
+
+from .registry import Counter, Histogram, CALL_COUNT_BUCKETS
+
+SQL = 'sql'
+REDIS = 'redis'
+DEPENDENCIES = (SQL, REDIS)
+
+dependency_calls = Counter(
+    'app_dependency_calls_total', 'SQL statements and Redis calls (a pipeline is one call), background work included',
+    ('dependency',)
+)
+dependency_seconds = Counter(
+    'app_dependency_seconds_total', 'Seconds spent in SQL statements and Redis calls, background work included',
+    ('dependency',)
+)
+request_dependency_calls = Histogram(
+    'http_request_dependency_calls', 'SQL statements and Redis calls made by one request',
+    ('route', 'dependency'), buckets=CALL_COUNT_BUCKETS
+)
+request_dependency_seconds = Histogram(
+    'http_request_dependency_seconds', 'Seconds one request spent in SQL statements and Redis calls',
+    ('route', 'dependency')
+)
+
+# dev mode: requests running more SQL statements are logged with the statements, 0 disables the check
+SQL_QUERY_WARN_THRESHOLD = int(os.getenv('SQL_QUERY_WARN_THRESHOLD', 0))
+
+_calls = {dependency: dependency_calls.labels(dependency) for dependency in DEPENDENCIES}
+_seconds = {dependency: dependency_seconds.labels(dependency) for dependency in DEPENDENCIES}
+
+
+class RequestStats:
+    """
+    Dependency calls made while handling one request. Shared by reference with the contexts
+    copied from the request context (SQLAlchemy greenlets, tasks), so their calls are counted too.
+    The SQL statements themselves are kept only when `statements` is a list (dev mode).
+    """
+    __slots__ = ('calls', 'seconds', 'statements')
+
+    def __init__(self, record_statements: bool = False):
+        self.calls = dict.fromkeys(DEPENDENCIES, 0)
+        self.seconds = dict.fromkeys(DEPENDENCIES, 0.0)
+        self.statements: list[str] | None = [] if record_statements else None
+
+    def observe(self, route: str) -> None:
+        for dependency in DEPENDENCIES:
+            request_dependency_calls.labels(route, dependency).observe(self.calls[dependency])
+            request_dependency_seconds.labels(route, dependency).observe(self.seconds[dependency])
+
+
+request_stats: ContextVar[RequestStats | None] = ContextVar('request_stats', default=None)
+
+
+def record_dependency_call(dependency: str, seconds: float) -> None:
+    _calls[dependency].inc()
+    _seconds[dependency].inc(seconds)
+    stats = request_stats.get()
+    if stats is not None:
+        stats.calls[dependency] += 1
+        stats.seconds[dependency] += seconds
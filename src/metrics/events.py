@@ -0,0 +1,22 @@
+import logging
+import os
+import random
+
+# share of the hot path events that are logged, e.g. 0.01 logs one in a hundred
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 0.01))
+
+
+def log_event(logger: logging.Logger, event: str, sample_rate: float = LOG_SAMPLE_RATE, level: int = logging.INFO, **fields) -> None:
+    """
+    Logs a structured event (`lesson_cached lesson_id=1 questions=10 sample_rate=0.01`) for a sample
+    of the calls. The fields are also attached to the record as `event` and `fields` for structured handlers.
+    """
+    if sample_rate < 1 and random.random() >= sample_rate:
+        return
+    if not logger.isEnabledFor(level):
+        return
+    fields['sample_rate'] = sample_rate
+    logger.log(
+        level, '%s %s', event, ' '.join(f'{name}={value}' for name, value in fields.items()),
+        extra={'event': event, 'fields': fields}
+    )
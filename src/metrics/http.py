@@ -0,0 +1,89 @@
+import hmac
+import logging
+import os
+import time
+from collections import Counter as StatementCounter
+
+from fastapi import Header, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .dependencies import RequestStats, request_stats, SQL, SQL_QUERY_WARN_THRESHOLD
+from .registry import Counter, Gauge, Histogram, REGISTRY
+
+# requests no route matched (404s of scanners etc.) share one label value, their paths are unbounded
+UNMATCHED_ROUTE = 'unmatched'
+
+requests_total = Counter('http_requests_total', 'Handled requests', ('method', 'route', 'status'))
+request_duration = Histogram('http_request_duration_seconds', 'Request latency', ('method', 'route'))
+requests_in_progress = Gauge('http_requests_in_progress', 'Requests being handled', ('method',))
+
+logger = logging.getLogger('metrics')
+
+# bearer token scrapers send to GET /metrics, the metrics are not served at all without it
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+
+def _warn_about_queries(method: str, route: str, stats: RequestStats) -> None:
+    """
+    Dev mode N+1 guard: statements run more than once by one request are listed first.
+    """
+    repeated = [f'{count}x {statement}' for statement, count in StatementCounter(stats.statements).most_common() if count > 1]
+    logger.warning(
+        f'{method} {route} ran {stats.calls[SQL]} SQL statements (threshold {SQL_QUERY_WARN_THRESHOLD})'
+        + (''.join(f'\n    {statement}' for statement in repeated) if repeated else '')
+    )
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency, status and in-flight count of every request,
+    labeled by the route template (`/api/lessons/result/{session_id}`), not by the raw path.
+    Also observes the SQL and Redis calls made by the request, see record_dependency_call.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        in_progress = requests_in_progress.labels(method)
+        in_progress.inc()
+        stats = RequestStats(record_statements=bool(SQL_QUERY_WARN_THRESHOLD))
+        token = request_stats.set(stats)
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            request_stats.reset(token)
+            in_progress.dec()
+            route = scope.get('route')
+            route = route.path if route is not None else UNMATCHED_ROUTE
+            requests_total.labels(method, route, str(status)).inc()
+            request_duration.labels(method, route).observe(elapsed)
+            stats.observe(route)
+            if SQL_QUERY_WARN_THRESHOLD and stats.calls[SQL] > SQL_QUERY_WARN_THRESHOLD:
+                _warn_about_queries(method, route, stats)
+
+
+async def metrics_endpoint(authorization: str | None = Header(None)) -> Response:
+    """
+    Metrics in the Prometheus text format, for scrapers sending `Authorization: Bearer <METRICS_TOKEN>`.
+    """
+    if not METRICS_TOKEN:
+        return Response(status_code=404)
+    scheme, _, token = (authorization or '').partition(' ')
+    if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        return Response(status_code=401, headers={'WWW-Authenticate': 'Bearer'})
+    return Response(REGISTRY.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,154 @@
+import math
+from bisect import bisect_left
+from typing import Iterable
+
+# seconds, for request and dependency latencies
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# calls made by one request
+CALL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return '{' + pairs + '}' if pairs else ''
+
+
+class _CounterValue:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class _GaugeValue(_CounterValue):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramValue:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metric:
+    """
+    A metric family: one value per combination of label values. Values are plain attributes,
+    updated without locks: the app updates them from the event loop thread only.
+    """
+    type = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), registry: 'Registry | None' = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        (registry or REGISTRY).register(self)
+
+    def _new_value(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        value = self._values.get(values)
+        if value is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f'{self.name} expects labels {self.labelnames}, got {values}')
+            value = self._values[values] = self._new_value()
+        return value
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+        for values, value in self._values.items():
+            lines.extend(self._render_value(_labels(self.labelnames, values), values, value))
+        return lines
+
+    def _render_value(self, labels: str, values: tuple[str, ...], value) -> list[str]:
+        return [f'{self.name}{labels} {_format_value(value.value)}']
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def _new_value(self) -> _CounterValue:
+        return _CounterValue()
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def _new_value(self) -> _GaugeValue:
+        return _GaugeValue()
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS, registry: 'Registry | None' = None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_value(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def _render_value(self, labels: str, values: tuple[str, ...], value: _HistogramValue) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, math.inf), value.counts):
+            cumulative += count
+            bucket_labels = _labels((*self.labelnames, 'le'), (*values, _format_value(float(bound))))
+            lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+        lines.append(f'{self.name}_sum{labels} {_format_value(value.sum)}')
+        lines.append(f'{self.name}_count{labels} {value.count}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f'Metric {metric.name} is already registered')
+        self._metrics[metric.name] = metric
+
+    def render(self) -> bytes:
+        """
+        Renders all metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return ('\n'.join(lines) + '\n').encode()
+
+
+REGISTRY = Registry()
@@ -0,0 +1,28 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .dependencies import record_dependency_call, request_stats, SQL
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Counts and times every statement the engine executes, per request too (see RequestStats).
+    """
+    @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = request_stats.get()
+        if stats is not None and stats.statements is not None:
+            stats.statements.append(statement)
+        conn.info.setdefault('statement_started_at', []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        record_dependency_call(SQL, time.perf_counter() - conn.info['statement_started_at'].pop())
+
+    @event.listens_for(engine.sync_engine, 'handle_error')
+    def handle_error(exception_context):
+        started = exception_context.connection.info.get('statement_started_at') if exception_context.connection else None
+        if started:
+            record_dependency_call(SQL, time.perf_counter() - started.pop())
@@ -2,4 +2,6 @@ from .user_repo import UserRepository
 from .p_language_repo import PLanguageRepository
 from .lesson_repo import LessonRepository
 from .question_repo import QuestionRepository
-from .lessons_repo import LessonsRepository
\ No newline at end of file
+from .lessons_repo import LessonsRepository
+from .leaderboard_repo import LeaderboardRepository
+from .lesson_session_repo import LessonSessionRepository
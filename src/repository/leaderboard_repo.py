@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import UserModel, UserProgressModel, LessonModel
+
+
+class LeaderboardRepository:
+    def __init__(self, session: AsyncSession):
+        self.db_session = session
+
+    async def get_first_names(self, user_ids: list[int]) -> dict[int, str]:
+        if not user_ids:
+            return {}
+        query = select(UserModel.user_id, UserModel.first_name).where(UserModel.user_id.in_(user_ids))
+        result = await self.db_session.execute(query)
+        return {user_id: first_name for user_id, first_name in result.all()}
+
+    async def get_total_xp(self) -> dict[int, int]:
+        query = select(UserModel.user_id, UserModel.xp).where(UserModel.xp > 0)
+        result = await self.db_session.execute(query)
+        return {user_id: xp for user_id, xp in result.all()}
+
+    async def get_xp_by_language(self) -> dict[int, dict[int, int]]:
+        query = (
+            select(LessonModel.language_id, UserProgressModel.user_id, func.sum(UserProgressModel.xp_earned))
+            .join(LessonModel, LessonModel.lesson_id == UserProgressModel.lesson_id)
+            .group_by(LessonModel.language_id, UserProgressModel.user_id)
+        )
+        result = await self.db_session.execute(query)
+        scores: dict[int, dict[int, int]] = {}
+        for language_id, user_id, xp in result.all():
+            scores.setdefault(language_id, {})[user_id] = xp
+        return scores
+
+    async def get_xp_since(self, since: datetime) -> dict[int, int]:
+        query = (
+            select(UserProgressModel.user_id, func.sum(UserProgressModel.xp_earned))
+            .where(UserProgressModel.completed_at >= since)
+            .group_by(UserProgressModel.user_id)
+        )
+        result = await self.db_session.execute(query)
+        return {user_id: xp for user_id, xp in result.all()}
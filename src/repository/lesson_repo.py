@@ -1,5 +1,3 @@
-from typing import Sequence
-
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
@@ -11,11 +9,6 @@ class LessonRepository:
     def __init__(self, session: AsyncSession):
         self.db_session = session
 
-    async def all_lessons(self) -> Sequence[LessonModel]:
-        query = select(LessonModel)
-        result = await self.db_session.execute(query)
-        return result.scalars().all()
-
     async def get_lesson_by_id(self, lesson_id: int) -> LessonModel | None:
         query = (
             select(LessonModel)
@@ -0,0 +1,51 @@
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+
+from src.database.models import LessonSessionModel
+
+
+class LessonSessionRepository:
+    def __init__(self, session: AsyncSession):
+        self.db_session = session
+
+    async def replace_session(self, lesson_session: LessonSessionModel, started_before: int) -> None:
+        """
+        Stores the session instead of a previous one with the same id and purges sessions started before `started_before`.
+        """
+        try:
+            await self.db_session.execute(
+                delete(LessonSessionModel).where(
+                    (LessonSessionModel.session_id == lesson_session.session_id)
+                    | (LessonSessionModel.started_at < started_before)
+                )
+            )
+            self.db_session.add(lesson_session)
+            await self.db_session.commit()
+        except Exception as e:
+            await self.db_session.rollback()
+            raise e
+
+    async def get_session(self, session_id: str) -> LessonSessionModel | None:
+        query = (
+            select(LessonSessionModel)
+            .where(LessonSessionModel.session_id == session_id)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db_session.execute(query)
+        return result.scalars().first()
+
+    async def save_session(self) -> bool:
+        """
+        Commits the changes of the read session. Returns False, with the changes rolled back,
+        when another request changed the session since it was read.
+        """
+        try:
+            await self.db_session.commit()
+            return True
+        except StaleDataError:
+            await self.db_session.rollback()
+            return False
+        except Exception as e:
+            await self.db_session.rollback()
+            raise e
@@ -1,52 +1,139 @@
-from datetime import datetime, timedelta
+import logging
+from datetime import datetime, timedelta, timezone
 from typing import Sequence
 import pytz
 
-from sqlalchemy import select
+from sqlalchemy import select, func, insert, exists, Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 
-from src.database.models import LessonModel, UserProgressModel, QuestionModel, UserModel
+from src.database.models import LessonModel, UserProgressModel, QuestionModel, UserModel, UserCurriculumModel, \
+    AnswerModel, PLanguageModel
+from src.schemas.tests_schemas import LessonImportBundle
+
+logger = logging.getLogger('lessons_repository')
 
 
 class LessonsRepository:
     def __init__(self, session: AsyncSession):
         self.db_session = session
 
-    async def get_unfinished_lesson_with_tests(self, user_id: int, need_user: bool = False) -> LessonModel:
-        if need_user:
-            user = await self.db_session.get(UserModel, user_id)
-            if not user:
-                raise ValueError(f'User with id {user_id} not found')
-            if user.last_lesson_date:
-                user_timezone = pytz.timezone(str(user.timezone)) if user.timezone else pytz.UTC
-                last_date = user.last_lesson_date.astimezone(user_timezone).date()
-                today = datetime.now(user_timezone).date()
-
-                if last_date == today:
-                    raise ValueError('User has already completed a lesson today')
+    @staticmethod
+    def _completed_through(user_id: int, language_id: int):
+        """
+        The user's curriculum pointer, read by its primary key, 0 when the user has none yet.
+        """
+        return func.coalesce(
+            select(UserCurriculumModel.completed_through)
+            .where(
+                UserCurriculumModel.user_id == user_id,
+                UserCurriculumModel.language_id == language_id
+            )
+            .scalar_subquery(),
+            0
+        )
 
-        query = (
+    def _next_lesson_query(self, user_id: int, language_id: int):
+        """
+        First lesson of the language not completed by the user. The curriculum pointer stops right before it,
+        so it is the first lesson after the pointer and the user's progress history is not read at all.
+        """
+        return (
             select(LessonModel)
             .where(
-                ~LessonModel.lesson_id.in_(
-                    select(UserProgressModel.lesson_id)
-                    .where(UserProgressModel.user_id == user_id)
+                LessonModel.language_id == language_id,
+                LessonModel.lesson_id > self._completed_through(user_id, language_id)
+            )
+            .order_by(LessonModel.lesson_id)
+            .limit(1)
+        )
+
+    def _next_unfinished_lesson_id_query(self, user_id: int, language_id: int):
+        """
+        First lesson after the curriculum pointer without a progress record of the user, where the pointer
+        moves to after a completed lesson. Lessons completed ahead of the pointer are skipped
+        with one index lookup each.
+        """
+        return (
+            select(LessonModel.lesson_id)
+            .where(
+                LessonModel.language_id == language_id,
+                LessonModel.lesson_id > self._completed_through(user_id, language_id),
+                ~exists().where(
+                    UserProgressModel.user_id == user_id,
+                    UserProgressModel.lesson_id == LessonModel.lesson_id
                 )
             )
             .order_by(LessonModel.lesson_id)
             .limit(1)
         )
 
+    async def get_unfinished_lesson_with_tests(self, user_id: int, language_id: int) -> LessonModel:
+        """
+        Returns the next lesson of the user in the given language.
+        """
+        result = await self.db_session.execute(self._next_lesson_query(user_id, language_id))
+        return result.scalars().first()
+
+    async def _advance_curriculum(self, user_id: int, lesson_id: int) -> None:
+        """
+        Moves the user's curriculum pointer after a completed lesson. The pointer stops right before
+        the next unfinished lesson, or at the last lesson of the language when all of them are completed.
+        Must be called after the progress record is added to the session.
+        """
+        language_id = await self.db_session.scalar(
+            select(LessonModel.language_id).where(LessonModel.lesson_id == lesson_id)
+        )
+        if language_id is None:
+            return
+        pointer = await self.db_session.get(UserCurriculumModel, (user_id, language_id))
+        if pointer and lesson_id <= pointer.completed_through:
+            return
+
+        next_lesson_id = await self.db_session.scalar(self._next_unfinished_lesson_id_query(user_id, language_id))
+        if next_lesson_id is not None:
+            completed_through = next_lesson_id - 1
+        else:
+            completed_through = await self.db_session.scalar(
+                select(func.max(LessonModel.lesson_id)).where(LessonModel.language_id == language_id)
+            )
+
+        if pointer is None:
+            self.db_session.add(UserCurriculumModel(
+                user_id=user_id,
+                language_id=language_id,
+                completed_through=completed_through
+            ))
+        else:
+            pointer.completed_through = completed_through
+
+    async def get_lessons_page(self, language_id: int | None = None, cursor: int = 0, limit: int = 50) -> Sequence[Row]:
+        """
+        Returns up to `limit` lessons with an id greater than `cursor`, in lesson order.
+        Only the catalog columns are read, rows have the same attribute names as LessonModel.
+        """
+        query = (
+            select(LessonModel.lesson_id, LessonModel.language_id, LessonModel.title, LessonModel.description)
+            .where(LessonModel.lesson_id > cursor)
+            .order_by(LessonModel.lesson_id)
+            .limit(limit)
+        )
+        if language_id is not None:
+            query = query.where(LessonModel.language_id == language_id)
         result = await self.db_session.execute(query)
-        return result.unique().scalars().first()
+        return result.all()
 
-    async def get_all_lessons(self) -> Sequence[LessonModel]:
-        query = select(LessonModel)
+    async def get_all_lessons_with_questions(self, lesson_ids: Sequence[int] | None = None) -> Sequence[LessonModel]:
+        query = (
+            select(LessonModel)
+            .order_by(LessonModel.lesson_id)
+            .options(selectinload(LessonModel.questions).selectinload(QuestionModel.answers))
+        )
+        if lesson_ids is not None:
+            query = query.where(LessonModel.lesson_id.in_(lesson_ids))
         result = await self.db_session.execute(query)
         return result.scalars().all()
 
-
     async def create_lesson(self, title: str, description: str, language_id: int) -> LessonModel:
         try:
             new_lesson = LessonModel(title=title,
@@ -60,6 +147,51 @@ class LessonsRepository:
             await self.db_session.rollback()
             raise e
 
+    async def get_existing_language_ids(self, language_ids: set[int]) -> set[int]:
+        query = select(PLanguageModel.language_id).where(PLanguageModel.language_id.in_(language_ids))
+        result = await self.db_session.execute(query)
+        return set(result.scalars().all())
+
+    async def import_lesson(self, bundle: LessonImportBundle) -> int:
+        """
+        Inserts the lesson with its questions and answers in one transaction: one statement per table,
+        questions and answers are sent as batched multi-row inserts. Returns the id of the new lesson.
+        """
+        try:
+            lesson_id = (await self.db_session.execute(
+                insert(LessonModel)
+                .values(title=bundle.title, description=bundle.description, language_id=bundle.language_id)
+                .returning(LessonModel.lesson_id)
+            )).scalar_one()
+
+            question_ids = (await self.db_session.execute(
+                insert(QuestionModel).returning(QuestionModel.question_id, sort_by_parameter_order=True),
+                [{'question_text': question.text, 'lesson_id': lesson_id} for question in bundle.questions]
+            )).scalars().all()
+
+            await self.db_session.execute(
+                insert(AnswerModel),
+                [
+                    {'answer_text': answer.text, 'is_correct': int(answer.is_correct), 'question_id': question_id}
+                    for question_id, question in zip(question_ids, bundle.questions)
+                    for answer in question.answers
+                ]
+            )
+            await self.db_session.commit()
+            return lesson_id
+        except Exception as e:
+            await self.db_session.rollback()
+            raise e
+
+    async def get_user_with_language(self, user_id: int) -> UserModel | None:
+        query = (
+            select(UserModel)
+            .where(UserModel.user_id == user_id)
+            .options(joinedload(UserModel.active_language))
+        )
+        result = await self.db_session.execute(query)
+        return result.scalars().first()
+
     async def get_lesson_by_id(self, lesson_id: int) -> LessonModel:
         query = (
             select(LessonModel)
@@ -72,7 +204,41 @@ class LessonsRepository:
         result = await self.db_session.execute(query)
         return result.unique().scalars().first()
 
-    async def save_user_progress(self, user_id: int, lesson_id: int, xp_earned: int, success_percent: int):
+    @staticmethod
+    def _apply_user_progress(user: UserModel, xp_earned: int, completed_at: datetime | None = None) -> None:
+        """
+        Adds the earned XP to the user and updates the streak. `completed_at` defaults to now.
+        """
+        timezone_str = user.timezone if user.timezone else 'UTC'
+        try:
+            user_timezone = pytz.timezone(timezone_str)
+        except pytz.exceptions.UnknownTimeZoneError:
+            logger.warning(f"Unknown timezone {timezone_str!r} of user {user.user_id}, the streak is counted in UTC")
+            user_timezone = pytz.UTC
+
+        now = completed_at.astimezone(user_timezone) if completed_at else datetime.now(user_timezone)
+        today = now.date()
+
+        # the user is validated before anything is changed, so a rejected result leaves it untouched
+        if user.last_lesson_date is None:
+            streak = 1
+        else:
+            last_date = user.last_lesson_date.astimezone(user_timezone).date()
+            if last_date == today:
+                raise ValueError('User has already completed a lesson today')
+            elif last_date == today - timedelta(days=1):
+                streak = user.streak + 1
+            else:
+                streak = 1
+
+        user.xp += xp_earned
+        user.streak = streak
+        user.last_lesson_date = now
+
+    async def save_user_progress(self, user_id: int, lesson_id: int, xp_earned: int, success_percent: int) -> UserModel:
+        """
+        Saves a completed lesson and returns the updated user.
+        """
         try:
             progress = UserProgressModel(
                 user_id=user_id,
@@ -85,35 +251,55 @@ class LessonsRepository:
             user = await self.db_session.get(UserModel, user_id)
             if not user:
                 raise ValueError(f'User with id {user_id} not found')
-            user.xp += xp_earned
-
-            # TODO check date and timezone. in the future remove it to the service layer
-            timezone_str = user.timezone if user.timezone else 'UTC'
-            try:
-                user_timezone = pytz.timezone(timezone_str)
-            except Exception as e:
-                print('Invalid timezone:', timezone_str, e)
-                user_timezone = pytz.UTC
+            self._apply_user_progress(user, xp_earned)
+            await self._advance_curriculum(user_id, lesson_id)
 
-            now = datetime.now(user_timezone)
-            today = now.date()
+            await self.db_session.commit()
+            return user
+        except Exception as e:
+            await self.db_session.rollback()
+            raise e
 
-            if user.last_lesson_date is None:
-                user.streak = 1
-            else:
-                last_date = user.last_lesson_date.astimezone(user_timezone).date()
-                if last_date == today:
-                    raise ValueError('User has already completed a lesson today')
-                elif last_date == today - timedelta(days=1):
-                    user.streak += 1
-                else:
-                    user.streak = 1
+    async def save_user_progress_batch(self, results: list[dict]) -> tuple[list[UserModel], list[dict]]:
+        """
+        Saves many completed lessons in one transaction. Every result is a dict with
+        user_id, lesson_id, xp_earned, success_percent and completed_at (aware datetime).
+        Results that can not be applied (unknown user, lesson already completed today) are skipped,
+        the rest is committed. Returns the updated users and the skipped results.
+        """
+        try:
+            user_ids = {result['user_id'] for result in results}
+            users = {
+                user.user_id: user
+                for user in (await self.db_session.execute(
+                    select(UserModel).where(UserModel.user_id.in_(user_ids))
+                )).scalars()
+            }
 
-            user.last_lesson_date = now
+            rejected = []
+            updated = {}
+            for result in results:
+                user = users.get(result['user_id'])
+                if not user:
+                    rejected.append(result)
+                    continue
+                try:
+                    self._apply_user_progress(user, result['xp_earned'], result['completed_at'])
+                except ValueError:
+                    rejected.append(result)
+                    continue
+                self.db_session.add(UserProgressModel(
+                    user_id=result['user_id'],
+                    lesson_id=result['lesson_id'],
+                    xp_earned=result['xp_earned'],
+                    success_percent=result['success_percent'],
+                    completed_at=result['completed_at'].astimezone(timezone.utc).replace(tzinfo=None)
+                ))
+                await self._advance_curriculum(result['user_id'], result['lesson_id'])
+                updated[user.user_id] = user
 
             await self.db_session.commit()
-            await self.db_session.refresh(progress)
-            return progress
+            return list(updated.values()), rejected
         except Exception as e:
             await self.db_session.rollback()
-            raise e
\ No newline at end of file
+            raise e
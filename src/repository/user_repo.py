@@ -1,10 +1,15 @@
-from sqlalchemy import select, update
+from datetime import datetime
+
+from sqlalchemy import or_, select, update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
 
 from src.database.models import UserModel
 
+# timezone of users without one
+DEFAULT_TIMEZONE = 'UTC'
+
 
 class UserRepository:
     def __init__(self, session: AsyncSession):
@@ -14,7 +19,8 @@ class UserRepository:
         query = (
             select(UserModel)
             .where(UserModel.user_id == user_id)
-            .options(selectinload(UserModel.active_language)))
+            # many-to-one, joined into the same statement instead of a second SELECT
+            .options(joinedload(UserModel.active_language)))
         result = await self.db_session.execute(query)
         return result.scalars().first()
 
@@ -33,14 +39,18 @@ class UserRepository:
             await self.db_session.rollback()
             raise e
 
-    async def update_active_language(self, user_id: int, language_id: int) -> None:
+    async def update_active_language(self, user_id: int, language_id: int) -> bool:
+        """
+        Returns False when there is no such user.
+        """
         try:
-            await self.db_session.execute(
+            result = await self.db_session.execute(
                 update(UserModel)
                 .where(UserModel.user_id == user_id)
                 .values(active_language_id=language_id)
             )
             await self.db_session.commit()
+            return result.rowcount > 0
         except SQLAlchemyError as e:
             await self.db_session.rollback()
             raise e
@@ -56,3 +66,40 @@ class UserRepository:
         except SQLAlchemyError as e:
             await self.db_session.rollback()
             raise e
+
+    async def get_timezones(self) -> list[str]:
+        """
+        Returns the timezones of the users, users without one count as UTC.
+        """
+        query = select(UserModel.timezone).distinct()
+        result = await self.db_session.execute(query)
+        return sorted({timezone or DEFAULT_TIMEZONE for timezone in result.scalars().all()})
+
+    @staticmethod
+    def _timezone_filter(timezone: str):
+        if timezone == DEFAULT_TIMEZONE:
+            return or_(UserModel.timezone == timezone, UserModel.timezone.is_(None), UserModel.timezone == '')
+        return UserModel.timezone == timezone
+
+    async def reset_lapsed_streaks(self, timezone: str, cutoff: datetime) -> list[int]:
+        """
+        Resets the streak of every user of the timezone whose last lesson was before the cutoff.
+        Returns ids of the affected users.
+        """
+        try:
+            result = await self.db_session.execute(
+                update(UserModel)
+                .where(
+                    UserModel.last_lesson_date < cutoff,
+                    self._timezone_filter(timezone),
+                    UserModel.streak > 0
+                )
+                .values(streak=0)
+                .returning(UserModel.user_id)
+            )
+            user_ids = list(result.scalars().all())
+            await self.db_session.commit()
+            return user_ids
+        except SQLAlchemyError as e:
+            await self.db_session.rollback()
+            raise e
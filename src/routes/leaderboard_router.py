@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Query
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_db, get_redis_client
+from src.core import handle_service_result
+from src.repository import LeaderboardRepository
+from src.schemas import LeaderboardResponse
+from src.services import LeaderboardService
+
+leaderboard_router = APIRouter()
+
+async def get_leaderboard_service(session: AsyncSession = Depends(get_db), redis_client: Redis = Depends(get_redis_client)) -> LeaderboardService:
+    return LeaderboardService(LeaderboardRepository(session), redis_client)
+
+@leaderboard_router.get('/global', summary='Top users by total XP', response_model=LeaderboardResponse)
+async def get_global_leaderboard(limit: int = Query(10, ge=1, le=100), user_id: int | None = None,
+                                 service: LeaderboardService = Depends(get_leaderboard_service)):
+    result = await service.get_global(limit, user_id)
+    return handle_service_result(result)
+
+@leaderboard_router.get('/language/{language_id}', summary='Top users by XP earned in a programming language', response_model=LeaderboardResponse)
+async def get_language_leaderboard(language_id: int, limit: int = Query(10, ge=1, le=100), user_id: int | None = None,
+                                   service: LeaderboardService = Depends(get_leaderboard_service)):
+    result = await service.get_language(language_id, limit, user_id)
+    return handle_service_result(result)
+
+@leaderboard_router.get('/weekly', summary='Top users by XP earned this week', response_model=LeaderboardResponse)
+async def get_weekly_leaderboard(limit: int = Query(10, ge=1, le=100), user_id: int | None = None,
+                                 service: LeaderboardService = Depends(get_leaderboard_service)):
+    result = await service.get_weekly(limit, user_id)
+    return handle_service_result(result)
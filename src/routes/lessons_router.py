@@ -1,46 +1,80 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query, Request
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.config import get_db, get_redis_client
-from src.core import handle_service_result
+from src.auth import get_current_user_id, ensure_same_user, require_admin
+from src.config import get_db, get_redis_client, get_progress_queue
+from src.core import handle_service_result, negotiate_media_type
 from src.repository import LessonsRepository
 from src.schemas.tests_schemas import StartLessonRequest, StartLessonResponse, CheckLessonAnswerResponse, \
-    CheckLessonAnswerRequest, LessonResultResponse, LessonCreateRequest, CreateLessonResponse, SimplifiedLessonResponse, \
-    ActualLessonResponse
+    CheckLessonAnswerRequest, LessonResultResponse, LessonCreateRequest, CreateLessonResponse, LessonsPageResponse, \
+    ActualLessonResponse, CheckLessonAnswersBatchRequest, CheckLessonAnswersBatchResponse, LessonImportResponse
 from src.services import LessonsService
+from src.services.lessons_service import CATALOG_PAGE_SIZE, MAX_CATALOG_PAGE_SIZE
+from src.workers import ProgressQueue
 
 lessons_router = APIRouter()
 
-async def get_lesson_service(session: AsyncSession = Depends(get_db), redis_client: Redis = Depends(get_redis_client)) -> LessonsService:
-    return LessonsService(LessonsRepository(session), redis_client)
+async def get_lesson_service(
+        session: AsyncSession = Depends(get_db),
+        redis_client: Redis = Depends(get_redis_client),
+        progress_queue: ProgressQueue | None = Depends(get_progress_queue)
+) -> LessonsService:
+    return LessonsService(LessonsRepository(session), redis_client, progress_queue)
 
 @lessons_router.post('/start', response_model=StartLessonResponse)
-async def start_lesson(request: StartLessonRequest, service: LessonsService = Depends(get_lesson_service)):
-    result = await service.start_lesson(request)
-    return handle_service_result(result)
+async def start_lesson(request: StartLessonRequest, service: LessonsService = Depends(get_lesson_service),
+                       media_type: str = Depends(negotiate_media_type), current_user_id: int = Depends(get_current_user_id)):
+    ensure_same_user(request.user_id, current_user_id)
+    result = await service.start_lesson(request, media_type)
+    return handle_service_result(result, media_type)
 
 @lessons_router.post('/check', response_model=CheckLessonAnswerResponse)
-async def check_lesson_answer(request: CheckLessonAnswerRequest, service: LessonsService = Depends(get_lesson_service)):
-    result = await service.check_lesson_answer(request)
-    return handle_service_result(result)
+async def check_lesson_answer(request: CheckLessonAnswerRequest, service: LessonsService = Depends(get_lesson_service),
+                              media_type: str = Depends(negotiate_media_type), current_user_id: int = Depends(get_current_user_id)):
+    result = await service.check_lesson_answer(request, current_user_id)
+    return handle_service_result(result, media_type)
+
+@lessons_router.post('/check-batch', response_model=CheckLessonAnswersBatchResponse)
+async def check_lesson_answers_batch(request: CheckLessonAnswersBatchRequest, service: LessonsService = Depends(get_lesson_service),
+                                     media_type: str = Depends(negotiate_media_type), current_user_id: int = Depends(get_current_user_id)):
+    result = await service.check_lesson_answers_batch(request, current_user_id)
+    return handle_service_result(result, media_type)
 
 @lessons_router.get('/result/{session_id}', response_model=LessonResultResponse)
-async def get_lesson_result(session_id: str, service: LessonsService = Depends(get_lesson_service)):
-    result = await service.get_lesson_result(session_id)
-    return handle_service_result(result)
+async def get_lesson_result(session_id: str, service: LessonsService = Depends(get_lesson_service),
+                            media_type: str = Depends(negotiate_media_type), current_user_id: int = Depends(get_current_user_id)):
+    result = await service.get_lesson_result(session_id, current_user_id)
+    return handle_service_result(result, media_type)
 
-@lessons_router.post('/add-lesson', response_model=CreateLessonResponse)
+@lessons_router.post('/add-lesson', response_model=CreateLessonResponse, dependencies=[Depends(require_admin)])
 async def create_lesson(request: LessonCreateRequest, service: LessonsService = Depends(get_lesson_service)):
     result = await service.create_lesson(request)
     return handle_service_result(result)
 
-@lessons_router.get('/all', response_model=list[SimplifiedLessonResponse])
-async def get_all_lessons(service: LessonsService = Depends(get_lesson_service)):
-    result = await service.get_all_lessons()
+@lessons_router.post('/import', response_model=LessonImportResponse, dependencies=[Depends(require_admin)])
+async def import_lessons(request: Request, service: LessonsService = Depends(get_lesson_service)):
+    """
+    Imports lessons with their questions and answers. The body is a lesson bundle, a list of them,
+    or NDJSON with one bundle per line when sent as `application/x-ndjson`.
+    """
+    ndjson = request.headers.get('content-type', '').startswith('application/x-ndjson')
+    result = await service.import_lessons(await request.body(), ndjson)
+    return handle_service_result(result)
+
+# public: the catalog is the same for everyone and cached by clients and CDNs
+@lessons_router.get('/all', response_model=LessonsPageResponse)
+async def get_all_lessons(language_id: int | None = None,
+                          cursor: int = Query(0, ge=0, description='`next_cursor` of the previous page'),
+                          limit: int = Query(CATALOG_PAGE_SIZE, ge=1, le=MAX_CATALOG_PAGE_SIZE),
+                          if_none_match: str | None = Header(None),
+                          service: LessonsService = Depends(get_lesson_service)):
+    result = await service.get_all_lessons(language_id, cursor, limit, if_none_match)
     return handle_service_result(result)
 
 @lessons_router.get('/actual-lesson/{user_id}', response_model=ActualLessonResponse)
-async def get_actual_lesson(user_id: int, service: LessonsService = Depends(get_lesson_service)):
+async def get_actual_lesson(user_id: int, service: LessonsService = Depends(get_lesson_service),
+                            media_type: str = Depends(negotiate_media_type), current_user_id: int = Depends(get_current_user_id)):
+    ensure_same_user(user_id, current_user_id)
     result = await service.get_actual_lesson(user_id)
-    return handle_service_result(result)
\ No newline at end of file
+    return handle_service_result(result, media_type)
\ No newline at end of file
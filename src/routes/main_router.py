@@ -1,13 +1,29 @@
 from fastapi import APIRouter
 
+from src.core.rate_limit import apply_rate_limits, Bucket, RouteLimits
 from .lessons_router import lessons_router
 from .user_router import user_router
 from .p_language_router import p_language_router
 from .question_router import question_router
+from .leaderboard_router import leaderboard_router
 
 v1_router = APIRouter()
 
 v1_router.include_router(user_router, prefix='/user', tags=['users'])
 v1_router.include_router(p_language_router, prefix='/language', tags=['programming languages'])
 v1_router.include_router(lessons_router, prefix='/lessons', tags=['lessons'])
-v1_router.include_router(question_router, prefix='/questions', tags=['questions'])
\ No newline at end of file
+v1_router.include_router(question_router, prefix='/questions', tags=['questions'])
+v1_router.include_router(leaderboard_router, prefix='/leaderboard', tags=['leaderboard'])
+
+# Token buckets of the hot routes, by path under v1_router. A user answers a lesson in a few checks per question,
+# the per-IP buckets are wider since many users may share an address (mobile carriers NAT their clients).
+# Per-IP buckets apply only with RATE_LIMITS_PER_IP, see src.core.rate_limit.
+# `total=Bucket(...)` sheds load of a route whoever sends it.
+RATE_LIMITS = {
+    '/user/auth': RouteLimits(per_ip=Bucket(rate=2, burst=20)),
+    '/lessons/start': RouteLimits(per_user=Bucket(rate=0.2, burst=5), per_ip=Bucket(rate=10, burst=50)),
+    '/lessons/check': RouteLimits(per_user=Bucket(rate=3, burst=20), per_ip=Bucket(rate=30, burst=100)),
+    '/lessons/check-batch': RouteLimits(per_user=Bucket(rate=1, burst=5), per_ip=Bucket(rate=10, burst=50)),
+}
+
+apply_rate_limits(v1_router, RATE_LIMITS)
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.config import get_db
+from src.auth import require_admin
+from src.config import get_db, get_redis_client
 from src.core import handle_service_result
 from src.repository import PLanguageRepository
 from src.schemas import CreateLanguageRequest, LanguageResponse
@@ -9,16 +11,18 @@ from src.services import PLanguageService
 
 p_language_router = APIRouter()
 
-async def get_language_service(session: AsyncSession = Depends(get_db)) -> PLanguageService:
-    return PLanguageService(PLanguageRepository(session))
+async def get_language_service(session: AsyncSession = Depends(get_db), redis_client: Redis = Depends(get_redis_client)) -> PLanguageService:
+    return PLanguageService(PLanguageRepository(session), redis_client)
 
 
-@p_language_router.post('/add-language', summary='Add a new programming language', response_model=LanguageResponse)
+@p_language_router.post('/add-language', summary='Add a new programming language', response_model=LanguageResponse,
+                        dependencies=[Depends(require_admin)])
 async def add_language(request: CreateLanguageRequest, service: PLanguageService = Depends(get_language_service)):
     response = await service.add_language(request)
     return handle_service_result(response)
 
 @p_language_router.get('/available', summary='Get all available programming languages', response_model=list[LanguageResponse])
-async def get_all_languages(service: PLanguageService = Depends(get_language_service)):
-    response = await service.get_all_languages()
+async def get_all_languages(if_none_match: str | None = Header(None),
+                            service: PLanguageService = Depends(get_language_service)):
+    response = await service.get_all_languages(if_none_match)
     return handle_service_result(response)
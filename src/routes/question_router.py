@@ -1,17 +1,19 @@
 from fastapi import APIRouter
 from fastapi.params import Depends
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.config import get_db
+from src.auth import require_admin
+from src.config import get_db, get_redis_client
 from src.core import handle_service_result
 from src.repository import QuestionRepository
 from src.schemas import QuestionCreate, QuestionCreateResponse
 from src.services import QuestionService
 
-question_router = APIRouter()
+question_router = APIRouter(dependencies=[Depends(require_admin)])
 
-async def get_question_service(session: AsyncSession = Depends(get_db)) -> QuestionService:
-    return QuestionService(QuestionRepository(session))
+async def get_question_service(session: AsyncSession = Depends(get_db), redis_client: Redis = Depends(get_redis_client)) -> QuestionService:
+    return QuestionService(QuestionRepository(session), redis_client)
 
 @question_router.post('/', response_model=QuestionCreateResponse)
 async def create_question(question: QuestionCreate, service: QuestionService = Depends(get_question_service)):
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.auth import get_current_user_id, ensure_same_user
 from src.config import get_db, get_redis_client
 from src.core import handle_service_result
 from src.repository import UserRepository, PLanguageRepository
@@ -21,8 +22,18 @@ async def authenticate_user(request: UserAuthRequest, service: UserService = Dep
     response = await service.auth_user(request)
     return handle_service_result(response)
 
+@user_router.get('/me', summary='Get the authenticated user', response_model=UserAuthResponse)
+async def get_current_user(service: UserService = Depends(get_user_service), current_user_id: int = Depends(get_current_user_id)):
+    """
+    Lets the app reopen with a stored token instead of logging in again.
+    """
+    response = await service.get_user_by_id(current_user_id)
+    return handle_service_result(response)
+
 @user_router.patch('/{user_id}/change-language', summary='Set active programming language for user', response_model=LanguageUpdateResponse)
-async def update_active_language(user_id: int, request: LanguageUpdateRequest, service: UserService = Depends(get_user_service)):
+async def update_active_language(user_id: int, request: LanguageUpdateRequest, service: UserService = Depends(get_user_service),
+                                 current_user_id: int = Depends(get_current_user_id)):
+    ensure_same_user(user_id, current_user_id)
     response = await service.set_active_language(user_id, request)
     return handle_service_result(response)
 
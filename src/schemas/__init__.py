@@ -1,3 +1,4 @@
 from .user_schemas import UserAuthResponse, UserAuthRequest, LanguageUpdateRequest, LanguageUpdateResponse
 from .p_language_schemas import CreateLanguageRequest, LanguageResponse
+from .leaderboard_schemas import LeaderboardEntry, LeaderboardResponse
 from .questions_schemas import *
\ No newline at end of file
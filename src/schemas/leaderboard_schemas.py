@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+# Responses
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: int
+    first_name: str | None = None
+    xp: int
+
+class LeaderboardResponse(BaseModel):
+    entries: list[LeaderboardEntry]
+    # rank of the requesting user, if asked for and present on the leaderboard
+    me: LeaderboardEntry | None = None
@@ -1,5 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
+from src.schemas.questions_schemas import QuestionAnswerCreate
+
+# Largest lesson accepted by the import, a batch holds at most every answer of every question of such a lesson
+MAX_LESSON_QUESTIONS = 100
+MAX_BATCH_ANSWERS = MAX_LESSON_QUESTIONS * 4
 
 class StartLessonRequest(BaseModel):
     user_id: int
@@ -10,7 +15,28 @@ class CheckLessonAnswerRequest(BaseModel):
     question_id: int
     answer_id: int
 
+class LessonAnswer(BaseModel):
+    question_id: int
+    answer_id: int
+
+class CheckLessonAnswersBatchRequest(BaseModel):
+    session_id: str
+    answers: list[LessonAnswer] = Field(max_length=MAX_BATCH_ANSWERS)
+
 class LessonCreateRequest(BaseModel):
     title: str
     description: str
     language_id: int
+
+class LessonImportQuestion(BaseModel):
+    text: str
+    answers: list[QuestionAnswerCreate]
+
+class LessonImportBundle(BaseModel):
+    """
+    A lesson with all its questions and answers, imported in one transaction.
+    """
+    title: str
+    description: str = ''
+    language_id: int
+    questions: list[LessonImportQuestion] = Field(min_length=1, max_length=MAX_LESSON_QUESTIONS)
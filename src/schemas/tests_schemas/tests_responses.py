@@ -21,6 +21,10 @@ class LessonResultResponse(BaseModel):
     xp_earned: int
     success_percent: int
 
+class CheckLessonAnswersBatchResponse(BaseModel):
+    answers: list[CheckLessonAnswerResponse]
+    result: LessonResultResponse | None = None
+
 class CreateLessonResponse(BaseModel):
     test_id: int
     language_id: int
@@ -34,7 +38,26 @@ class SimplifiedLessonResponse(BaseModel):
     title: str
     description: str
 
+class LessonsPageResponse(BaseModel):
+    lessons: list[SimplifiedLessonResponse]
+    # pass as `cursor` to get the next page, None on the last page
+    next_cursor: int | None = None
+
 class ActualLessonResponse(BaseModel):
     lesson_id: int
     title: str
-    description: str
\ No newline at end of file
+    description: str
+
+class ImportedLesson(BaseModel):
+    index: int
+    lesson_id: int
+    title: str
+    questions_count: int
+
+class LessonImportError(BaseModel):
+    index: int
+    error: str
+
+class LessonImportResponse(BaseModel):
+    imported: list[ImportedLesson]
+    errors: list[LessonImportError]
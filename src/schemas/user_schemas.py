@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+import pytz
+from pydantic import BaseModel, field_validator
 
 
 # Base schemas
@@ -21,14 +22,23 @@ class UserAuthRequest(BaseModel):
     user_id: int
     first_name: str
     timezone: str | None = None
-    hash: str
+    # Telegram Mini App initData, its signature is always checked unless AUTH_INSECURE_DEV is on
+    init_data: str = ''
+
+    @field_validator('timezone')
+    @classmethod
+    def known_timezone(cls, timezone: str | None) -> str | None:
+        if timezone and timezone not in pytz.all_timezones_set:
+            raise ValueError(f'Unknown timezone {timezone}, expected an IANA name like Europe/Kyiv')
+        return timezone
 
 class LanguageUpdateRequest(BaseModel):
     language_id: int
 
 # RESPONSES
 class UserAuthResponse(BaseModel):
-    # access_token: str
+    # bearer token of the protected routes, issued by /user/auth
+    access_token: str | None = None
     user: UserBase
 
 class LanguageUpdateResponse(BaseModel):
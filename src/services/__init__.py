@@ -3,3 +3,4 @@ from .user_service import UserService
 from .p_language_service import PLanguageService
 from .question_service import QuestionService
 from .lessons_service import LessonsService
+from .leaderboard_service import LeaderboardService
@@ -0,0 +1,174 @@
+import json
+import time
+
+from src.database.models import LessonSessionModel
+from src.repository import LessonSessionRepository
+from src.services.redis_scripts import CHECK_OK, CHECK_SESSION_NOT_FOUND, CHECK_EXPIRED, CHECK_UNKNOWN_QUESTION, \
+    CHECK_ALREADY_ANSWERED, CHECK_ALREADY_COMPLETED, CHECK_FORBIDDEN
+
+# ids of sessions kept in the database start with it, so they are never looked up in Redis
+DATABASE_SESSION_PREFIX = 'db'
+# attempts of a check losing the race for the session row to concurrent checks
+_MAX_ATTEMPTS = 5
+
+
+def is_database_session(session_id: str) -> bool:
+    return session_id.startswith(DATABASE_SESSION_PREFIX)
+
+
+class DatabaseLessonSessions:
+    """
+    Lesson sessions started while Redis is unavailable, so a Redis outage costs cache hits instead of lessons.
+    The rules are the ones of the answer checking scripts in redis_scripts and the results have the same shape.
+    Every check is one transaction guarded by the row version, a check losing the race is run again.
+    """
+    def __init__(self, repository: LessonSessionRepository, session_ttl: int, lesson_duration: int):
+        self._repository = repository
+        self.session_ttl = session_ttl
+        self.lesson_duration = lesson_duration
+
+    async def create(self, session_id: str, user_id: int, lesson_id: int, language_id: int,
+                     correct_answers: dict[int, int]) -> None:
+        now = int(time.time())
+        await self._repository.replace_session(
+            LessonSessionModel(
+                session_id=session_id,
+                user_id=user_id,
+                lesson_id=lesson_id,
+                language_id=language_id or 0,
+                started_at=now,
+                total=len(correct_answers),
+                solved=0,
+                wrong=0,
+                answered=0,
+                completed=False,
+                questions=json.dumps({str(question_id): [answer_id, None] for question_id, answer_id in correct_answers.items()}),
+            ),
+            started_before=now - self.lesson_duration - self.session_ttl
+        )
+
+    def _check_session(self, lesson_session: LessonSessionModel | None, user_id: int | None) -> int:
+        if lesson_session is None:
+            return CHECK_SESSION_NOT_FOUND
+        if user_id and lesson_session.user_id != user_id:
+            return CHECK_FORBIDDEN
+        if time.time() - lesson_session.started_at > self.lesson_duration:
+            return CHECK_EXPIRED
+        if lesson_session.completed:
+            return CHECK_ALREADY_COMPLETED
+        return CHECK_OK
+
+    @staticmethod
+    def _check_question(questions: dict, question_id: int) -> int:
+        state = questions.get(str(question_id))
+        if state is None:
+            return CHECK_UNKNOWN_QUESTION
+        if state[1] == 'c':
+            return CHECK_ALREADY_ANSWERED
+        return CHECK_OK
+
+    @staticmethod
+    def _record_answer(lesson_session: LessonSessionModel, questions: dict, question_id: int, answer_id: int) -> int:
+        state = questions[str(question_id)]
+        if state[1] is None:
+            lesson_session.answered += 1
+        if state[0] == answer_id:
+            state[1] = 'c'
+            lesson_session.solved += 1
+            return 1
+        if state[1] is None:
+            lesson_session.wrong += 1
+        state[1] = 'w'
+        return 0
+
+    async def _check(self, session_id: str, answers: list[tuple[int, int]], user_id: int | None,
+                     batch: bool) -> tuple[int, list[int], LessonSessionModel | None]:
+        for _ in range(_MAX_ATTEMPTS):
+            lesson_session = await self._repository.get_session(session_id)
+            status = self._check_session(lesson_session, user_id)
+            if status != CHECK_OK:
+                return status, [], lesson_session
+
+            questions = json.loads(lesson_session.questions)
+            solved = set()
+            for question_id, answer_id in answers:
+                status = CHECK_ALREADY_ANSWERED if question_id in solved else self._check_question(questions, question_id)
+                if status != CHECK_OK:
+                    return status, [], lesson_session
+                if questions[str(question_id)][0] == answer_id:
+                    solved.add(question_id)
+
+            is_correct = [self._record_answer(lesson_session, questions, question_id, answer_id) for question_id, answer_id in answers]
+            done = lesson_session.answered if batch else lesson_session.solved
+            lesson_session.completed = done >= lesson_session.total
+            lesson_session.questions = json.dumps(questions)
+            if await self._repository.save_session():
+                return CHECK_OK, is_correct, lesson_session
+        raise RuntimeError(f'Session {session_id} is changed by too many concurrent checks')
+
+    async def check_answer(self, session_id: str, question_id: int, answer_id: int, user_id: int | None) -> list[int]:
+        """
+        Same as CHECK_ANSWER_SCRIPT: {status, is_correct, completed, total, wrong, user_id, lesson_id, language_id}.
+        """
+        status, is_correct, lesson_session = await self._check(session_id, [(question_id, answer_id)], user_id, batch=False)
+        if status != CHECK_OK:
+            return [status, 0, 0, 0, 0, 0, 0, 0]
+        return [CHECK_OK, is_correct[0], int(lesson_session.completed), lesson_session.total, lesson_session.wrong,
+                lesson_session.user_id, lesson_session.lesson_id, lesson_session.language_id]
+
+    async def check_answers_batch(self, session_id: str, answers: list[tuple[int, int]], user_id: int | None) -> list[int]:
+        """
+        Same as CHECK_ANSWERS_BATCH_SCRIPT: {status, completed, total, wrong, user_id, lesson_id, language_id, is_correct...}.
+        """
+        status, is_correct, lesson_session = await self._check(session_id, answers, user_id, batch=True)
+        if status != CHECK_OK:
+            return [status, 0, 0, 0, 0, 0, 0]
+        return [CHECK_OK, int(lesson_session.completed), lesson_session.total, lesson_session.wrong,
+                lesson_session.user_id, lesson_session.lesson_id, lesson_session.language_id, *is_correct]
+
+    async def release_completion(self, session_id: str) -> None:
+        lesson_session = await self._repository.get_session(session_id)
+        if lesson_session and lesson_session.xp_earned is None:
+            lesson_session.completed = False
+            await self._repository.save_session()
+
+    async def get_progress(self, session_id: str) -> tuple | None:
+        """
+        Same fields as read by the completion retry from a Redis session:
+        (user_id, lesson_id, language_id, total, solved, wrong, completed), or None for an unknown or expired session.
+        """
+        lesson_session = await self._repository.get_session(session_id)
+        if not lesson_session or time.time() - lesson_session.started_at > self.lesson_duration + self.session_ttl:
+            return None
+        return (lesson_session.user_id, lesson_session.lesson_id, lesson_session.language_id, lesson_session.total,
+                lesson_session.solved, lesson_session.wrong, lesson_session.completed)
+
+    async def claim_completion(self, session_id: str) -> bool:
+        """
+        Marks the session completed, like HSETNX on a Redis session. False when it was completed already.
+        """
+        lesson_session = await self._repository.get_session(session_id)
+        if not lesson_session or lesson_session.completed:
+            return False
+        lesson_session.completed = True
+        return await self._repository.save_session()
+
+    async def store_result(self, session_id: str, xp_earned: int, success_percent: int) -> None:
+        lesson_session = await self._repository.get_session(session_id)
+        if lesson_session:
+            lesson_session.xp_earned = xp_earned
+            lesson_session.success_percent = success_percent
+            await self._repository.save_session()
+
+    async def get_result(self, session_id: str) -> dict | None:
+        """
+        The stored result like the `lesson_result` values in Redis, or None when not saved (yet).
+        """
+        lesson_session = await self._repository.get_session(session_id)
+        if not lesson_session or lesson_session.xp_earned is None:
+            return None
+        return {
+            'user_id': lesson_session.user_id,
+            'xp_earned': lesson_session.xp_earned,
+            'success_percent': lesson_session.success_percent,
+        }
@@ -0,0 +1,69 @@
+import logging
+from datetime import datetime, timezone, timedelta
+
+from redis.asyncio import Redis
+
+from src.cache import global_leaderboard_key, language_leaderboard_key, weekly_leaderboard_key
+from src.repository import LeaderboardRepository
+from src.schemas import LeaderboardResponse
+from .leaderboards import Leaderboards, week_id, WEEKLY_LEADERBOARD_TTL
+from .mappers import LeaderboardMapper
+from .service_result import ServiceResult
+
+logger = logging.getLogger('leaderboard_service')
+
+
+class LeaderboardService:
+    def __init__(self, repository: LeaderboardRepository, redis_client: Redis):
+        self._repository = repository
+        self._leaderboards = Leaderboards(redis_client)
+
+    async def _get_leaderboard(self, key: str, limit: int, user_id: int | None) -> ServiceResult[LeaderboardResponse]:
+        try:
+            top = await self._leaderboards.top(key, limit)
+            me = None
+            if user_id is not None:
+                rank = await self._leaderboards.rank(key, user_id)
+                me = (user_id, *rank) if rank else None
+            user_ids = [entry_user_id for entry_user_id, _ in top]
+            if me:
+                user_ids.append(user_id)
+            first_names = await self._repository.get_first_names(user_ids)
+            return ServiceResult.success(LeaderboardMapper.to_leaderboard_response(top, first_names, me))
+        except Exception as e:
+            logger.error(f"Error fetching leaderboard {key}: {e}")
+            return ServiceResult.failure(f'Error fetching leaderboard: {str(e)}', status_code=500)
+
+    async def get_global(self, limit: int, user_id: int | None = None) -> ServiceResult[LeaderboardResponse]:
+        return await self._get_leaderboard(global_leaderboard_key(), limit, user_id)
+
+    async def get_language(self, language_id: int, limit: int, user_id: int | None = None) -> ServiceResult[LeaderboardResponse]:
+        return await self._get_leaderboard(language_leaderboard_key(language_id), limit, user_id)
+
+    async def get_weekly(self, limit: int, user_id: int | None = None) -> ServiceResult[LeaderboardResponse]:
+        return await self._get_leaderboard(weekly_leaderboard_key(week_id()), limit, user_id)
+
+    async def rebuild(self) -> dict[str, int]:
+        """
+        Rebuilds every leaderboard from the database, e.g. after the Redis data was lost.
+        Returns the number of users put on each leaderboard.
+        """
+        now = datetime.now(timezone.utc)
+        week_start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+        counts = {}
+
+        total_xp = await self._repository.get_total_xp()
+        await self._leaderboards.replace(global_leaderboard_key(), total_xp)
+        counts['global'] = len(total_xp)
+
+        for language_id, scores in (await self._repository.get_xp_by_language()).items():
+            await self._leaderboards.replace(language_leaderboard_key(language_id), scores)
+            counts[f'language:{language_id}'] = len(scores)
+
+        # completed_at is stored as naive UTC
+        weekly_xp = await self._repository.get_xp_since(week_start.replace(tzinfo=None))
+        await self._leaderboards.replace(weekly_leaderboard_key(week_id(now)), weekly_xp, ex=WEEKLY_LEADERBOARD_TTL)
+        counts['weekly'] = len(weekly_xp)
+
+        logger.info(f"Leaderboards rebuilt: {counts}")
+        return counts
@@ -0,0 +1,69 @@
+from datetime import datetime, timezone
+
+from redis.asyncio import Redis
+
+from src.cache import global_leaderboard_key, language_leaderboard_key, weekly_leaderboard_key
+
+WEEKLY_LEADERBOARD_TTL = 1209600  # 2 weeks, the previous week stays readable for a while
+
+
+def week_id(moment: datetime | None = None) -> str:
+    """
+    ISO week of the moment (UTC), e.g. 2026-W42. Weekly leaderboards start over every Monday.
+    """
+    year, week, _ = (moment or datetime.now(timezone.utc)).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class Leaderboards:
+    """
+    XP leaderboards kept in Redis sorted sets (member - user id, score - XP):
+    global, per programming language and weekly. Every read and update is O(log n).
+    """
+    def __init__(self, redis_client: Redis):
+        self._redis_client = redis_client
+
+    async def add_xp(self, user_id: int, language_id: int | None, xp: int, moment: datetime | None = None) -> None:
+        weekly_key = weekly_leaderboard_key(week_id(moment))
+        async with self._redis_client.pipeline(transaction=True) as pipe:
+            pipe.zincrby(global_leaderboard_key(), xp, user_id)
+            if language_id:
+                pipe.zincrby(language_leaderboard_key(language_id), xp, user_id)
+            pipe.zincrby(weekly_key, xp, user_id)
+            pipe.expire(weekly_key, WEEKLY_LEADERBOARD_TTL)
+            await pipe.execute()
+
+    async def top(self, key: str, limit: int) -> list[tuple[int, int]]:
+        """
+        Returns (user_id, xp) pairs of the best users, best first.
+        """
+        entries = await self._redis_client.zrevrange(key, 0, limit - 1, withscores=True)
+        return [(int(user_id), int(xp)) for user_id, xp in entries]
+
+    async def rank(self, key: str, user_id: int) -> tuple[int, int] | None:
+        """
+        Returns the 1-based rank and the XP of the user, None if the user is not on the leaderboard.
+        """
+        async with self._redis_client.pipeline(transaction=False) as pipe:
+            pipe.zrevrank(key, user_id)
+            pipe.zscore(key, user_id)
+            rank, xp = await pipe.execute()
+        if rank is None:
+            return None
+        return rank + 1, int(xp)
+
+    async def replace(self, key: str, scores: dict[int, int], ex: int | None = None) -> None:
+        """
+        Atomically replaces the whole leaderboard, used to rebuild it from the database.
+        """
+        tmp_key = f"{key}:rebuild"
+        async with self._redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(tmp_key)
+            if scores:
+                pipe.zadd(tmp_key, {str(user_id): xp for user_id, xp in scores.items()})
+                pipe.rename(tmp_key, key)
+                if ex:
+                    pipe.expire(key, ex)
+            else:
+                pipe.delete(key)
+            await pipe.execute()
@@ -1,25 +1,55 @@
-import json
-import uuid
+import logging
+import time
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Optional, Sequence
 
 from redis.asyncio import Redis
+from redis.exceptions import ResponseError, RedisError
 
+from src.cache import local_lesson_cache, TaggedCache, CatalogCache, CatalogEntry, lesson_key, session_key, lesson_result_key, \
+    UserProfileCache, lessons_catalog_key, lessons_catalog_cursor_key, lesson_tag, language_tag, CATALOG_TAG, encode_value, decode_value, daily_completion_key
 from src.database.models import LessonModel
-from src.repository import LessonsRepository
-from src.schemas.tests_schemas import StartLessonRequest, StartLessonResponse, CheckLessonAnswerRequest, \
+from src.metrics import log_event
+from src.repository import LessonsRepository, LessonSessionRepository
+from src.schemas.tests_schemas import StartLessonRequest, CheckLessonAnswerRequest, \
     CheckLessonAnswerResponse, LessonResultResponse, LessonCreateRequest, CreateLessonResponse, \
-    SimplifiedLessonResponse, ActualLessonResponse
+    ActualLessonResponse, CheckLessonAnswersBatchRequest, CheckLessonAnswersBatchResponse, \
+    LessonImportBundle, LessonImportResponse, LessonsPageResponse
 from src.services import ServiceResult
-from src.services.mappers import LessonsMapper
+from src.services.service_result import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE
+from src.services.leaderboards import Leaderboards
+from src.services.mappers import LessonsMapper, UserMapper
+from src.services.database_sessions import DatabaseLessonSessions, DATABASE_SESSION_PREFIX, is_database_session
+from src.services.question_service import QuestionService
+from src.services.streaks import completed_lesson_today, local_today
+from src.workers import ProgressQueue
+from src.services.redis_scripts import CHECK_ANSWER_SCRIPT, CHECK_ANSWERS_BATCH_SCRIPT, CHECK_OK, CHECK_SESSION_NOT_FOUND, CHECK_EXPIRED, \
+    CHECK_UNKNOWN_QUESTION, CHECK_ALREADY_ANSWERED, CHECK_ALREADY_COMPLETED, CHECK_FORBIDDEN
 
+logger = logging.getLogger('lessons_service')
+
+CATALOG_PAGE_SIZE = 50
+MAX_CATALOG_PAGE_SIZE = 200
 
 class LessonsService:
-    def __init__(self, repository: LessonsRepository, redis_client: Redis):
+    def __init__(self, repository: LessonsRepository, redis_client: Redis, progress_queue: Optional[ProgressQueue] = None):
         self._repository = repository
         self._redis_client = redis_client
+        self._cache = TaggedCache(redis_client)
+        self._leaderboards = Leaderboards(redis_client)
+        self._profile_cache = UserProfileCache(redis_client)
+        # when set, completed lessons are written to the database in the background
+        self._progress_queue = progress_queue
         self.lesson_cache_ttl = 864000  # 10 days
         self.session_ttl = 1800 # 30 minutes
+        self.lesson_duration = 1800 # 30 min for a test
+        self._catalog_cache = CatalogCache(redis_client, self.lesson_cache_ttl)
+        self._check_answer_script = redis_client.register_script(CHECK_ANSWER_SCRIPT)
+        self._check_answers_batch_script = redis_client.register_script(CHECK_ANSWERS_BATCH_SCRIPT)
+        # sessions started while Redis is unavailable
+        self._database_sessions = DatabaseLessonSessions(
+            LessonSessionRepository(repository.db_session), self.session_ttl, self.lesson_duration
+        )
 
     def _calculate_xp(self, success_percent: int) -> int:
         base_xp = 100
@@ -33,171 +63,430 @@ class LessonsService:
         else:
             return 10
 
-    def _get_correct_answers(self, lesson: LessonModel) -> dict[int, int]:
-        print(f"Getting correct answers for lesson: {lesson.lesson_id}. Questions count: {len(lesson.questions)}\n"
-              f"Questions: {[q.question_id for q in lesson.questions]}. Correct answer: {[q.answers[0].answer_id for q in lesson.questions if q.answers]}")
-        return {
+    @staticmethod
+    def _get_correct_answers(lesson: LessonModel) -> dict[int, int]:
+        correct_answers = {
             question.question_id: next((a.answer_id for a in question.answers if a.is_correct), None)
             for question in lesson.questions
         }
+        # answers themselves are never logged, only how many questions lack one
+        log_event(logger, 'lesson_answers_loaded', lesson_id=lesson.lesson_id, questions=len(correct_answers),
+                  without_correct_answer=sum(answer_id is None for answer_id in correct_answers.values()))
+        return correct_answers
+
+    @staticmethod
+    def _lesson_tags(lesson_id: int, language_id: int) -> tuple[str, ...]:
+        return lesson_tag(lesson_id), language_tag(language_id)
 
     async def _get_cached_lesson(self, lesson_id: int) -> Optional[dict]:
-        key = f"lesson:{lesson_id}:data"
+        """
+        Looks the lesson up in the local (in-process) cache first and falls back to Redis.
+        Payloads kept in the local cache hold `questions_json` already encoded to bytes
+        and `questions_msgpack`, the same questions in MessagePack.
+        """
+        lesson_data = local_lesson_cache.get(lesson_id)
+        if lesson_data:
+            return lesson_data
         try:
-            cached_data = await self._redis_client.get(key)
-            return json.loads(cached_data) if cached_data else None
-        except json.JSONDecodeError:
+            cached_data = await self._cache.get(lesson_key(lesson_id))
+            if not cached_data:
+                return None
+            lesson_data = decode_value(cached_data)
+            if 'questions_json' not in lesson_data:
+                return None
+            return self._cache_lesson_locally(lesson_id, lesson_data, self._lesson_tags(lesson_id, lesson_data.get('language_id')))
+        except ValueError:
             return None
 
-    async def _cache_lesson(self, lesson_id: int, lesson: LessonModel):
-        correct_answers = self._get_correct_answers(lesson)
-        print(f'Cache lesson. Got correct answers: {correct_answers}')
-        lesson_data = LessonsMapper.to_lesson_cache(lesson, correct_answers)
-        print(f'Caching lesson data: {lesson_data}')
-        await self._redis_client.set(
-            f"lesson:{lesson_id}:data",
-            json.dumps(lesson_data),
+    async def _cache_lesson(self, lesson_id: int, lesson: LessonModel) -> dict:
+        lesson_data = LessonsMapper.to_lesson_cache(lesson, self._get_correct_answers(lesson))
+        log_event(logger, 'lesson_cached', lesson_id=lesson_id, language_id=lesson.language_id,
+                  questions=len(lesson_data['correct_answers']), questions_bytes=len(lesson_data['questions_json']))
+        tags = self._lesson_tags(lesson_id, lesson.language_id)
+        await self._cache.set(lesson_key(lesson_id), encode_value(lesson_data), tags, ex=self.lesson_cache_ttl)
+        return self._cache_lesson_locally(lesson_id, lesson_data, tags)
+
+    @staticmethod
+    def _cache_lesson_locally(lesson_id: int, lesson_data: dict, tags: tuple[str, ...]) -> dict:
+        lesson_data['questions_json'] = lesson_data['questions_json'].encode()
+        lesson_data['questions_msgpack'] = LessonsMapper.to_questions_msgpack(lesson_data['questions_json'])
+        local_lesson_cache.set(lesson_id, lesson_data, tags)
+        return lesson_data
+
+    async def _cache_lessons(self, lessons: Sequence[LessonModel]) -> None:
+        """
+        Stores many lessons in Redis with one pipelined round trip.
+        """
+        await self._cache.set_many(
+            [
+                (
+                    lesson_key(lesson.lesson_id),
+                    encode_value(LessonsMapper.to_lesson_cache(lesson, self._get_correct_answers(lesson))),
+                    self._lesson_tags(lesson.lesson_id, lesson.language_id)
+                )
+                for lesson in lessons
+            ],
             ex=self.lesson_cache_ttl
         )
 
-    async def _create_user_session(self, session_id: str, request: StartLessonRequest, correct_answers: dict[int,int]):
+    async def warm_up_cache(self) -> int:
+        """
+        Preloads every lesson into Redis. Returns the number of cached lessons.
         """
-        Session data will be stored in Redis and gotten each time the user checks an answer.
+        lessons = await self._repository.get_all_lessons_with_questions()
+        await self._cache_lessons(lessons)
+        return len(lessons)
+
+    async def _create_user_session(self, session_id: str, request: StartLessonRequest, language_id: int, correct_answers: dict[int,int]):
         """
+        Session data is stored in Redis as a hash, so every answer check can update it
+        in place with a single script call instead of rewriting the whole session.
+        """
+        key = session_key(session_id)
         session_data = {
             'user_id': request.user_id,
             'lesson_id': request.lesson_id,
-            'started_at': datetime.now().isoformat(),
-            'correct_answers': correct_answers,
-            'user_answers': [],
-            'wrong_answered': [],
+            'language_id': language_id,
+            'started_at': int(time.time()),
+            'total': len(correct_answers),
+            'solved': 0,
+            'wrong': 0,
         }
-        await self._redis_client.set(
-            f"session:{session_id}",
-            json.dumps(session_data),
-            ex=self.session_ttl
-        )
+        session_data.update({f'q:{question_id}': answer_id for question_id, answer_id in correct_answers.items()})
+        async with self._redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping=session_data)
+            pipe.expire(key, self.session_ttl)
+            await pipe.execute()
 
-    async def start_lesson(self, request: StartLessonRequest):
+    async def start_lesson(self, request: StartLessonRequest, media_type: str = JSON_MEDIA_TYPE):
         """
         Method starts a lesson and creates a user session based on his id and lesson id.
-        It first checks if the lesson is cached. If it is, it returns the cached data.
-        If not, it fetches the lesson from the database, caches it, and returns the lesson data.
+        It first checks if the lesson is cached. If not, it fetches the lesson from the database and caches it.
+        The response body (JSON or MessagePack) is spliced from the cached pre-encoded questions,
+        no response models are built. While Redis is unavailable the session is kept in the database.
         """
         try:
-            session_id = f"{request.lesson_id}{request.user_id}"
-            cached_data = await self._get_cached_lesson(request.lesson_id)
-            if cached_data:
-                response = LessonsMapper.to_start_lesson_response_cache(
-                    session_id=session_id,
-                    questions=cached_data.get('questions')
-                )
-                await self._create_user_session(session_id, request, cached_data.get('correct_answers'))
-                return ServiceResult.success(response)
-
-            lesson = await self._repository.get_lesson_by_id(request.lesson_id)
-            if not lesson:
-                return ServiceResult.failure('Lesson not found', status_code=404)
+            # one session per user and lesson, a new start replaces it
+            session_id = f"{request.lesson_id}:{request.user_id}"
+            lesson_data = await self._get_cached_lesson(request.lesson_id)
+            if not lesson_data:
+                lesson = await self._repository.get_lesson_by_id(request.lesson_id)
+                if not lesson:
+                    return ServiceResult.failure('Lesson not found', status_code=404)
+                lesson_data = await self._cache_lesson(lesson.lesson_id, lesson)
 
-            await self._cache_lesson(lesson.lesson_id, lesson)
-            correct_answers = self._get_correct_answers(lesson)
-            await self._create_user_session(session_id, request, correct_answers)
-
-            return ServiceResult.success(
-                LessonsMapper.to_start_lesson_response(
+            try:
+                await self._create_user_session(session_id, request, lesson_data.get('language_id'), lesson_data.get('correct_answers'))
+            except RedisError as e:
+                logger.warning(f"Lesson session {session_id} kept in the database, Redis is unavailable: {e!r}")
+                session_id = f"{DATABASE_SESSION_PREFIX}{session_id}"
+                await self._database_sessions.create(session_id, request.user_id, request.lesson_id,
+                                                     lesson_data.get('language_id'), lesson_data.get('correct_answers'))
+            if media_type == MSGPACK_MEDIA_TYPE:
+                return ServiceResult.success_raw(
+                    LessonsMapper.to_start_lesson_response_msgpack(
+                        session_id=session_id,
+                        questions_msgpack=lesson_data.get('questions_msgpack')
+                    ),
+                    media_type=MSGPACK_MEDIA_TYPE
+                )
+            return ServiceResult.success_raw(
+                LessonsMapper.to_start_lesson_response_raw(
                     session_id=session_id,
-                    lesson=lesson
+                    questions_json=lesson_data.get('questions_json')
                 )
             )
         except Exception as e:
             return ServiceResult.failure(f'Error starting lesson: {str(e)}', status_code=500)
 
-    async def check_lesson_answer(self, request: CheckLessonAnswerRequest) -> ServiceResult[CheckLessonAnswerResponse]:
+    @staticmethod
+    def _sessions_unavailable(error: RedisError) -> ServiceResult:
         """
-        Method checks the answer via cached session data. If the session is not found or expired,
-        it returns an error. If the answer is correct, it updates the session data.
+        Sessions started in Redis can not be served while it is unavailable, new ones are kept in the database.
+        """
+        logger.warning(f"Lesson sessions unavailable: {error!r}")
+        return ServiceResult.failure('Lessons are temporarily unavailable, try again later', status_code=503)
+
+    @staticmethod
+    def _answer_check_failure(status: int) -> ServiceResult:
+        if status == CHECK_SESSION_NOT_FOUND:
+            return ServiceResult.failure('Session not found or expired', status_code=404)
+        if status == CHECK_EXPIRED:
+            return ServiceResult.failure('Test time has expired', status_code=403)
+        if status == CHECK_UNKNOWN_QUESTION:
+            return ServiceResult.failure('Question does not belong to this lesson', status_code=400)
+        if status == CHECK_ALREADY_ANSWERED:
+            return ServiceResult.failure('Question has already been answered', status_code=409)
+        if status == CHECK_ALREADY_COMPLETED:
+            return ServiceResult.failure('Lesson has already been completed', status_code=409)
+        if status == CHECK_FORBIDDEN:
+            return ServiceResult.failure('Session belongs to another user', status_code=403)
+        return ServiceResult.failure(f'Unexpected answer check status: {status}', status_code=500)
+
+    async def check_lesson_answer(self, request: CheckLessonAnswerRequest, user_id: int | None = None) -> ServiceResult[CheckLessonAnswerResponse]:
+        """
+        Method checks the answer via cached session data in a single Redis round trip.
+        The script validates the answer (and that the session belongs to `user_id`, when given),
+        records it and tells if the lesson is completed.
+        A question can be retried after a wrong answer, but not after a correct one.
         The session TTL will be set to 30min after each answer check.
+        Sessions kept in the database are checked by the same rules there.
         """
         try:
-            session = await self._redis_client.get(f'session:{request.session_id}')
-            if not session:
-                return ServiceResult.failure('Session not found or expired', status_code=404)
-
-            session_data = json.loads(session)
-
-            # check if time is expired
-            started_at = datetime.fromisoformat(session_data.get('started_at')).replace(tzinfo=timezone.utc)
-            if (datetime.now(timezone.utc) - started_at).total_seconds() > 1800:  # 30 min for a test
-                await self._redis_client.delete(f'session:{request.session_id}')
-                return ServiceResult.failure('Test time has expired', status_code=403)
-
-            correct_answer_id = session_data.get('correct_answers').get(str(request.question_id))
-            is_correct = correct_answer_id == request.answer_id
-            print(f"User answer: {request.answer_id} Question: {request.question_id} Correct answer: {correct_answer_id} Is correct: {is_correct}")
-            if is_correct:
-                session_data['user_answers'].append(request.question_id)
+            if is_database_session(request.session_id):
+                checked = await self._database_sessions.check_answer(request.session_id, request.question_id,
+                                                                     request.answer_id, user_id)
             else:
-                session_data['wrong_answered'].append(request.question_id)
-
-            await self._redis_client.set(
-                f'session:{request.session_id}',
-                json.dumps(session_data),
-                ex=self.session_ttl
-            )
+                checked = await self._check_answer_script(
+                    keys=[session_key(request.session_id)],
+                    args=[request.question_id, request.answer_id, self.session_ttl, int(time.time()), self.lesson_duration,
+                          user_id or '']
+                )
+            status, is_correct, completed, total, wrong, user_id, lesson_id, language_id = checked
+            if status != CHECK_OK:
+                return self._answer_check_failure(status)
 
-            if len(session_data.get('user_answers')) == len(session_data.get('correct_answers')):
-                await self.save_lesson_results(request.session_id)
+            if completed:
+                saved = await self.save_lesson_results(request.session_id, user_id, lesson_id, language_id, total, wrong)
+                if not saved.is_success:
+                    return saved
 
             return ServiceResult.success(
                 LessonsMapper.to_answer_check_response(
                     question_id=request.question_id,
-                    is_correct=is_correct
+                    is_correct=bool(is_correct)
                 )
             )
-        except json.JSONDecodeError:
-            return ServiceResult.failure('Invalid session data', status_code=400)
+        except ResponseError as e:
+            return ServiceResult.failure(f'Invalid session data: {str(e)}', status_code=400)
+        except RedisError as e:
+            return self._sessions_unavailable(e)
 
-    async def save_lesson_results(self, session_id: str) -> None:
+    async def check_lesson_answers_batch(self, request: CheckLessonAnswersBatchRequest,
+                                         user_id: int | None = None) -> ServiceResult[CheckLessonAnswersBatchResponse]:
+        """
+        Method checks all answers of a session at once, e.g. a lesson passed offline.
+        The whole batch is validated and recorded by one script call, so either every answer
+        is recorded or none of them. Questions may be retried within the batch until answered correctly.
+        Once every question has an answer the lesson is completed and its result is returned too.
+        """
+        if not request.answers:
+            return ServiceResult.failure('At least one answer required', status_code=400)
         try:
-            session = await self._redis_client.get(f'session:{session_id}')
-            if not session:
-                return ServiceResult.failure('Session not found or expired', status_code=404)
-
-            session_data = json.loads(session)
-
-            total_questions = len(session_data.get('correct_answers'))
-            if len(session_data.get('user_answers')) < total_questions:
-                return ServiceResult.failure('Test not completed', status_code=400)
-
-            incorrect_count = len(session_data.get('wrong_answered'))
-            success_percent = min(100, int(((total_questions - incorrect_count) / total_questions) * 100))
-            xp_earned = self._calculate_xp(success_percent)
-            progress = await self._repository.save_user_progress(
-                user_id=session_data.get('user_id'),
-                lesson_id=session_data.get('lesson_id'),
-                xp_earned=xp_earned,
-                success_percent=success_percent
+            if is_database_session(request.session_id):
+                checked = await self._database_sessions.check_answers_batch(
+                    request.session_id, [(answer.question_id, answer.answer_id) for answer in request.answers], user_id
+                )
+            else:
+                args = [self.session_ttl, int(time.time()), self.lesson_duration, user_id or '']
+                for answer in request.answers:
+                    args.extend((answer.question_id, answer.answer_id))
+                checked = await self._check_answers_batch_script(
+                    keys=[session_key(request.session_id)],
+                    args=args
+                )
+            status, completed, total, wrong, user_id, lesson_id, language_id, *is_correct = checked
+            if status != CHECK_OK:
+                return self._answer_check_failure(status)
+
+            result = None
+            if completed:
+                saved = await self.save_lesson_results(request.session_id, user_id, lesson_id, language_id, total, wrong)
+                if not saved.is_success:
+                    return saved
+                result = saved.data
+
+            return ServiceResult.success(
+                LessonsMapper.to_answers_batch_response(
+                    question_ids=[answer.question_id for answer in request.answers],
+                    is_correct=is_correct,
+                    result=result
+                )
+            )
+        except ResponseError as e:
+            return ServiceResult.failure(f'Invalid session data: {str(e)}', status_code=400)
+        except RedisError as e:
+            return self._sessions_unavailable(e)
+
+    async def save_lesson_results(self, session_id: str, user_id: int, lesson_id: int, language_id: int,
+                                  total_questions: int, incorrect_count: int) -> ServiceResult[LessonResultResponse]:
+        """
+        Saves the progress of a session the answer checking script marked completed.
+        When the progress can not be saved the mark is removed again, so the completion is retried
+        by GET /lessons/result. Once the progress is saved the lesson counts as completed,
+        failing Redis writes after that only lose cached data.
+        When the progress queue is unavailable the progress is written to the database right away.
+        """
+        success_percent = min(100, int(((total_questions - incorrect_count) / total_questions) * 100))
+        xp_earned = self._calculate_xp(success_percent)
+        daily_completion = None
+        user = None
+        try:
+            claim = await self._claim_daily_completion(user_id)
+            if not claim.is_success:
+                await self._release_completion(session_id)
+                return claim
+            daily_completion = claim.data
+            queued = False
+            if self._progress_queue:
+                try:
+                    await self._progress_queue.push({
+                        'user_id': user_id,
+                        'lesson_id': lesson_id,
+                        'language_id': language_id,
+                        'xp_earned': xp_earned,
+                        'success_percent': success_percent,
+                        'completed_at': datetime.now(timezone.utc),
+                    })
+                    queued = True
+                except RedisError as e:
+                    logger.warning(f"Progress queue unavailable, saving the result of session {session_id} directly: {e!r}")
+            if not queued:
+                user = await self._repository.save_user_progress(
+                    user_id=user_id,
+                    lesson_id=lesson_id,
+                    xp_earned=xp_earned,
+                    success_percent=success_percent
+                )
+        except Exception as e:
+            logger.error(f"Error saving lesson results of session {session_id}: {e!r}")
+            await self._release_completion(session_id, daily_completion)
+            return ServiceResult.failure('Lesson result could not be saved, try again later', status_code=503)
+
+        try:
+            if user is not None:
+                await self._profile_cache.update(user_id, **UserMapper.to_user_progress_cache(user))
+            await self._leaderboards.add_xp(user_id, language_id, xp_earned)
+        except RedisError as e:
+            # the progress is saved already, leaderboards are restored by rebuild_leaderboards
+            logger.warning(f"XP of user {user_id} not added to the cached profile or leaderboards: {e!r}")
+        if is_database_session(session_id):
+            await self._store_database_result(session_id, xp_earned, success_percent)
+            return ServiceResult.success(
+                LessonsMapper.to_lesson_result_response(
+                    xp_earned=xp_earned,
+                    success_percent=success_percent,
+                )
             )
-            if not progress:
-                raise ValueError('Failed to save user progress')
-            await self._redis_client.set(
-                f'lesson_result:{session_id}',
-                json.dumps({
-                    'xp_earned': xp_earned,
-                    'success_percent': success_percent,
-                }),
-                ex=self.session_ttl
+        try:
+            async with self._redis_client.pipeline(transaction=True) as pipe:
+                pipe.set(
+                    lesson_result_key(session_id),
+                    encode_value({
+                        'user_id': user_id,
+                        'xp_earned': xp_earned,
+                        'success_percent': success_percent,
+                    }),
+                    ex=self.session_ttl
+                )
+                pipe.delete(session_key(session_id))
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Result of session {session_id} not stored: {e!r}")
+        return ServiceResult.success(
+            LessonsMapper.to_lesson_result_response(
+                xp_earned=xp_earned,
+                success_percent=success_percent,
             )
-            await self._redis_client.delete(f'session:{session_id}')
+        )
 
+    async def _store_database_result(self, session_id: str, xp_earned: int, success_percent: int) -> None:
+        try:
+            await self._database_sessions.store_result(session_id, xp_earned, success_percent)
         except Exception as e:
-            raise ValueError(f'Error saving lesson results: {str(e)}')
+            logger.warning(f"Result of session {session_id} not stored: {e!r}")
 
-    async def get_lesson_result(self, session_id: str) -> ServiceResult[LessonResultResponse]:
-        cached = await self._redis_client.get(f'lesson_result:{session_id}')
-        if not cached:
-            return ServiceResult.failure('Lesson result not found or expired', status_code=404)
-        data = json.loads(cached)
+    async def _claim_daily_completion(self, user_id: int) -> ServiceResult[str | None]:
+        """
+        Applies the one lesson a day rule before any XP is credited, also for results the progress writer
+        saves later. Returns the key of the claim, released again when the result can not be saved.
+        While Redis is unavailable only the profile is checked and no key is claimed.
+        """
+        profile = await self._profile_cache.get_or_load(user_id, self._load_user_profile)
+        if not profile:
+            return ServiceResult.failure(f'User with id {user_id} not found', status_code=404)
+        already_completed = ServiceResult.failure('User has already completed a lesson today', status_code=409)
+        if completed_lesson_today(profile['last_lesson_date'], profile['timezone']):
+            return already_completed
+        # taken by the first of concurrent completions, the profile is updated only once the result is written
+        key = daily_completion_key(user_id, local_today(profile['timezone']).isoformat())
+        try:
+            claimed = await self._redis_client.set(key, 1, nx=True, ex=172800)
+        except RedisError as e:
+            logger.warning(f"Completion of user {user_id} checked by the profile only: {e!r}")
+            return ServiceResult.success(None)
+        if not claimed:
+            return already_completed
+        return ServiceResult.success(key)
+
+    async def _release_completion(self, session_id: str, daily_completion: str | None = None) -> None:
+        try:
+            if is_database_session(session_id):
+                await self._database_sessions.release_completion(session_id)
+                if daily_completion:
+                    await self._redis_client.delete(daily_completion)
+                return
+            async with self._redis_client.pipeline(transaction=True) as pipe:
+                pipe.hdel(session_key(session_id), 'completed')
+                if daily_completion:
+                    pipe.delete(daily_completion)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Session {session_id} stays completed without a result: {e!r}")
+
+    async def _retry_completion(self, session_id: str, user_id: int | None) -> ServiceResult[LessonResultResponse] | None:
+        """
+        Saves the result of a session whose answers are all solved but whose result could not be saved.
+        Returns None when there is no such session.
+        """
+        key = session_key(session_id)
+        if is_database_session(session_id):
+            progress = await self._database_sessions.get_progress(session_id) or (None,) * 7
+        else:
+            progress = await self._redis_client.hmget(
+                key, 'user_id', 'lesson_id', 'language_id', 'total', 'solved', 'wrong', 'completed'
+            )
+        owner, lesson_id, language_id, total, solved, wrong, completed = progress
+        if owner is None or completed or int(solved) < int(total):
+            return None
+        if user_id is not None and int(owner) != user_id:
+            return ServiceResult.failure('Session belongs to another user', status_code=403)
+        # claims the completion, like the answer checking scripts do
+        if is_database_session(session_id):
+            claimed = await self._database_sessions.claim_completion(session_id)
+        else:
+            claimed = await self._redis_client.hsetnx(key, 'completed', 1)
+        if not claimed:
+            return None
+        return await self.save_lesson_results(session_id, int(owner), int(lesson_id), int(language_id or 0),
+                                              int(total), int(wrong))
+
+    async def get_lesson_result(self, session_id: str, user_id: int | None = None) -> ServiceResult[LessonResultResponse]:
+        """
+        Returns the result of a completed session. With `user_id`, only the result of that user's session.
+        """
+        if is_database_session(session_id):
+            data = await self._database_sessions.get_result(session_id)
+        else:
+            try:
+                cached = await self._redis_client.get(lesson_result_key(session_id))
+            except RedisError as e:
+                return self._sessions_unavailable(e)
+            try:
+                data = decode_value(cached) if cached else None
+            except ValueError as e:
+                logger.warning(f"Malformed result of session {session_id}: {e!r}")
+                data = None
+        if not data:
+            try:
+                retried = await self._retry_completion(session_id, user_id)
+            except RedisError as e:
+                return self._sessions_unavailable(e)
+            return retried or ServiceResult.failure('Lesson result not found or expired', status_code=404)
+        # results stored before the owner was recorded have no user_id
+        if user_id is not None and data.get('user_id', user_id) != user_id:
+            return ServiceResult.failure('Session belongs to another user', status_code=403)
         return ServiceResult.success(
             LessonsMapper.to_lesson_result_response(
                 xp_earned=data.get('xp_earned'),
@@ -214,33 +503,109 @@ class LessonsService:
             )
             if not new_test:
                 return ServiceResult.failure('Failed to create test', status_code=400)
+            try:
+                await self._cache.invalidate(lesson_tag(new_test.lesson_id), CATALOG_TAG)
+            except RedisError as e:
+                logger.error(f"Catalog not invalidated after creating lesson {new_test.lesson_id}: {e!r}")
             response = LessonsMapper.to_create_lesson_response(lesson=new_test)
             return ServiceResult.success(response)
         except Exception as e:
             return ServiceResult.failure(f'Error creating test: {str(e)}', status_code=500)
 
-    async def get_all_lessons(self) -> ServiceResult[list[SimplifiedLessonResponse]]:
+    @staticmethod
+    def _validate_import_bundle(bundle: LessonImportBundle, language_ids: set[int]) -> str | None:
+        if bundle.language_id not in language_ids:
+            return f'Language with ID {bundle.language_id} not found'
+        for number, question in enumerate(bundle.questions):
+            error = QuestionService.validate_answers(question.answers)
+            if error:
+                return f'Question {number}: {error}'
+        return None
+
+    async def import_lessons(self, content: bytes | str, ndjson: bool = False) -> ServiceResult[LessonImportResponse]:
+        """
+        Imports lesson bundles from JSON or NDJSON, each bundle in its own transaction, so an invalid bundle
+        is reported without affecting the others. Questions are validated like in QuestionService.create_question.
+        The catalog is invalidated and the imported lessons are cached once at the end.
+        """
         try:
-            lessons = await self._repository.get_all_lessons()
-            if not lessons:
-                return ServiceResult.success([])
-            response = LessonsMapper.to_all_lessons_response(lessons)
-            return ServiceResult.success(response)
+            try:
+                bundles = LessonsMapper.to_import_bundles(content, ndjson)
+            except UnicodeDecodeError:
+                return ServiceResult.failure('Lessons must be UTF-8 encoded', status_code=400)
+            language_ids = await self._repository.get_existing_language_ids(
+                {bundle.language_id for bundle in bundles if isinstance(bundle, LessonImportBundle)}
+            )
+            imported, errors = [], []
+            for index, bundle in enumerate(bundles):
+                error = bundle if isinstance(bundle, str) else self._validate_import_bundle(bundle, language_ids)
+                if error:
+                    errors.append((index, error))
+                    continue
+                try:
+                    lesson_id = await self._repository.import_lesson(bundle)
+                except Exception as e:
+                    errors.append((index, f'Error importing lesson: {str(e)}'))
+                    continue
+                imported.append((index, lesson_id, bundle))
+
+            if imported:
+                lesson_ids = [lesson_id for _, lesson_id, _ in imported]
+                try:
+                    await self._cache.invalidate(CATALOG_TAG, *[lesson_tag(lesson_id) for lesson_id in lesson_ids])
+                except RedisError as e:
+                    logger.error(f"Catalog not invalidated after importing lessons {lesson_ids}: {e!r}")
+                await self._cache_lessons(await self._repository.get_all_lessons_with_questions(lesson_ids))
+            return ServiceResult.success(LessonsMapper.to_lesson_import_response(imported, errors))
+        except Exception as e:
+            return ServiceResult.failure(f'Error importing lessons: {str(e)}', status_code=500)
+
+    async def get_all_lessons(self, language_id: Optional[int] = None, cursor: int = 0, limit: int = CATALOG_PAGE_SIZE,
+                              if_none_match: Optional[str] = None) -> ServiceResult[LessonsPageResponse]:
+        """
+        Returns an encoded page of the catalog, optionally of one language, with its ETag,
+        or 304 when `if_none_match` names the current one. Non-empty pages of the default size are cached
+        with their ETags until the catalog changes, but only at the first cursor and at cursors returned
+        as `next_cursor` of a cached page, so arbitrary cursors and languages do not grow the cache.
+        """
+        try:
+            key = lessons_catalog_key(language_id, cursor, limit)
+            cacheable = limit == CATALOG_PAGE_SIZE
+            entry = await self._catalog_cache.get(key) if cacheable else None
+            if not entry:
+                lessons = await self._repository.get_lessons_page(language_id, cursor, limit)
+                page = LessonsMapper.to_lessons_page_response(lessons, limit)
+                body = page.model_dump_json().encode()
+                if cacheable and lessons and await self._is_catalog_cursor(language_id, cursor, limit):
+                    entry = await self._catalog_cache.set(key, body)
+                    if page.next_cursor is not None:
+                        await self._cache.set(lessons_catalog_cursor_key(language_id, page.next_cursor, limit), '1',
+                                              (CATALOG_TAG,), ex=self.lesson_cache_ttl)
+                else:
+                    entry = CatalogEntry.from_body(body)
+            if entry.matches(if_none_match):
+                return ServiceResult.not_modified(entry.headers)
+            return ServiceResult.success_raw(entry.body, headers=entry.headers)
         except Exception as e:
             return ServiceResult.failure(f'Error fetching tests: {str(e)}', status_code=500)
 
+    async def _is_catalog_cursor(self, language_id: Optional[int], cursor: int, limit: int) -> bool:
+        return cursor == 0 or bool(await self._cache.get(lessons_catalog_cursor_key(language_id, cursor, limit)))
+
+    async def _load_user_profile(self, user_id: int) -> Optional[dict]:
+        user = await self._repository.get_user_with_language(user_id)
+        return UserMapper.to_user_profile_cache(user) if user else None
+
     async def get_actual_lesson(self, user_id: int) -> ServiceResult[Optional[ActualLessonResponse]]:
         try:
-            user_cache_key = f'user:{user_id}'
-            cached_data = await self._redis_client.get(user_cache_key)
-            if cached_data:
-                cached_data = json.loads(cached_data)
-                if cached_data.get('is_streak', False):
-                    return ServiceResult.failure('User is in streak mode, no unfinished lesson available', status_code=403)
-                else:
-                    lesson = await self._repository.get_unfinished_lesson_with_tests(user_id)
-            else:
-                lesson = await self._repository.get_unfinished_lesson_with_tests(user_id, True)
+            profile = await self._profile_cache.get_or_load(user_id, self._load_user_profile)
+            if not profile:
+                return ServiceResult.failure(f'User with ID {user_id} not found', status_code=404)
+            if completed_lesson_today(profile['last_lesson_date'], profile['timezone']):
+                return ServiceResult.failure('User is in streak mode, no unfinished lesson available', status_code=403)
+            if not profile['active_language_id']:
+                return ServiceResult.failure('User has no active language', status_code=400)
+            lesson = await self._repository.get_unfinished_lesson_with_tests(user_id, profile['active_language_id'])
             if not lesson:
                 return ServiceResult.failure('No unfinished lesson found', status_code=404)
             return ServiceResult.success(
@@ -250,5 +615,7 @@ class LessonsService:
                     description=lesson.description
                 )
             )
+        except ValueError as e:
+            return ServiceResult.failure(str(e), status_code=400)
         except Exception as e:
-            return ServiceResult.failure(f'Error fetching actual lesson: {str(e)}', status_code=500)
\ No newline at end of file
+            return ServiceResult.failure(f'Error fetching actual lesson: {str(e)}', status_code=500)
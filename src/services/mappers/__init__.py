@@ -1,4 +1,5 @@
 from .user_mappers import UserMapper
 from .p_language_mappers import PLanguageMapper
 from .lesson_mappers import LessonsMapper
-from .question_mappers import QuestionsMapper
\ No newline at end of file
+from .question_mappers import QuestionsMapper
+from .leaderboard_mappers import LeaderboardMapper
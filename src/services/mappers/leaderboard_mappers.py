@@ -0,0 +1,24 @@
+from src.schemas import LeaderboardEntry, LeaderboardResponse
+
+
+class LeaderboardMapper:
+    @staticmethod
+    def to_leaderboard_response(top: list[tuple[int, int]], first_names: dict[int, str],
+                                me: tuple[int, int, int] | None) -> LeaderboardResponse:
+        return LeaderboardResponse(
+            entries=[
+                LeaderboardEntry(
+                    rank=rank,
+                    user_id=user_id,
+                    first_name=first_names.get(user_id),
+                    xp=xp
+                )
+                for rank, (user_id, xp) in enumerate(top, start=1)
+            ],
+            me=LeaderboardEntry(
+                rank=me[1],
+                user_id=me[0],
+                first_name=first_names.get(me[0]),
+                xp=me[2]
+            ) if me else None
+        )
@@ -1,50 +1,102 @@
+import json
 from typing import Sequence
 
+import msgpack
+from pydantic import TypeAdapter, ValidationError
+
 from src.database.models import LessonModel
-from src.schemas.tests_schemas import StartLessonResponse, AnswerResponse, QuestionResponse, CreateLessonResponse, \
-    SimplifiedLessonResponse, CheckLessonAnswerResponse, LessonResultResponse
+from src.schemas.tests_schemas import AnswerResponse, QuestionResponse, CreateLessonResponse, \
+    SimplifiedLessonResponse, CheckLessonAnswerResponse, LessonResultResponse, CheckLessonAnswersBatchResponse, \
+    LessonImportBundle, LessonImportResponse, ImportedLesson, LessonImportError, LessonsPageResponse
+
+_QUESTIONS_ADAPTER = TypeAdapter(list[QuestionResponse])
 
 
 class LessonsMapper:
     @staticmethod
-    def to_start_lesson_response_cache(session_id: str, questions: list[dict]) -> StartLessonResponse:
-        return StartLessonResponse(
-            session_id=session_id,
-            questions=[
-                QuestionResponse(
-                    question_id=question.get('question_id'),
-                    text=question.get('question_text'),
-                    answers=[
-                        AnswerResponse(
-                            answer_id=answer.get("answer_id"),
-                            answer_text=answer.get("answer_text")
-                        )
-                        for answer in question.get("answers")
-                    ]
-                )
-                for question in questions
-            ]
-        )
+    def to_import_bundles(content: bytes | str, ndjson: bool) -> list[LessonImportBundle | str]:
+        """
+        Parses lesson bundles from a JSON document (one bundle or a list of them) or from NDJSON,
+        one bundle per line. A bundle that can not be parsed is replaced by the reason,
+        so the others can still be imported. Raises UnicodeDecodeError when the content is not UTF-8.
+        """
+        if isinstance(content, bytes):
+            content = content.decode()
+        if ndjson:
+            items = [line for line in content.splitlines() if line.strip()]
+        else:
+            try:
+                document = json.loads(content)
+            except json.JSONDecodeError as e:
+                return [f'Invalid JSON: {e}']
+            items = document if isinstance(document, list) else [document]
+
+        bundles = []
+        for item in items:
+            try:
+                if ndjson:
+                    bundles.append(LessonImportBundle.model_validate_json(item))
+                elif isinstance(item, dict):
+                    bundles.append(LessonImportBundle.model_validate(item))
+                else:
+                    bundles.append('Invalid bundle: bundle must be an object')
+            except ValidationError as e:
+                bundles.append('Invalid bundle: ' + '; '.join(
+                    f"{'.'.join(map(str, error['loc'])) or 'bundle'}: {error['msg']}" for error in e.errors()
+                ))
+        return bundles
 
     @staticmethod
-    def to_start_lesson_response(session_id: str, lesson: LessonModel) -> StartLessonResponse:
-        return StartLessonResponse(
-            session_id=session_id,
-            questions=[
-                QuestionResponse(
-                    question_id=question.question_id,
-                    text=question.question_text,
-                    answers=[
-                        AnswerResponse(
-                            answer_id=answer.answer_id,
-                            answer_text=answer.answer_text
-                        )
-                        for answer in question.answers
-                    ]
-                )
-                for question in lesson.questions
-            ]
-        )
+    def to_lesson_questions_json(lesson: LessonModel) -> str:
+        """
+        Encodes the questions of the lesson exactly as they are sent in StartLessonResponse,
+        so the result can be cached and spliced into responses without re-validation.
+        """
+        questions = [
+            QuestionResponse(
+                question_id=question.question_id,
+                text=question.question_text,
+                answers=[
+                    AnswerResponse(
+                        answer_id=answer.answer_id,
+                        answer_text=answer.answer_text
+                    )
+                    for answer in question.answers
+                ]
+            )
+            for question in lesson.questions
+        ]
+        return _QUESTIONS_ADAPTER.dump_json(questions).decode()
+
+    @staticmethod
+    def to_start_lesson_response_raw(session_id: str, questions_json: bytes) -> bytes:
+        """
+        Builds the StartLessonResponse JSON body from the pre-encoded questions.
+        """
+        return b''.join((
+            b'{"session_id":', json.dumps(session_id).encode(),
+            b',"questions":', questions_json,
+            b'}'
+        ))
+
+    @staticmethod
+    def to_questions_msgpack(questions_json: bytes) -> bytes:
+        """
+        Re-encodes the pre-encoded questions to MessagePack.
+        """
+        return msgpack.packb(json.loads(questions_json))
+
+    @staticmethod
+    def to_start_lesson_response_msgpack(session_id: str, questions_msgpack: bytes) -> bytes:
+        """
+        Builds the StartLessonResponse MessagePack body from the pre-encoded questions:
+        a map of two entries with the same fields as the JSON body.
+        """
+        return b''.join((
+            b'\x82',
+            msgpack.packb('session_id'), msgpack.packb(session_id),
+            msgpack.packb('questions'), questions_msgpack
+        ))
 
     @staticmethod
     def to_create_lesson_response(lesson: LessonModel) -> CreateLessonResponse:
@@ -57,35 +109,30 @@ class LessonsMapper:
         )
 
     @staticmethod
-    def to_all_lessons_response(lessons: Sequence[LessonModel]) -> list[SimplifiedLessonResponse]:
-        return [
-            SimplifiedLessonResponse(
-                test_id=lesson.lesson_id,
-                language_id=lesson.language_id,
-                title=lesson.title,
-                description=lesson.description
-            )
-            for lesson in lessons
-        ]
+    def to_lessons_page_response(lessons: Sequence, limit: int) -> LessonsPageResponse:
+        """
+        Maps a page of lessons (models or rows with the same attributes). A full page
+        may be followed by another one, so its last lesson id becomes the next cursor.
+        """
+        return LessonsPageResponse(
+            lessons=[
+                SimplifiedLessonResponse(
+                    test_id=lesson.lesson_id,
+                    language_id=lesson.language_id,
+                    title=lesson.title,
+                    description=lesson.description
+                )
+                for lesson in lessons
+            ],
+            next_cursor=lessons[-1].lesson_id if len(lessons) == limit else None
+        )
 
     @staticmethod
     def to_lesson_cache(lesson: LessonModel, correct_answers: dict[int, int]) -> dict:
         return {
             "lesson_id": lesson.lesson_id,
-            "questions": [
-                {
-                    "question_id": question.question_id,
-                    "question_text": question.question_text,
-                    "answers": [
-                        {
-                            "answer_id": answer.answer_id,
-                            "answer_text": answer.answer_text
-                        }
-                        for answer in question.answers
-                    ]
-                }
-                for question in lesson.questions
-            ],
+            "language_id": lesson.language_id,
+            "questions_json": LessonsMapper.to_lesson_questions_json(lesson),
             "correct_answers": correct_answers
         }
 
@@ -96,9 +143,39 @@ class LessonsMapper:
             is_correct=is_correct
         )
 
+    @staticmethod
+    def to_answers_batch_response(question_ids: list[int], is_correct: list[int],
+                                  result: LessonResultResponse | None) -> CheckLessonAnswersBatchResponse:
+        return CheckLessonAnswersBatchResponse(
+            answers=[
+                CheckLessonAnswerResponse(
+                    question_id=question_id,
+                    is_correct=bool(correct)
+                )
+                for question_id, correct in zip(question_ids, is_correct)
+            ],
+            result=result
+        )
+
     @staticmethod
     def to_lesson_result_response(xp_earned: int, success_percent: int) -> LessonResultResponse:
         return LessonResultResponse(
             xp_earned=xp_earned,
             success_percent=success_percent,
-        )
\ No newline at end of file
+        )
+
+    @staticmethod
+    def to_lesson_import_response(imported: list[tuple[int, int, LessonImportBundle]],
+                                  errors: list[tuple[int, str]]) -> LessonImportResponse:
+        return LessonImportResponse(
+            imported=[
+                ImportedLesson(
+                    index=index,
+                    lesson_id=lesson_id,
+                    title=bundle.title,
+                    questions_count=len(bundle.questions)
+                )
+                for index, lesson_id, bundle in imported
+            ],
+            errors=[LessonImportError(index=index, error=error) for index, error in errors]
+        )
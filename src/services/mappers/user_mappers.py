@@ -26,7 +26,34 @@ class UserMapper:
         )
 
     @staticmethod
-    def to_user_cache_auth_response(user: dict) -> UserAuthResponse:
+    def to_user_profile_cache(user: UserModel) -> dict:
+        """
+        Profile cached by UserProfileCache. The active language must be loaded.
+        """
+        return {
+            'user_id': user.user_id,
+            'first_name': user.first_name,
+            'streak': user.streak,
+            'xp': user.xp,
+            'timezone': user.timezone,
+            'last_lesson_date': user.last_lesson_date,
+            'active_language_id': user.active_language_id,
+            'active_language_name': user.active_language.name if user.active_language else None,
+        }
+
+    @staticmethod
+    def to_user_progress_cache(user: UserModel) -> dict:
+        """
+        Profile fields changed by a completed lesson.
+        """
+        return {
+            'streak': user.streak,
+            'xp': user.xp,
+            'last_lesson_date': user.last_lesson_date,
+        }
+
+    @staticmethod
+    def to_user_cache_auth_response(user: dict, is_streak: bool) -> UserAuthResponse:
         active_language = None
         active_language_id = user.get('active_language_id', None)
         if active_language_id:
@@ -43,6 +70,6 @@ class UserMapper:
                 xp=user['xp'],
                 active_language=active_language,
                 timezone=user['timezone'],
-                is_streak=user.get('is_streak', False)
+                is_streak=is_streak
             )
         )
\ No newline at end of file
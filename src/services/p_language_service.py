@@ -1,24 +1,59 @@
+import logging
+
+from pydantic import TypeAdapter
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.cache import TaggedCache, CatalogCache, CatalogEntry, languages_catalog_key, CATALOG_TAG
 from src.repository import PLanguageRepository
 from src.schemas import LanguageResponse, CreateLanguageRequest
 from src.services import ServiceResult
 from src.services.mappers import PLanguageMapper
 
+logger = logging.getLogger('p_language_service')
+
+_LANGUAGES_ADAPTER = TypeAdapter(list[LanguageResponse])
+
 
 class PLanguageService:
-    def __init__(self, repository: PLanguageRepository):
+    def __init__(self, repository: PLanguageRepository, redis_client: Redis):
         self._repository = repository
+        self._cache = TaggedCache(redis_client)
+        self.catalog_cache_ttl = 864000  # 10 days
+        self._catalog_cache = CatalogCache(redis_client, self.catalog_cache_ttl)
 
-    async def get_all_languages(self) -> ServiceResult[list[LanguageResponse]]:
+    async def _cache_languages(self, languages: list[LanguageResponse]) -> CatalogEntry:
+        return await self._catalog_cache.set(languages_catalog_key(), _LANGUAGES_ADAPTER.dump_json(languages))
+
+    async def warm_up_cache(self) -> int:
+        """
+        Preloads the language catalog into Redis. Returns the number of cached languages.
+        """
+        languages = PLanguageMapper.to_list(await self._repository.get_all_languages())
+        await self._cache_languages(languages)
+        return len(languages)
+
+    async def get_all_languages(self, if_none_match: str | None = None) -> ServiceResult[list[LanguageResponse]]:
+        """
+        Returns the encoded language catalog with its ETag, or 304 when `if_none_match` names the current one.
+        """
         try:
-            languages = await self._repository.get_all_languages()
-            return ServiceResult.success(PLanguageMapper.to_list(languages))
+            entry = await self._catalog_cache.get(languages_catalog_key())
+            if not entry:
+                entry = await self._cache_languages(PLanguageMapper.to_list(await self._repository.get_all_languages()))
+            if entry.matches(if_none_match):
+                return ServiceResult.not_modified(entry.headers)
+            return ServiceResult.success_raw(entry.body, headers=entry.headers)
         except Exception as e:
             return ServiceResult.failure(f'Error fetching languages: {str(e)}', status_code=500)
 
     async def add_language(self, request: CreateLanguageRequest) -> ServiceResult[LanguageResponse]:
         try:
             new_language = await self._repository.add_language(request.name, request.description, request.picture, request.level, request.popularity)
+            try:
+                await self._cache.invalidate(CATALOG_TAG)
+            except RedisError as e:
+                logger.error(f"Catalog not invalidated after adding language {new_language.language_id}: {e!r}")
             return ServiceResult.success(PLanguageMapper.to_single(new_language))
         except Exception as e:
             return ServiceResult.failure(f'Error adding language: {str(e)}', status_code=400)
-
@@ -1,19 +1,38 @@
+import logging
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.cache import TaggedCache, lesson_tag
 from src.repository import QuestionRepository
-from src.schemas import QuestionCreate, QuestionCreateResponse
+from src.schemas import QuestionCreate, QuestionCreateResponse, QuestionAnswerCreate
 from src.services import ServiceResult
 from src.services.mappers import QuestionsMapper
 
+logger = logging.getLogger('question_service')
+
 
 class QuestionService:
-    def __init__(self, repository: QuestionRepository):
+    def __init__(self, repository: QuestionRepository, redis_client: Redis):
         self._repository = repository
+        self._cache = TaggedCache(redis_client)
+
+    @staticmethod
+    def validate_answers(answers: list[QuestionAnswerCreate]) -> str | None:
+        """
+        Returns the reason the answers of a question are invalid, or None.
+        """
+        if len(answers) != 4:
+            return 'Exactly 4 answers required'
+        if sum(1 for answer in answers if answer.is_correct) != 1:
+            return 'Exactly one correct answer required'
+        return None
 
     async def create_question(self, request: QuestionCreate) -> ServiceResult[QuestionCreateResponse]:
         try:
-            if len(request.answers) != 4:
-                return ServiceResult.failure('Exactly 4 answers required', status_code=400)
-            if sum(1 for answer in request.answers if answer.is_correct) != 1:
-                return ServiceResult.failure('Exactly one correct answer required', status_code=400)
+            error = self.validate_answers(request.answers)
+            if error:
+                return ServiceResult.failure(error, status_code=400)
 
             new_question = await self._repository.create_question(
                 text=request.text,
@@ -22,6 +41,10 @@ class QuestionService:
             )
             if not new_question:
                 return ServiceResult.failure('Failed to create question', status_code=400)
+            try:
+                await self._cache.invalidate(lesson_tag(request.lesson_id))
+            except RedisError as e:
+                logger.error(f"Lesson {request.lesson_id} not invalidated after creating a question: {e!r}")
             return ServiceResult.success(QuestionsMapper.to_create_question_response(new_question))
         except Exception as e:
             return ServiceResult.failure(f'Error creating question: {str(e)}', status_code=500)
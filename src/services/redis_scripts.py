@@ -0,0 +1,155 @@
+"""
+Lua scripts executed server-side by Redis.
+
+Lesson session layout (``session:{id}`` is a hash):
+    user_id, lesson_id   - owner of the session and the lesson being passed
+    language_id          - programming language of the lesson
+    started_at           - unix timestamp of the lesson start
+    total                - number of questions in the lesson
+    solved               - number of questions answered correctly
+    wrong                - number of questions that had at least one wrong attempt
+    answered             - number of questions with at least one attempt (missing in sessions of older releases)
+    completed            - set to 1 once the last question was solved, or answered for a batch
+    q:{question_id}      - id of the correct answer for the question
+    s:{question_id}      - state of the question: 'w' (wrong attempt) or 'c' (solved)
+"""
+
+# Status codes returned as the first element of the answer checking scripts result
+CHECK_OK = 0
+CHECK_SESSION_NOT_FOUND = 1
+CHECK_EXPIRED = 2
+CHECK_UNKNOWN_QUESTION = 3
+CHECK_ALREADY_ANSWERED = 4
+CHECK_ALREADY_COMPLETED = 5
+CHECK_FORBIDDEN = 6
+
+# Shared part of the answer checking scripts.
+# check_session validates the session itself and its owner (unless user_id is empty), check_question validates a single question,
+# record_answer stores the answer and finish refreshes the TTL and detects lesson completion.
+_CHECK_ANSWER_FUNCTIONS = """
+local function check_session(key, now, max_duration, user_id)
+    local meta = redis.call('HMGET', key, 'started_at', 'completed', 'user_id', 'lesson_id', 'language_id')
+    if not meta[1] then
+        return 1, meta
+    end
+    if user_id ~= '' and meta[3] ~= user_id then
+        return 6, meta
+    end
+    if tonumber(now) - tonumber(meta[1]) > tonumber(max_duration) then
+        redis.call('DEL', key)
+        return 2, meta
+    end
+    if meta[2] then
+        return 5, meta
+    end
+    return 0, meta
+end
+
+local function check_question(key, question_id)
+    local state = redis.call('HMGET', key, 'q:' .. question_id, 's:' .. question_id)
+    if not state[1] then
+        return 3, state
+    end
+    if state[2] == 'c' then
+        return 4, state
+    end
+    return 0, state
+end
+
+local function record_answer(key, question_id, answer_id, state)
+    if not state[2] then
+        redis.call('HINCRBY', key, 'answered', 1)
+    end
+    if state[1] == answer_id then
+        redis.call('HSET', key, 's:' .. question_id, 'c')
+        redis.call('HINCRBY', key, 'solved', 1)
+        return 1
+    end
+    if not state[2] then
+        redis.call('HINCRBY', key, 'wrong', 1)
+    end
+    redis.call('HSET', key, 's:' .. question_id, 'w')
+    return 0
+end
+
+local function finish(key, ttl, all_answered)
+    local totals = redis.call('HMGET', key, 'total', 'solved', 'wrong', 'answered')
+    local done = tonumber(totals[2])
+    if all_answered then
+        done = tonumber(totals[4]) or done
+    end
+    local completed = 0
+    if done >= tonumber(totals[1]) then
+        completed = 1
+        redis.call('HSET', key, 'completed', 1)
+    end
+    redis.call('EXPIRE', key, ttl)
+    return completed, tonumber(totals[1]), tonumber(totals[3])
+end
+"""
+
+# KEYS[1] - session key
+# ARGV[1] - question id, ARGV[2] - answer id, ARGV[3] - session ttl (seconds),
+# ARGV[4] - current unix timestamp, ARGV[5] - max lesson duration (seconds), ARGV[6] - user id of the caller or ''
+# Returns {status, is_correct, completed, total, wrong, user_id, lesson_id, language_id}
+CHECK_ANSWER_SCRIPT = _CHECK_ANSWER_FUNCTIONS + """
+local key = KEYS[1]
+local status, meta = check_session(key, ARGV[4], ARGV[5], ARGV[6])
+if status ~= 0 then
+    return {status, 0, 0, 0, 0, 0, 0, 0}
+end
+
+local state
+status, state = check_question(key, ARGV[1])
+if status ~= 0 then
+    return {status, 0, 0, 0, 0, 0, 0, 0}
+end
+
+local is_correct = record_answer(key, ARGV[1], ARGV[2], state)
+local completed, total, wrong = finish(key, ARGV[3], false)
+return {0, is_correct, completed, total, wrong, tonumber(meta[3]), tonumber(meta[4]), tonumber(meta[5]) or 0}
+"""
+
+# KEYS[1] - session key
+# ARGV[1] - session ttl (seconds), ARGV[2] - current unix timestamp, ARGV[3] - max lesson duration (seconds),
+# ARGV[4] - user id of the caller or '', ARGV[5..] - pairs of question id and answer id
+# All questions are validated before any answer is recorded, so an invalid batch changes nothing.
+# A question may be retried within the batch until it is answered correctly, like with single checks.
+# The batch completes the lesson once every question has an answer, a lesson passed offline
+# is finished in one submission with the wrong answers counted.
+# Returns {status, completed, total, wrong, user_id, lesson_id, language_id, is_correct...}
+CHECK_ANSWERS_BATCH_SCRIPT = _CHECK_ANSWER_FUNCTIONS + """
+local key = KEYS[1]
+local status, meta = check_session(key, ARGV[2], ARGV[3], ARGV[4])
+if status ~= 0 then
+    return {status, 0, 0, 0, 0, 0, 0}
+end
+
+local solved = {}
+for i = 5, #ARGV, 2 do
+    if solved[ARGV[i]] then
+        return {4, 0, 0, 0, 0, 0, 0}
+    end
+    local state
+    status, state = check_question(key, ARGV[i])
+    if status ~= 0 then
+        return {status, 0, 0, 0, 0, 0, 0}
+    end
+    if state[1] == ARGV[i + 1] then
+        solved[ARGV[i]] = true
+    end
+end
+
+local results = {}
+for i = 5, #ARGV, 2 do
+    local _, state = check_question(key, ARGV[i])
+    results[#results + 1] = record_answer(key, ARGV[i], ARGV[i + 1], state)
+end
+
+local completed, total, wrong = finish(key, ARGV[1], true)
+local response = {0, completed, total, wrong, tonumber(meta[3]), tonumber(meta[4]), tonumber(meta[5]) or 0}
+for _, is_correct in ipairs(results) do
+    response[#response + 1] = is_correct
+end
+return response
+"""
@@ -4,16 +4,34 @@ from pydantic import BaseModel
 
 T = TypeVar('T')
 
+JSON_MEDIA_TYPE = 'application/json'
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+
 class ServiceResult(BaseModel, Generic[T]):
     is_success: bool
     data: Optional[T] = None
     error: Optional[str] = None
     status_code: Optional[int] = None
+    # Pre-encoded response body, sent as is instead of `data`
+    raw: Optional[bytes] = None
+    media_type: str = JSON_MEDIA_TYPE
+    headers: Optional[dict[str, str]] = None
 
     @classmethod
     def success(cls, data: T):
         return cls(is_success=True, data=data)
 
+    @classmethod
+    def success_raw(cls, body: bytes, media_type: str = JSON_MEDIA_TYPE, headers: Optional[dict[str, str]] = None):
+        return cls(is_success=True, raw=body, media_type=media_type, headers=headers)
+
+    @classmethod
+    def not_modified(cls, headers: dict[str, str]):
+        """
+        The client's cached copy is still valid (conditional GET), sent as an empty 304 response.
+        """
+        return cls(is_success=True, status_code=304, headers=headers)
+
     @classmethod
     def failure(cls, error: str, status_code: Optional[int] = None):
         return cls(is_success=False, error=error, status_code=status_code)
\ No newline at end of file
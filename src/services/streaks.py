@@ -0,0 +1,30 @@
+from datetime import date, datetime, tzinfo
+
+import pytz
+
+
+def user_timezone(timezone: str | None) -> tzinfo:
+    """
+    Timezone of the user, UTC when unset or unknown (values stored before timezones were validated).
+    """
+    try:
+        return pytz.timezone(timezone) if timezone else pytz.UTC
+    except pytz.exceptions.UnknownTimeZoneError:
+        return pytz.UTC
+
+
+def completed_lesson_today(last_lesson_date: datetime | None, timezone: str | None) -> bool:
+    """
+    Tells if the last lesson was completed during the current local date of the user.
+    """
+    if not last_lesson_date:
+        return False
+    tz = user_timezone(timezone)
+    return datetime.now(tz).date() == last_lesson_date.astimezone(tz).date()
+
+
+def local_today(timezone: str | None) -> date:
+    """
+    Current date in the timezone of the user.
+    """
+    return datetime.now(user_timezone(timezone)).date()
@@ -1,15 +1,14 @@
-import json
 import logging
-from datetime import datetime
 
-import pytz
 from redis.asyncio import Redis
 
+from src.auth import JWTManager, verify_init_data, TELEGRAM_BOT_TOKEN, AUTH_INSECURE_DEV
+from src.cache import UserProfileCache
 from src.repository import UserRepository, PLanguageRepository
 from src.schemas import UserAuthRequest, LanguageUpdateRequest, LanguageUpdateResponse
 from .mappers import UserMapper
 from .service_result import ServiceResult
-from ..database.models import UserModel
+from .streaks import completed_lesson_today
 
 logger = logging.getLogger('user_service')
 
@@ -18,84 +17,60 @@ class UserService:
         self._repository = repository
         self._language_repo = language_repo
         self._redis_client = redis_client
+        self._profile_cache = UserProfileCache(redis_client)
 
-    async def _is_streak_active(self, user: UserModel) -> bool:
-        if not user.last_lesson_date:
-            return False
-        user_tz = user.timezone
-        try:
-            tz = pytz.timezone(user_tz)
-            today = datetime.now(tz).date()
-            last_lesson_date = user.last_lesson_date.astimezone(tz).date()
-            delta = (today - last_lesson_date).days
-            if delta > 1 and user.streak > 0:
-                logger.debug(f"Streak inactive for user {user.user_id}: last lesson was {delta} days ago")
-                await self._repository.reset_streak(user.user_id)
-                await self._redis_client.delete(f'user:{user.user_id}')
-                return False
-            return delta == 0
-        except pytz.exceptions.UnknownTimeZoneError as e:
-            logger.error(f"Unknown timezone {user_tz} for user {user.user_id}: {e}")
-            raise ValueError(f"Unknown timezone {user_tz} for user {user.user_id}")
-
-    def _cache_user(self, user: UserModel, is_streak: bool):
-        cache_key = f'user:{user.user_id}'
-        user_data = {
-            'user_id': user.user_id,
-            'first_name': user.first_name,
-            'streak': user.streak,
-            'xp': user.xp,
-            'timezone': user.timezone,
-            'is_streak': is_streak,
-            'active_language_id': user.active_language_id if user.active_language_id else None,
-            'active_language_name': user.active_language.name if user.active_language else None,
-        }
-        return self._redis_client.setex(
-            cache_key,
-            time=3600,
-            value=json.dumps(user_data)
-        )
-
-    async def _get_cached_user(self, user_id: int) -> dict | None:
-        cache_key = f'user:{user_id}'
-        cached_user = await self._redis_client.get(cache_key)
-        if cached_user:
-            logger.debug(f"User {user_id} found in cache")
-            return json.loads(cached_user)
-        logger.debug(f"User {user_id} not found in cache")
-        return None
+    def _is_streak_active(self, profile: dict) -> bool:
+        """
+        Tells if the user has already completed a lesson today. Read-only: lapsed streaks
+        are reset by the background streak sweeper, not on login.
+        """
+        return completed_lesson_today(profile['last_lesson_date'], profile['timezone'])
+
+    async def _load_profile(self, user_id: int) -> dict | None:
+        logger.debug(f"Fetching user with ID: {user_id}")
+        user = await self._repository.get_user_by_id(user_id)
+        return UserMapper.to_user_profile_cache(user) if user else None
 
     async def get_user_by_id(self, user_id: int) -> ServiceResult:
         try:
-            await self._redis_client.delete(f'user:{user_id}')
-            logger.debug(f"Checking cache for user with ID: {user_id}")
-            cached_user = await self._get_cached_user(user_id)
-            if cached_user:
-                logger.info(f"User {user_id} found in cache")
-                return ServiceResult.success(UserMapper.to_user_cache_auth_response(cached_user))
-
-            logger.debug(f"Fetching user with ID: {user_id}")
-            user = await self._repository.get_user_by_id(user_id)
-            if not user:
+            profile = await self._profile_cache.get_or_load(user_id, self._load_profile)
+            if not profile:
                 logger.info(f"User with ID {user_id} not found")
                 return ServiceResult.failure(f'User with ID {user_id} not found', status_code=404)
 
-            logger.debug(f"User found: {user}")
-            is_streak = await self._is_streak_active(user)
-
+            is_streak = self._is_streak_active(profile)
             logger.debug(f"User {user_id} streak status: {is_streak}")
-            await self._cache_user(user, is_streak)
-            logger.info(f"User {user_id} cached successfully")
-
-            return ServiceResult.success(UserMapper.to_user_auth_response(user, is_streak))
+            return ServiceResult.success(UserMapper.to_user_cache_auth_response(profile, is_streak))
 
         except Exception as e:
             logger.error(f"Error fetching user with ID {user_id}: {e}")
             return ServiceResult.failure('Error fetching user', status_code=500)
 
     async def auth_user(self, request: UserAuthRequest) -> ServiceResult:
+        """
+        Logs the user in (creating them on the first login) and issues the access token.
+        The Telegram initData must be signed by the bot and belong to the user, unless AUTH_INSECURE_DEV is set.
+        """
         logger.debug('Authenticating user with request: %s', request)
-
+        if not AUTH_INSECURE_DEV:
+            if not TELEGRAM_BOT_TOKEN:
+                logger.error("TELEGRAM_BOT_TOKEN is not set, rejecting login")
+                return ServiceResult.failure('Telegram authentication is not configured', status_code=401)
+            try:
+                telegram_user = verify_init_data(request.init_data, TELEGRAM_BOT_TOKEN)
+            except ValueError as e:
+                logger.warning(f"Telegram authentication of user {request.user_id} failed: {e}")
+                return ServiceResult.failure(f'Telegram authentication failed: {e}', status_code=401)
+            if int(telegram_user['id']) != request.user_id:
+                logger.warning(f"initData of user {telegram_user['id']} used to log in as user {request.user_id}")
+                return ServiceResult.failure('Telegram authentication failed: initData of another user', status_code=403)
+
+        result = await self._get_or_create_user(request)
+        if result.is_success:
+            result.data.access_token = JWTManager.create_user_token(request.user_id)
+        return result
+
+    async def _get_or_create_user(self, request: UserAuthRequest) -> ServiceResult:
         user_result = await self.get_user_by_id(request.user_id)
         if user_result.is_success:
             logger.debug(f"User with ID {request.user_id} found")
@@ -114,6 +89,7 @@ class UserService:
                 timezone= request.timezone
             )
             logger.info(f"New user created: {new_user.user_id}")
+            await self._profile_cache.set(UserMapper.to_user_profile_cache(new_user))
             return ServiceResult.success(UserMapper.to_user_auth_response(new_user, False))
         except Exception as e:
             logger.error(f"Error creating user: {e}")
@@ -127,20 +103,21 @@ class UserService:
                 logger.warning(f"Language with ID {request.language_id} not found")
                 return ServiceResult.failure(f'Language with ID {request.language_id} not found', status_code=404)
 
-            user = await self._repository.get_user_by_id(user_id)
-            if not user:
-                logger.warning(f"User with ID {user_id} not found")
-                return ServiceResult.failure(f'User with ID {user_id} not found', status_code=404)
-
-            await self._repository.update_active_language(
-                user_id=user.user_id,
+            updated = await self._repository.update_active_language(
+                user_id=user_id,
                 language_id=language.language_id
             )
+            if not updated:
+                logger.warning(f"User with ID {user_id} not found")
+                return ServiceResult.failure(f'User with ID {user_id} not found', status_code=404)
             logger.info(f"Active language updated for user ID {user_id}")
 
-            # Invalidate the cache for the user
-            await self._redis_client.delete(f'user:{user_id}')
-            logger.debug(f"Cache for user {user_id} invalidated")
+            await self._profile_cache.update(
+                user_id,
+                active_language_id=language.language_id,
+                active_language_name=language.name
+            )
+            logger.debug(f"Cached profile of user {user_id} updated")
 
             return ServiceResult.success(
                 LanguageUpdateResponse(
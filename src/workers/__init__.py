@@ -0,0 +1,3 @@
+from .progress_queue import ProgressQueue, RedisStreamProgressQueue, InMemoryProgressQueue, WRITE_BEHIND_ENABLED
+from .progress_writer import run_progress_writer
+from .streak_sweeper import sweep_lapsed_streaks, run_streak_sweeper
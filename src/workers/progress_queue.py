@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from src.cache import progress_stream_key, legacy_progress_stream_keys
+
+logger = logging.getLogger('progress_queue')
+
+# Opt-in: completed lessons are queued and written to the database by a background consumer
+WRITE_BEHIND_ENABLED = os.getenv('LESSON_RESULTS_WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes')
+
+
+class ProgressQueue(ABC):
+    """
+    Durable queue of completed lesson results waiting to be written to the database.
+    Items are dicts with user_id, lesson_id, language_id, xp_earned, success_percent and completed_at.
+    Items read but not acknowledged are delivered again.
+    """
+    @abstractmethod
+    async def push(self, item: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def read(self, count: int, block_ms: int) -> list[tuple[str, dict]]:
+        ...
+
+    @abstractmethod
+    async def ack(self, item_ids: list[str]) -> None:
+        ...
+
+
+def _encode_item(item: dict) -> dict:
+    return {**item, 'completed_at': item['completed_at'].isoformat()}
+
+
+def _decode_item(fields: dict) -> dict:
+    return {
+        'user_id': int(fields['user_id']),
+        'lesson_id': int(fields['lesson_id']),
+        # items queued by older releases have no language
+        'language_id': int(fields.get('language_id') or 0),
+        'xp_earned': int(fields['xp_earned']),
+        'success_percent': int(fields['success_percent']),
+        'completed_at': datetime.fromisoformat(fields['completed_at']),
+    }
+
+
+# Moves the entries of a stream of an older release (KEYS[1]) to the current one (KEYS[2]).
+# The whole stream with its consumer groups is renamed when the current one does not exist yet,
+# otherwise the entries are appended and delivered again, like entries of a crashed consumer.
+_MIGRATE_STREAM_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    redis.call('RENAME', KEYS[1], KEYS[2])
+    return -1
+end
+local entries = redis.call('XRANGE', KEYS[1], '-', '+')
+for _, entry in ipairs(entries) do
+    redis.call('XADD', KEYS[2], '*', unpack(entry[2]))
+end
+redis.call('DEL', KEYS[1])
+return #entries
+"""
+
+
+class RedisStreamProgressQueue(ProgressQueue):
+    """
+    Queue on top of a Redis stream and a consumer group. Entries left pending by a crashed
+    consumer for longer than `claim_idle_ms` are claimed by the next reader.
+    The stream key is outside the cache namespace, entries survive cache schema bumps.
+    """
+    def __init__(self, redis_client: Redis, claim_idle_ms: int = 60000, migrate_interval: float = 60):
+        self._redis_client = redis_client
+        self.stream = progress_stream_key()
+        self._migrate_script = redis_client.register_script(_MIGRATE_STREAM_SCRIPT)
+        self.migrate_interval = migrate_interval
+        self._migrated_at: float | None = None
+        self.group = 'progress_writers'
+        self.consumer = uuid.uuid4().hex
+        self.claim_idle_ms = claim_idle_ms
+        self._group_created = False
+
+    async def _ensure_group(self) -> None:
+        if self._group_created:
+            return
+        try:
+            await self._redis_client.xgroup_create(self.stream, self.group, id='0', mkstream=True)
+        except ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+        self._group_created = True
+
+    async def _migrate_legacy_streams(self) -> None:
+        """
+        Takes over the entries workers of older releases queued, also while they still run during a rolling deploy.
+        """
+        if self._migrated_at is not None and time.monotonic() - self._migrated_at < self.migrate_interval:
+            return
+        for legacy_stream in legacy_progress_stream_keys():
+            moved = await self._migrate_script(keys=[legacy_stream, self.stream])
+            if moved:
+                logger.warning(f'Moved completed lessons of {legacy_stream} to {self.stream}')
+        self._migrated_at = time.monotonic()
+
+    async def push(self, item: dict) -> None:
+        await self._redis_client.xadd(self.stream, _encode_item(item))
+
+    async def read(self, count: int, block_ms: int) -> list[tuple[str, dict]]:
+        await self._migrate_legacy_streams()
+        await self._ensure_group()
+        _, claimed, *_ = await self._redis_client.xautoclaim(
+            self.stream, self.group, self.consumer, min_idle_time=self.claim_idle_ms, count=count
+        )
+        entries = [entry for entry in claimed if entry[1]]
+        if not entries:
+            response = await self._redis_client.xreadgroup(
+                self.group, self.consumer, {self.stream: '>'}, count=count, block=block_ms
+            )
+            entries = response[0][1] if response else []
+        return [(entry_id, _decode_item(fields)) for entry_id, fields in entries]
+
+    async def ack(self, item_ids: list[str]) -> None:
+        if not item_ids:
+            return
+        async with self._redis_client.pipeline(transaction=True) as pipe:
+            pipe.xack(self.stream, self.group, *item_ids)
+            pipe.xdel(self.stream, *item_ids)
+            await pipe.execute()
+
+
+class InMemoryProgressQueue(ProgressQueue):
+    """
+    In-process stand-in for tests and local runs. Not durable across restarts.
+    """
+    def __init__(self):
+        self._items: asyncio.Queue[tuple[str, dict]] = asyncio.Queue()
+        self._pending: dict[str, dict] = {}
+
+    async def push(self, item: dict) -> None:
+        await self._items.put((uuid.uuid4().hex, item))
+
+    async def read(self, count: int, block_ms: int) -> list[tuple[str, dict]]:
+        if self._pending:
+            return list(self._pending.items())[:count]
+        try:
+            entries = [await asyncio.wait_for(self._items.get(), timeout=block_ms / 1000)]
+        except asyncio.TimeoutError:
+            return []
+        while len(entries) < count and not self._items.empty():
+            entries.append(self._items.get_nowait())
+        self._pending.update(entries)
+        return entries
+
+    async def ack(self, item_ids: list[str]) -> None:
+        for item_id in item_ids:
+            self._pending.pop(item_id, None)
@@ -0,0 +1,52 @@
+import asyncio
+import logging
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.cache import UserProfileCache
+from src.repository import LessonsRepository
+from src.services.leaderboards import Leaderboards
+from src.services.mappers import UserMapper
+from .progress_queue import ProgressQueue
+
+logger = logging.getLogger('progress_writer')
+
+
+async def run_progress_writer(queue: ProgressQueue, session_factory: async_sessionmaker, redis_client: Redis,
+                              batch_size: int = 100, block_ms: int = 250, retry_delay: float = 1.0) -> None:
+    """
+    Background consumer of the progress queue. Every batch is written in one transaction
+    and acknowledged only after the commit, so a failed batch is delivered again.
+    Cached profiles of the updated users are refreshed after the commit. The XP of rejected results,
+    credited to the leaderboards when they were queued, is taken back.
+    `block_ms` must stay below the Redis command timeout.
+    """
+    profile_cache = UserProfileCache(redis_client)
+    leaderboards = Leaderboards(redis_client)
+    while True:
+        try:
+            entries = await queue.read(batch_size, block_ms)
+            if not entries:
+                continue
+            async with session_factory() as session:
+                users, rejected = await LessonsRepository(session).save_user_progress_batch(
+                    [item for _, item in entries]
+                )
+            # acknowledged first: a batch delivered again after its commit would be rejected as already completed
+            await queue.ack([entry_id for entry_id, _ in entries])
+            logger.debug(f"Saved {len(entries) - len(rejected)} lesson results")
+            try:
+                await profile_cache.update_many({user.user_id: UserMapper.to_user_progress_cache(user) for user in users})
+                for item in rejected:
+                    logger.warning(f"Lesson result rejected: user {item['user_id']}, lesson {item['lesson_id']}")
+                    await leaderboards.add_xp(item['user_id'], item['language_id'], -item['xp_earned'], item['completed_at'])
+            except RedisError as e:
+                # profiles expire, leaderboards are restored by rebuild_leaderboards
+                logger.warning(f"Cached profiles or leaderboards not updated after saving lesson results: {e!r}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error writing lesson results: {e}")
+            await asyncio.sleep(retry_delay)
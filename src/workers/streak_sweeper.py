@@ -0,0 +1,77 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+import pytz
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.cache import streak_sweep_key, streak_timezones_key, UserProfileCache, encode_value, decode_value
+from src.repository import UserRepository
+
+logger = logging.getLogger('streak_sweeper')
+
+SWEEP_MARKER_TTL = 172800  # 2 days, a sweep marker is only checked during its local date
+# The timezones of the users are read from the database once per TTL for all workers.
+# A timezone new to the list is swept later, but still during its local date.
+TIMEZONES_TTL = 3600
+
+
+async def _get_timezones(repository: UserRepository, redis_client: Redis) -> list[str]:
+    cached = await redis_client.get(streak_timezones_key())
+    if cached:
+        try:
+            return decode_value(cached)
+        except ValueError:
+            logger.warning("Malformed cached timezones, reading them from the database")
+    timezones = await repository.get_timezones()
+    await redis_client.set(streak_timezones_key(), encode_value(timezones), ex=TIMEZONES_TTL)
+    return timezones
+
+
+async def sweep_lapsed_streaks(session_factory: async_sessionmaker, redis_client: Redis) -> int:
+    """
+    Resets lapsed streaks once per timezone and local date, shortly after the local midnight.
+    A user's streak lapses when their last lesson was before the start of yesterday (local time).
+    Every timezone is swept by one worker only, taken through a Redis marker.
+    Returns the number of reset streaks.
+    """
+    reset_count = 0
+    profile_cache = UserProfileCache(redis_client)
+    async with session_factory() as session:
+        repository = UserRepository(session)
+        for timezone in await _get_timezones(repository, redis_client):
+            try:
+                tz = pytz.timezone(timezone)
+            except pytz.exceptions.UnknownTimeZoneError:
+                logger.warning(f"Skipping unknown timezone {timezone}")
+                continue
+
+            today = datetime.now(tz).date()
+            if not await redis_client.set(streak_sweep_key(timezone, today.isoformat()), 1, nx=True, ex=SWEEP_MARKER_TTL):
+                continue
+
+            cutoff = tz.localize(datetime.combine(today - timedelta(days=1), datetime.min.time()))
+            try:
+                user_ids = await repository.reset_lapsed_streaks(timezone, cutoff)
+            except Exception:
+                await redis_client.delete(streak_sweep_key(timezone, today.isoformat()))
+                raise
+            await profile_cache.update_many({user_id: {'streak': 0} for user_id in user_ids})
+            reset_count += len(user_ids)
+            logger.info(f"Reset {len(user_ids)} lapsed streaks in {timezone}")
+    return reset_count
+
+
+async def run_streak_sweeper(session_factory: async_sessionmaker, redis_client: Redis, interval: float = 600) -> None:
+    """
+    Background task checking every `interval` seconds whether a new local day started in any timezone.
+    """
+    while True:
+        try:
+            await sweep_lapsed_streaks(session_factory, redis_client)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Streak sweep failed: {e}")
+        await asyncio.sleep(interval)
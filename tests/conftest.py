@@ -0,0 +1,140 @@
+import asyncio
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Awaitable, Callable, ContextManager, Iterator
+
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis, FakeAsyncRedisConnection
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+# read when src.auth is imported; tests log in without Telegram initData unless they turn the flag off
+os.environ.setdefault('JWT_SECRET', 'test-secret')
+os.environ.setdefault('AUTH_INSECURE_DEV', 'true')
+
+from src.cache import CircuitBreaker, CircuitBreakerRedis
+from src.cache.lesson_cache import clear_local_caches
+from tests.helpers import seeded_sessions, count_queries
+
+
+@pytest.fixture
+def database(tmp_path) -> str:
+    return str(tmp_path / 'test.db')
+
+
+class LatencyFakeConnection(FakeAsyncRedisConnection):
+    """
+    Fake Redis connection answering every command after `latency` seconds.
+    """
+    latency = 0.0
+
+    async def read_response(self, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await super().read_response(**kwargs)
+
+
+class FakeCircuitBreakerRedis(CircuitBreakerRedis, FakeRedis):
+    def set_latency(self, latency: float) -> None:
+        self.connection_pool.connection_class.latency = latency
+
+
+@pytest.fixture
+def fake_redis() -> Callable[..., FakeCircuitBreakerRedis]:
+    """
+    Creates fake Redis clients guarded by a circuit breaker, with the latency of the fake server adjustable
+    through `set_latency`. Clients passed the same `server` share its data, like workers of one deployment.
+    Clients must be created inside the event loop using them.
+    """
+    def create(failure_threshold: int = 2, reset_timeout: float = 0.2, command_timeout: float = 0.05,
+               server: FakeServer | None = None) -> FakeCircuitBreakerRedis:
+        return FakeCircuitBreakerRedis(
+            server=server,
+            decode_responses=True,
+            connection_class=type('LatencyFakeConnection', (LatencyFakeConnection,), {}),
+            breaker=CircuitBreaker(failure_threshold, reset_timeout, command_timeout),
+        )
+
+    return create
+
+
+@pytest.fixture
+def explain(database) -> Callable[[Callable[[AsyncSession], Awaitable]], list[tuple[str, list[str]]]]:
+    """
+    Runs the action against a seeded database and returns every statement it emitted
+    together with its `EXPLAIN QUERY PLAN` details.
+    """
+    def run(action: Callable[[AsyncSession], Awaitable]) -> list[tuple[str, list[str]]]:
+        async def capture() -> list[tuple[str, tuple]]:
+            sessions = await seeded_sessions(database)
+            engine = sessions.kw['bind']
+
+            statements = []
+
+            def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+                statements.append((statement, parameters))
+
+            event.listen(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+            async with sessions() as session:
+                await action(session)
+            await engine.dispose()
+            return statements
+
+        plans = []
+        with sqlite3.connect(database) as connection:
+            for statement, parameters in asyncio.run(capture()):
+                rows = connection.execute(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+                plans.append((statement, [row[-1] for row in rows]))
+        return plans
+
+    return run
+
+
+@pytest.fixture
+def api(database, fake_redis) -> Iterator[Callable[[], Awaitable[tuple[AsyncClient, AsyncEngine]]]]:
+    """
+    Creates a client of the app backed by a seeded database and a fake Redis, with empty caches.
+    Returns the client and the engine of the database. Must be awaited inside the event loop using them.
+    """
+    import main
+    from src.config import get_db, get_redis_client, get_progress_queue
+
+    async def create() -> tuple[AsyncClient, AsyncEngine]:
+        sessions = await seeded_sessions(database)
+        redis = fake_redis()
+
+        async def get_test_db():
+            async with sessions() as session:
+                yield session
+
+        main.app.dependency_overrides.update({
+            get_db: get_test_db,
+            get_redis_client: lambda: redis,
+            get_progress_queue: lambda: None,
+        })
+        return AsyncClient(transport=ASGITransport(app=main.app), base_url='http://test'), sessions.kw['bind']
+
+    clear_local_caches()
+    yield create
+    main.app.dependency_overrides.clear()
+    clear_local_caches()
+
+
+@pytest.fixture
+def assert_max_queries() -> Callable[[AsyncEngine, int], ContextManager[list[str]]]:
+    """
+    Fails the test when the block runs more than `limit` statements on the engine, listing them.
+    Guards against N+1 queries, e.g. through lazy loaded relationships.
+    """
+    @contextmanager
+    def check(engine: AsyncEngine, limit: int) -> Iterator[list[str]]:
+        with count_queries(engine) as statements:
+            yield statements
+        assert len(statements) <= limit, (
+            f'{len(statements)} statements run, at most {limit} expected:\n' + '\n'.join(statements)
+        )
+
+    return check
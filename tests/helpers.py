@@ -0,0 +1,76 @@
+"""
+Helpers shared by the tests, the fixtures using them are in conftest.py.
+"""
+import re
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from src.auth import JWTManager
+from src.database.models import Base, PLanguageModel, LessonModel, QuestionModel, AnswerModel, UserModel
+
+# `SCAN lessons` (or `SCAN TABLE lessons` on older SQLite) without an index is a full table scan,
+# automatic indexes are built by SQLite for a single statement when a real index is missing
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?\w+$|AUTOMATIC')
+
+
+async def seed(session: AsyncSession) -> None:
+    session.add(PLanguageModel(language_id=1, name='Python'))
+    for lesson_id in (1, 2, 3):
+        session.add(LessonModel(
+            lesson_id=lesson_id,
+            title=f'Lesson {lesson_id}',
+            description='',
+            language_id=1,
+            questions=[
+                QuestionModel(
+                    question_text=f'Question {number}',
+                    answers=[AnswerModel(answer_text=f'Answer {answer}', is_correct=int(answer == 0)) for answer in range(4)]
+                )
+                for number in range(3)
+            ]
+        ))
+    session.add(UserModel(user_id=42, first_name='Test', timezone='UTC', active_language_id=1))
+    await session.commit()
+
+
+async def seeded_sessions(database: str) -> async_sessionmaker:
+    engine = create_async_engine(f'sqlite+aiosqlite:///{database}')
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessions() as session:
+        await seed(session)
+    return sessions
+
+
+def auth_headers(user_id: int) -> dict[str, str]:
+    return {'Authorization': f'Bearer {JWTManager.create_user_token(user_id)}'}
+
+
+@contextmanager
+def count_queries(engine: AsyncEngine) -> Iterator[list[str]]:
+    """
+    Collects the statements the engine runs inside the block.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def full_scans(plans: list[tuple[str, list[str]]]) -> list[str]:
+    return [
+        f'{detail}\n    in: {statement}'
+        for statement, details in plans
+        for detail in details
+        if FULL_SCAN.search(detail)
+    ]
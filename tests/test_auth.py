@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+from urllib.parse import urlencode
+
+import pytest
+
+from src.auth import JWTManager, VerifiedTokenCache, verify_init_data, check_auth_settings
+from tests.helpers import auth_headers
+
+BOT_TOKEN = '123456:test-token'
+
+
+def sign_init_data(user: dict, auth_date: int, bot_token: str = BOT_TOKEN) -> str:
+    fields = {'auth_date': str(auth_date), 'query_id': 'AAE', 'user': json.dumps(user)}
+    data_check_string = '\n'.join(f'{name}={value}' for name, value in sorted(fields.items()))
+    secret_key = hmac.new(b'WebAppData', bot_token.encode(), hashlib.sha256).digest()
+    fields['hash'] = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return urlencode(fields)
+
+
+def test_init_data_signed_by_the_bot_is_accepted():
+    init_data = sign_init_data({'id': 42, 'first_name': 'Test'}, int(time.time()))
+    assert verify_init_data(init_data, BOT_TOKEN)['id'] == 42
+
+
+@pytest.mark.parametrize('init_data', [
+    sign_init_data({'id': 42}, int(time.time()), bot_token='654321:other-token'),
+    sign_init_data({'id': 42}, int(time.time())).replace('42', '43'),
+    sign_init_data({'id': 42}, int(time.time()) - 2 * 86400),
+    'not a query string',
+], ids=['other bot', 'tampered', 'expired', 'malformed'])
+def test_forged_or_expired_init_data_is_rejected(init_data):
+    with pytest.raises(ValueError):
+        verify_init_data(init_data, BOT_TOKEN)
+
+
+def test_verified_token_is_not_decoded_again(monkeypatch):
+    cache = VerifiedTokenCache()
+    token = JWTManager.create_user_token(42)
+    decoded = []
+    decode_token = JWTManager.decode_token
+    monkeypatch.setattr(JWTManager, 'decode_token', lambda token_: decoded.append(token_) or decode_token(token_))
+
+    assert cache.verify(token) == 42
+    assert cache.verify(token) == 42
+    assert len(decoded) == 1
+
+    with pytest.raises(ValueError):
+        cache.verify(token[:-2])
+    with pytest.raises(ValueError):
+        cache.verify(token[:-2])
+    assert len(decoded) == 3
+
+
+def test_protected_routes_require_a_token(api):
+    async def scenario():
+        client, _ = await api()
+        for headers in ({}, {'Authorization': 'Bearer invalid'}):
+            response = await client.get('/api/lessons/actual-lesson/42', headers=headers)
+            assert response.status_code == 401
+            assert response.headers['WWW-Authenticate'] == 'Bearer'
+        assert (await client.get('/api/lessons/all')).status_code == 200
+
+    asyncio.run(scenario())
+
+
+def test_users_cannot_act_for_each_other(api):
+    async def scenario():
+        client, _ = await api()
+        response = await client.get('/api/lessons/actual-lesson/42', headers=auth_headers(43))
+        assert response.status_code == 403
+
+        started = await client.post('/api/lessons/start', json={'user_id': 42, 'lesson_id': 1}, headers=auth_headers(42))
+        session_id = started.json()['session_id']
+        question = started.json()['questions'][0]
+        check = {'session_id': session_id, 'question_id': question['question_id'],
+                 'answer_id': question['answers'][0]['answer_id']}
+        assert (await client.post('/api/lessons/check', json=check, headers=auth_headers(43))).status_code == 403
+        assert (await client.post('/api/lessons/check', json=check, headers=auth_headers(42))).status_code == 200
+
+    asyncio.run(scenario())
+
+
+def test_login_is_refused_without_a_bot_token(api, monkeypatch):
+    monkeypatch.setattr('src.services.user_service.AUTH_INSECURE_DEV', False)
+    monkeypatch.setattr('src.services.user_service.TELEGRAM_BOT_TOKEN', None)
+
+    async def scenario():
+        client, _ = await api()
+        response = await client.post('/api/user/auth', json={'user_id': 42, 'first_name': 'Test'})
+        assert response.status_code == 401
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize('settings', [
+    {'JWT_SECRET': None, 'TELEGRAM_BOT_TOKEN': BOT_TOKEN, 'AUTH_INSECURE_DEV': False},
+    {'JWT_SECRET': 'secret', 'TELEGRAM_BOT_TOKEN': None, 'AUTH_INSECURE_DEV': False},
+], ids=['no JWT secret', 'no bot token'])
+def test_app_refuses_to_start_with_insecure_settings(monkeypatch, settings):
+    for name, value in settings.items():
+        monkeypatch.setattr(f'src.auth.settings.{name}', value)
+    with pytest.raises(RuntimeError):
+        check_auth_settings()
+
+
+def test_auth_issues_a_token_for_the_verified_user(api, monkeypatch):
+    monkeypatch.setattr('src.services.user_service.AUTH_INSECURE_DEV', False)
+    monkeypatch.setattr('src.services.user_service.TELEGRAM_BOT_TOKEN', BOT_TOKEN)
+
+    async def scenario():
+        client, _ = await api()
+        init_data = sign_init_data({'id': 42, 'first_name': 'Test'}, int(time.time()))
+        forged = await client.post('/api/user/auth', json={'user_id': 42, 'first_name': 'Test', 'init_data': 'hash=0'})
+        assert forged.status_code == 401
+        other_user = await client.post('/api/user/auth', json={'user_id': 43, 'first_name': 'Test', 'init_data': init_data})
+        assert other_user.status_code == 403
+
+        response = await client.post('/api/user/auth', json={'user_id': 42, 'first_name': 'Test', 'init_data': init_data})
+        assert response.status_code == 200
+        token = response.json()['access_token']
+        me = await client.get('/api/user/me', headers={'Authorization': f'Bearer {token}'})
+        assert me.status_code == 200
+        assert me.json()['user']['user_id'] == 42
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize('method, url, body', [
+    ('POST', '/api/language/add-language', {'name': 'Go'}),
+    ('POST', '/api/lessons/add-lesson', {}),
+    ('POST', '/api/lessons/import', []),
+    ('POST', '/api/questions/', {}),
+], ids=['add-language', 'add-lesson', 'import', 'questions'])
+def test_content_writes_require_an_admin(api, monkeypatch, method, url, body):
+    monkeypatch.setattr('src.auth.dependencies.ADMIN_USER_IDS', frozenset({1}))
+
+    async def scenario():
+        client, _ = await api()
+        assert (await client.request(method, url, json=body)).status_code == 401
+        assert (await client.request(method, url, json=body, headers=auth_headers(42))).status_code == 403
+        assert (await client.request(method, url, json=body, headers=auth_headers(1))).status_code not in (401, 403)
+
+    asyncio.run(scenario())
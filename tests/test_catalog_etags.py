@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from tests.helpers import auth_headers
+
+ADMIN = 1
+LANGUAGE = {'name': 'Go', 'description': '', 'picture': '', 'level': 'beginner', 'popularity': 1}
+LESSON = {
+    'title': 'Imported', 'language_id': 1,
+    'questions': [{'text': 'Question', 'answers': [{'text': f'Answer {number}', 'is_correct': number == 0} for number in range(4)]}],
+}
+
+
+@pytest.fixture(autouse=True)
+def admin(monkeypatch):
+    monkeypatch.setattr('src.auth.dependencies.ADMIN_USER_IDS', frozenset({ADMIN}))
+
+
+def test_etag_is_stable_across_requests(api):
+    async def scenario():
+        client, _ = await api()
+        for url in ('/api/lessons/all', '/api/language/available'):
+            first, second = await client.get(url), await client.get(url)
+            assert first.status_code == second.status_code == 200
+            assert first.headers['ETag'] == second.headers['ETag']
+            assert first.headers['Cache-Control']
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize('if_none_match', [
+    lambda etag: etag,
+    lambda etag: '*',
+    lambda etag: f'W/{etag}',
+    lambda etag: f'"stale", {etag}',
+], ids=['exact', 'any', 'weak', 'list'])
+def test_matching_if_none_match_is_not_modified_without_sql(api, assert_max_queries, if_none_match):
+    async def scenario():
+        client, engine = await api()
+        for url in ('/api/lessons/all', '/api/language/available'):
+            etag = (await client.get(url)).headers['ETag']
+            with assert_max_queries(engine, 0):
+                response = await client.get(url, headers={'If-None-Match': if_none_match(etag)})
+            assert response.status_code == 304
+            assert response.headers['ETag'] == etag
+            assert not response.content
+
+            stale = await client.get(url, headers={'If-None-Match': '"stale"'})
+            assert stale.status_code == 200
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize('catalog, change', [
+    ('/api/language/available', lambda client: client.post('/api/language/add-language', json=LANGUAGE, headers=auth_headers(ADMIN))),
+    ('/api/lessons/all', lambda client: client.post('/api/lessons/import', json=LESSON, headers=auth_headers(ADMIN))),
+], ids=['add-language', 'import'])
+def test_etag_changes_when_the_catalog_changes(api, catalog, change):
+    async def scenario():
+        client, _ = await api()
+        etag = (await client.get(catalog)).headers['ETag']
+        changed = await change(client)
+        assert changed.status_code == 200 and not changed.json().get('errors'), changed.text
+        response = await client.get(catalog, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    asyncio.run(scenario())
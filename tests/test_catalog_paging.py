@@ -0,0 +1,54 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import main
+from src.config import get_redis_client
+from src.database.models import LessonModel
+from src.services.lessons_service import CATALOG_PAGE_SIZE
+
+
+async def add_lessons(engine, count: int) -> None:
+    async with AsyncSession(engine) as session:
+        session.add_all(LessonModel(title=f'Extra {number}', description='', language_id=1) for number in range(count))
+        await session.commit()
+
+
+def test_pages_follow_next_cursor_to_the_end(api):
+    async def scenario():
+        client, _ = await api()
+        first = (await client.get('/api/lessons/all', params={'limit': 2})).json()
+        assert [lesson['test_id'] for lesson in first['lessons']] == [1, 2]
+        assert first['next_cursor'] == 2
+
+        last = (await client.get('/api/lessons/all', params={'limit': 2, 'cursor': first['next_cursor']})).json()
+        assert [lesson['test_id'] for lesson in last['lessons']] == [3]
+        assert last['next_cursor'] is None
+
+        other_language = (await client.get('/api/lessons/all', params={'language_id': 999})).json()
+        assert other_language == {'lessons': [], 'next_cursor': None}
+
+    asyncio.run(scenario())
+
+
+def test_only_pages_of_returned_cursors_are_cached(api, assert_max_queries):
+    async def scenario():
+        client, engine = await api()
+        await add_lessons(engine, CATALOG_PAGE_SIZE)
+        redis = main.app.dependency_overrides[get_redis_client]()
+
+        first = (await client.get('/api/lessons/all')).json()
+        assert len(first['lessons']) == CATALOG_PAGE_SIZE
+        second = await client.get('/api/lessons/all', params={'cursor': first['next_cursor']})
+        with assert_max_queries(engine, 0):
+            cached = await client.get('/api/lessons/all', params={'cursor': first['next_cursor']})
+        assert cached.content == second.content
+        cached_keys = await redis.dbsize()
+
+        for cursor in (1, 7, 13):
+            assert (await client.get('/api/lessons/all', params={'cursor': cursor})).status_code == 200
+        for language_id in (999, 1000):
+            assert (await client.get('/api/lessons/all', params={'language_id': language_id})).status_code == 200
+        assert await redis.dbsize() == cached_keys
+
+    asyncio.run(scenario())
@@ -0,0 +1,53 @@
+import asyncio
+import json
+
+import msgpack
+import pytest
+
+from src.core import negotiate_media_type
+from src.services.service_result import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE
+from tests.helpers import auth_headers
+
+HEADERS = auth_headers(42)
+
+
+@pytest.mark.parametrize('accept, media_type', [
+    (None, JSON_MEDIA_TYPE),
+    ('*/*', JSON_MEDIA_TYPE),
+    ('application/json', JSON_MEDIA_TYPE),
+    ('application/msgpack', MSGPACK_MEDIA_TYPE),
+    ('application/x-msgpack', MSGPACK_MEDIA_TYPE),
+    ('application/msgpack, application/json', MSGPACK_MEDIA_TYPE),
+    ('application/json;q=0.5, application/msgpack;q=0.9', MSGPACK_MEDIA_TYPE),
+    ('application/msgpack;q=0.5, application/json', JSON_MEDIA_TYPE),
+    ('application/msgpack;q=0', JSON_MEDIA_TYPE),
+    ('application/msgpack;q=invalid', JSON_MEDIA_TYPE),
+])
+def test_msgpack_is_chosen_only_when_preferred(accept, media_type):
+    assert negotiate_media_type(accept) == media_type
+
+
+def test_msgpack_start_body_matches_the_json_one(api):
+    async def scenario():
+        client, _ = await api()
+        start = {'user_id': 42, 'lesson_id': 1}
+        as_json = await client.post('/api/lessons/start', json=start, headers=HEADERS)
+        # the second response is spliced from the questions cached by the first one
+        as_msgpack = await client.post('/api/lessons/start', json=start, headers={**HEADERS, 'Accept': MSGPACK_MEDIA_TYPE})
+
+        assert as_json.headers['content-type'] == JSON_MEDIA_TYPE
+        assert as_msgpack.headers['content-type'] == MSGPACK_MEDIA_TYPE
+        assert msgpack.unpackb(as_msgpack.content) == json.loads(as_json.content)
+        assert as_json.headers['Vary'] == as_msgpack.headers['Vary'] == 'Accept'
+
+    asyncio.run(scenario())
+
+
+def test_negotiated_models_vary_by_accept(api):
+    async def scenario():
+        client, _ = await api()
+        lesson = await client.get('/api/lessons/actual-lesson/42', headers={**HEADERS, 'Accept': MSGPACK_MEDIA_TYPE})
+        assert lesson.headers['Vary'] == 'Accept'
+        assert msgpack.unpackb(lesson.content)['lesson_id'] == 1
+
+    asyncio.run(scenario())
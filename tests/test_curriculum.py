@@ -0,0 +1,36 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import UserModel
+from src.repository import LessonsRepository
+from tests.helpers import auth_headers, seeded_sessions
+
+
+def test_next_lesson_skips_lessons_completed_out_of_order(database):
+    async def scenario():
+        sessions = await seeded_sessions(database)
+        async with sessions() as session:
+            repository = LessonsRepository(session)
+            await repository.save_user_progress(42, 2, 100, 100)
+            assert (await repository.get_unfinished_lesson_with_tests(42, 1)).lesson_id == 1
+
+            # the next day
+            user = await session.get(UserModel, 42)
+            user.last_lesson_date = None
+            await repository.save_user_progress(42, 1, 100, 100)
+            assert (await repository.get_unfinished_lesson_with_tests(42, 1)).lesson_id == 3
+
+    asyncio.run(scenario())
+
+
+def test_user_without_an_active_language_gets_a_bad_request(api):
+    async def scenario():
+        client, engine = await api()
+        async with AsyncSession(engine) as session:
+            session.add(UserModel(user_id=43, first_name='No language'))
+            await session.commit()
+        response = await client.get('/api/lessons/actual-lesson/43', headers=auth_headers(43))
+        assert response.status_code == 400
+
+    asyncio.run(scenario())
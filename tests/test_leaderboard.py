@@ -0,0 +1,56 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import main
+from src.config import get_redis_client
+from src.database.models import UserModel
+from src.services.leaderboards import Leaderboards
+from tests.helpers import auth_headers
+
+HEADERS = auth_headers(42)
+
+
+async def complete_lesson(client, lesson_id: int) -> int:
+    started = (await client.post('/api/lessons/start', json={'user_id': 42, 'lesson_id': lesson_id}, headers=HEADERS)).json()
+    for question in started['questions']:
+        answer_id = next(answer['answer_id'] for answer in question['answers'] if answer['answer_text'] == 'Answer 0')
+        response = await client.post('/api/lessons/check', headers=HEADERS, json={
+            'session_id': started['session_id'], 'question_id': question['question_id'], 'answer_id': answer_id,
+        })
+        assert response.status_code == 200, response.text
+    result = await client.get(f"/api/lessons/result/{started['session_id']}", headers=HEADERS)
+    return result.json()['xp_earned']
+
+
+def test_leaderboards_are_ordered_and_rank_the_user(api):
+    async def scenario():
+        client, engine = await api()
+        async with AsyncSession(engine) as session:
+            session.add_all([UserModel(user_id=7, first_name='Ann', timezone='UTC'),
+                             UserModel(user_id=8, first_name='Bob', timezone='UTC')])
+            await session.commit()
+        leaderboards = Leaderboards(main.app.dependency_overrides[get_redis_client]())
+        await leaderboards.add_xp(7, 1, 30)
+        await leaderboards.add_xp(8, 1, 500)
+
+        assert (await client.get('/api/leaderboard/global', params={'user_id': 42})).json() == {
+            'entries': [
+                {'rank': 1, 'user_id': 8, 'first_name': 'Bob', 'xp': 500},
+                {'rank': 2, 'user_id': 7, 'first_name': 'Ann', 'xp': 30},
+            ],
+            'me': None,
+        }
+
+        xp = await complete_lesson(client, 1)
+        assert 30 < xp < 500
+        for url in ('/api/leaderboard/global', '/api/leaderboard/language/1', '/api/leaderboard/weekly'):
+            body = (await client.get(url, params={'user_id': 42})).json()
+            assert [entry['user_id'] for entry in body['entries']] == [8, 42, 7], url
+            assert body['me'] == {'rank': 2, 'user_id': 42, 'first_name': 'Test', 'xp': xp}
+
+        top = (await client.get('/api/leaderboard/global', params={'limit': 1, 'user_id': 7})).json()
+        assert [entry['user_id'] for entry in top['entries']] == [8]
+        assert top['me']['rank'] == 3
+
+    asyncio.run(scenario())
@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import pytest
+
+from src.schemas.tests_schemas import LessonImportBundle
+from src.services.mappers import LessonsMapper
+from tests.helpers import auth_headers
+
+ADMIN = 1
+LESSON = {
+    'title': 'Imported', 'language_id': 1,
+    'questions': [{'text': 'Question', 'answers': [{'text': f'Answer {number}', 'is_correct': number == 0} for number in range(4)]}],
+}
+
+
+@pytest.fixture(autouse=True)
+def admin(monkeypatch):
+    monkeypatch.setattr('src.auth.dependencies.ADMIN_USER_IDS', frozenset({ADMIN}))
+
+
+def test_ndjson_is_parsed_line_by_line():
+    content = f'{json.dumps(LESSON)}\n\n{{"title": \n[1]\n'.encode()
+
+    bundle, broken, not_object = LessonsMapper.to_import_bundles(content, ndjson=True)
+    assert isinstance(bundle, LessonImportBundle) and bundle.title == 'Imported'
+    assert broken.startswith('Invalid bundle: ')
+    assert not_object.startswith('Invalid bundle: ')
+
+
+def test_json_items_must_be_objects():
+    bundles = LessonsMapper.to_import_bundles(json.dumps([LESSON, 'lesson', 3]), ndjson=False)
+    assert isinstance(bundles[0], LessonImportBundle)
+    assert bundles[1:] == ['Invalid bundle: bundle must be an object'] * 2
+    assert LessonsMapper.to_import_bundles(b'{', ndjson=False)[0].startswith('Invalid JSON')
+
+
+@pytest.mark.parametrize('ndjson', [True, False])
+def test_content_that_is_not_utf8_is_rejected(ndjson):
+    with pytest.raises(UnicodeDecodeError):
+        LessonsMapper.to_import_bundles(b'\xff\xfe{}', ndjson)
+
+
+def test_invalid_bundles_do_not_stop_the_others(api):
+    async def scenario():
+        client, _ = await api()
+        wrong_answers = {**LESSON, 'questions': [{'text': 'Question', 'answers': LESSON['questions'][0]['answers'][:3]}]}
+        unknown_language = {**LESSON, 'language_id': 999}
+        response = await client.post('/api/lessons/import', headers=auth_headers(ADMIN),
+                                     json=[wrong_answers, LESSON, unknown_language, 'lesson'])
+        assert response.status_code == 200, response.text
+
+        body = response.json()
+        assert [lesson['index'] for lesson in body['imported']] == [1]
+        assert {error['index']: error['error'] for error in body['errors']} == {
+            0: 'Question 0: Exactly 4 answers required',
+            2: 'Language with ID 999 not found',
+            3: 'Invalid bundle: bundle must be an object',
+        }
+        lessons = (await client.get('/api/lessons/all', params={'language_id': 1})).json()['lessons']
+        assert [lesson['title'] for lesson in lessons].count('Imported') == 1
+
+    asyncio.run(scenario())
+
+
+def test_ndjson_import(api):
+    async def scenario():
+        client, _ = await api()
+        content = '\n'.join([json.dumps(LESSON), '{"title":', json.dumps({**LESSON, 'title': 'Second'})])
+        response = await client.post('/api/lessons/import', content=content,
+                                     headers={**auth_headers(ADMIN), 'Content-Type': 'application/x-ndjson'})
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert [lesson['title'] for lesson in body['imported']] == ['Imported', 'Second']
+        assert [error['index'] for error in body['errors']] == [1]
+
+        response = await client.post('/api/lessons/import', content=b'\xff' + content.encode(),
+                                     headers={**auth_headers(ADMIN), 'Content-Type': 'application/x-ndjson'})
+        assert response.status_code == 400
+
+    asyncio.run(scenario())
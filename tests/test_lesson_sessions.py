@@ -0,0 +1,200 @@
+import asyncio
+import json
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import main
+from src.config import get_progress_queue
+from src.database.models import UserModel, LessonModel, QuestionModel, AnswerModel
+from src.repository import LessonsRepository
+from src.schemas.tests_schemas import StartLessonRequest, CheckLessonAnswerRequest, MAX_BATCH_ANSWERS
+from src.services import LessonsService
+from src.workers import InMemoryProgressQueue
+from tests.helpers import auth_headers, seeded_sessions
+
+HEADERS = auth_headers(42)
+
+
+def correct_answers(started: dict) -> dict[int, int]:
+    return {
+        question['question_id']: next(answer['answer_id'] for answer in question['answers'] if answer['answer_text'] == 'Answer 0')
+        for question in started['questions']
+    }
+
+
+async def start(client, lesson_id: int = 1) -> tuple[str, dict[int, int]]:
+    response = await client.post('/api/lessons/start', json={'user_id': 42, 'lesson_id': lesson_id}, headers=HEADERS)
+    assert response.status_code == 200, response.text
+    return response.json()['session_id'], correct_answers(response.json())
+
+
+async def check(client, session_id: str, question_id: int, answer_id: int):
+    return await client.post('/api/lessons/check', headers=HEADERS,
+                             json={'session_id': session_id, 'question_id': question_id, 'answer_id': answer_id})
+
+
+def test_failed_save_is_retried_by_the_result(api, monkeypatch):
+    save_user_progress = LessonsRepository.save_user_progress
+
+    async def failing_save(self, **kwargs):
+        raise ConnectionError('database is down')
+
+    async def scenario():
+        client, _ = await api()
+        session_id, answers = await start(client)
+        *first, (last_question, last_answer) = answers.items()
+        for question_id, answer_id in first:
+            assert (await check(client, session_id, question_id, answer_id)).status_code == 200
+
+        monkeypatch.setattr(LessonsRepository, 'save_user_progress', failing_save)
+        assert (await check(client, session_id, last_question, last_answer)).status_code == 503
+        assert (await client.get(f'/api/lessons/result/{session_id}', headers=HEADERS)).status_code == 503
+
+        monkeypatch.setattr(LessonsRepository, 'save_user_progress', save_user_progress)
+        result = await client.get(f'/api/lessons/result/{session_id}', headers=HEADERS)
+        assert result.status_code == 200, result.text
+        assert result.json()['success_percent'] == 100
+        assert (await client.get(f'/api/lessons/result/{session_id}', headers=HEADERS)).json() == result.json()
+
+    asyncio.run(scenario())
+
+
+async def complete(client, lesson_id: int):
+    session_id, answers = await start(client, lesson_id)
+    responses = [await check(client, session_id, question_id, answer_id) for question_id, answer_id in answers.items()]
+    return session_id, responses[-1]
+
+
+def test_second_lesson_of_the_day_is_rejected_before_it_is_queued(api):
+    async def scenario():
+        client, _ = await api()
+        queue = InMemoryProgressQueue()
+        main.app.dependency_overrides[get_progress_queue] = lambda: queue
+
+        session_id, completed = await complete(client, 1)
+        assert completed.status_code == 200
+        xp = (await client.get(f'/api/lessons/result/{session_id}', headers=HEADERS)).json()['xp_earned']
+
+        _, rejected = await complete(client, 2)
+        assert rejected.status_code == 409
+        assert len(await queue.read(10, 10)) == 1
+        leaderboard = (await client.get('/api/leaderboard/global', params={'user_id': 42})).json()
+        assert leaderboard['me']['xp'] == xp
+
+    asyncio.run(scenario())
+
+
+async def check_batch(client, session_id: str, answers: list[tuple[int, int]]):
+    return await client.post('/api/lessons/check-batch', headers=HEADERS, json={
+        'session_id': session_id,
+        'answers': [{'question_id': question_id, 'answer_id': answer_id} for question_id, answer_id in answers],
+    })
+
+
+def test_offline_batch_with_wrong_answers_finishes_the_lesson(api):
+    async def scenario():
+        client, _ = await api()
+        session_id, answers = await start(client)
+        (first_question, first_answer), *rest = answers.items()
+
+        response = await check_batch(client, session_id, [(first_question, first_answer + 1), *rest])
+        assert response.status_code == 200, response.text
+        assert [answer['is_correct'] for answer in response.json()['answers']] == [False, True, True]
+        assert response.json()['result']['success_percent'] == 66
+
+    asyncio.run(scenario())
+
+
+def test_batch_accepts_retries_until_the_correct_answer(api):
+    async def scenario():
+        client, _ = await api()
+        session_id, answers = await start(client)
+        (first_question, first_answer), *rest = answers.items()
+
+        solved_twice = [(first_question, first_answer), (first_question, first_answer)]
+        assert (await check_batch(client, session_id, solved_twice)).status_code == 409
+
+        retried = [(first_question, first_answer + 1), (first_question, first_answer), *rest]
+        response = await check_batch(client, session_id, retried)
+        assert response.status_code == 200, response.text
+        assert [answer['is_correct'] for answer in response.json()['answers']] == [False, True, True, True]
+        assert response.json()['result']['success_percent'] == 66
+
+    asyncio.run(scenario())
+
+
+def test_oversized_batch_is_rejected(api):
+    async def scenario():
+        client, _ = await api()
+        session_id, answers = await start(client)
+        (question_id, answer_id), *_ = answers.items()
+
+        response = await check_batch(client, session_id, [(question_id, answer_id)] * (MAX_BATCH_ANSWERS + 1))
+        assert response.status_code == 422
+
+    asyncio.run(scenario())
+
+
+def test_lesson_is_completed_with_an_unknown_stored_timezone(api):
+    async def scenario():
+        client, engine = await api()
+        # stored before timezones were validated at login
+        async with AsyncSession(engine) as session:
+            await session.execute(update(UserModel).where(UserModel.user_id == 42).values(timezone='GMT+3'))
+            await session.commit()
+
+        session_id, completed = await complete(client, 1)
+        assert completed.status_code == 200, completed.text
+        assert (await client.get(f'/api/lessons/result/{session_id}', headers=HEADERS)).status_code == 200
+        assert (await client.get('/api/user/me', headers=HEADERS)).status_code == 200
+
+        login = await client.post('/api/user/auth', json={'user_id': 42, 'first_name': 'Test', 'timezone': 'GMT+3'})
+        assert login.status_code == 422
+
+    asyncio.run(scenario())
+
+
+def test_lesson_in_progress_survives_a_cache_schema_bump(api, monkeypatch):
+    async def scenario():
+        client, _ = await api()
+        session_id, answers = await start(client)
+        (first_question, first_answer), *rest = answers.items()
+        assert (await check(client, session_id, first_question, first_answer)).status_code == 200
+
+        monkeypatch.setattr('src.cache.keys.CACHE_NAMESPACE', 'v999')
+        responses = [await check(client, session_id, question_id, answer_id) for question_id, answer_id in rest]
+        assert responses[-1].status_code == 200, responses[-1].text
+        assert (await client.get(f'/api/lessons/result/{session_id}', headers=HEADERS)).status_code == 200
+
+        # the claim of the day is kept as well
+        _, completed = await complete(client, 2)
+        assert completed.status_code == 409
+
+    asyncio.run(scenario())
+
+
+def test_sessions_of_different_users_and_lessons_do_not_collide(fake_redis, database):
+    async def scenario():
+        sessions = await seeded_sessions(database)
+        async with sessions() as session:
+            session.add(LessonModel(lesson_id=12, title='Lesson 12', description='', language_id=1, questions=[
+                QuestionModel(question_text='Question', answers=[
+                    AnswerModel(answer_text=f'Answer {answer}', is_correct=int(answer == 0)) for answer in range(4)
+                ])
+            ]))
+            await session.commit()
+            service = LessonsService(LessonsRepository(session), fake_redis())
+            # lesson 12 of user 3 and lesson 1 of user 23
+            first = json.loads((await service.start_lesson(StartLessonRequest(user_id=3, lesson_id=12))).raw)
+            second = json.loads((await service.start_lesson(StartLessonRequest(user_id=23, lesson_id=1))).raw)
+            assert first['session_id'] != second['session_id']
+
+            question = first['questions'][0]
+            checked = await service.check_lesson_answer(CheckLessonAnswerRequest(
+                session_id=first['session_id'], question_id=question['question_id'],
+                answer_id=question['answers'][1]['answer_id']
+            ), 3)
+            assert checked.is_success
+
+    asyncio.run(scenario())
@@ -0,0 +1,76 @@
+import asyncio
+
+from fakeredis import FakeServer
+
+from src.cache import LocalCache, TaggedCache, local_lesson_cache, listen_for_invalidations
+from src.cache.lesson_cache import INVALIDATION_CHANNEL, clear_local_caches
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LocalCache(max_size=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('src.cache.local_cache.time.monotonic', lambda: now[0])
+    cache = LocalCache(max_size=10, ttl=5)
+    cache.set('a', 1, tags=('lesson:1',))
+
+    now[0] += 5
+    assert cache.get('a') == 1
+    now[0] += 0.1
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+    # the expired entry is no longer registered under its tag
+    cache.set('b', 2, tags=('lesson:2',))
+    cache.invalidate_tags(['lesson:1'])
+    assert cache.get('b') == 2
+
+
+def test_entries_are_dropped_by_tag():
+    cache = LocalCache(max_size=10, ttl=60)
+    cache.set('lesson-1', 1, tags=('lesson:1', 'catalog'))
+    cache.set('lesson-2', 2, tags=('lesson:2', 'catalog'))
+    cache.set('lesson-1', 1, tags=('lesson:1',))
+
+    cache.invalidate_tags(['catalog'])
+    assert cache.get('lesson-1') == 1
+    assert cache.get('lesson-2') is None
+
+
+def test_invalidation_of_another_worker_clears_the_local_entry(fake_redis, monkeypatch):
+    async def scenario():
+        server = FakeServer()
+        redis, other_worker = fake_redis(server=server), fake_redis(server=server)
+        clear_local_caches()
+        listener = asyncio.create_task(listen_for_invalidations(redis))
+        try:
+            while not dict(await other_worker.pubsub_numsub(INVALIDATION_CHANNEL)).get(INVALIDATION_CHANNEL):
+                await asyncio.sleep(0.01)
+            local_lesson_cache.set(1, {'lesson_id': 1}, ('lesson:1',))
+            local_lesson_cache.set(2, {'lesson_id': 2}, ('lesson:2',))
+
+            # the other worker runs in its own process, only the published message reaches this one
+            monkeypatch.setattr('src.cache.tagged_cache.invalidate_local_tags', lambda tags: None)
+            await TaggedCache(other_worker).invalidate('lesson:1')
+
+            for _ in range(100):
+                if local_lesson_cache.get(1) is None:
+                    break
+                await asyncio.sleep(0.01)
+            assert local_lesson_cache.get(1) is None
+            assert local_lesson_cache.get(2) == {'lesson_id': 2}
+        finally:
+            listener.cancel()
+            clear_local_caches()
+
+    asyncio.run(scenario())
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.metrics import Histogram, Registry, MetricsMiddleware, metrics_endpoint, record_dependency_call, SQL, REDIS
+
+
+def test_histograms_are_rendered_cumulatively():
+    registry = Registry()
+    histogram = Histogram('latency_seconds', 'Latency', ('route',), buckets=(0.1, 1), registry=registry)
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.labels('/a"b').observe(value)
+
+    assert registry.render().decode().splitlines()[2:] == [
+        'latency_seconds_bucket{route="/a\\"b",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a\\"b",le="1.0"} 3',
+        'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a\\"b"} 3.65',
+        'latency_seconds_count{route="/a\\"b"} 4',
+    ]
+
+
+def test_requests_are_labeled_by_route_template(monkeypatch):
+    monkeypatch.setattr('src.metrics.http.METRICS_TOKEN', 'scraper-token')
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.add_api_route('/metrics', metrics_endpoint)
+
+    @app.get('/items/{item_id}')
+    async def item(item_id: int):
+        await asyncio.sleep(0)
+        record_dependency_call(SQL, 0.001)
+        record_dependency_call(SQL, 0.001)
+        record_dependency_call(REDIS, 0.001)
+        return {'item_id': item_id}
+
+    async def scenario() -> str:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+            for item_id in (1, 2):
+                await client.get(f'/items/{item_id}')
+            await client.get('/missing/path')
+            return (await client.get('/metrics', headers={'Authorization': 'Bearer scraper-token'})).text
+
+    metrics = asyncio.run(scenario())
+    assert 'http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2' in metrics
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in metrics
+    assert 'http_request_dependency_calls_sum{route="/items/{item_id}",dependency="sql"} 4' in metrics
+    assert 'http_request_dependency_calls_sum{route="/items/{item_id}",dependency="redis"} 2' in metrics
+
+
+@pytest.mark.parametrize('token, authorization, status_code', [
+    (None, 'Bearer anything', 404),
+    ('scraper-token', None, 401),
+    ('scraper-token', 'Bearer other-token', 401),
+    ('scraper-token', 'Bearer scraper-token', 200),
+], ids=['not configured', 'anonymous', 'wrong token', 'scraper'])
+def test_metrics_are_served_to_the_scraper_only(monkeypatch, token, authorization, status_code):
+    monkeypatch.setattr('src.metrics.http.METRICS_TOKEN', token)
+    app = FastAPI()
+    app.add_api_route('/metrics', metrics_endpoint)
+
+    async def scenario() -> int:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+            headers = {'Authorization': authorization} if authorization else {}
+            return (await client.get('/metrics', headers=headers)).status_code
+
+    assert asyncio.run(scenario()) == status_code
@@ -0,0 +1,41 @@
+import asyncio
+
+from src.cache import UserProfileCache
+from src.repository import LessonsRepository, UserRepository
+from src.services.mappers import UserMapper
+from tests.helpers import seeded_sessions
+
+
+def test_fill_racing_a_progress_update_does_not_cache_a_stale_profile(fake_redis, database):
+    async def scenario():
+        sessions = await seeded_sessions(database)
+        cache = UserProfileCache(fake_redis())
+        loaded, resume = asyncio.Event(), asyncio.Event()
+
+        async def load(user_id):
+            async with sessions() as session:
+                return UserMapper.to_user_profile_cache(await UserRepository(session).get_user_by_id(user_id))
+
+        async def slow_load(user_id):
+            profile = await load(user_id)
+            loaded.set()
+            await resume.wait()
+            return profile
+
+        fill = asyncio.create_task(cache.get_or_load(42, slow_load))
+        await loaded.wait()
+
+        # a lesson is completed while the fill holds the profile read before it
+        async with sessions() as session:
+            user = await LessonsRepository(session).save_user_progress(user_id=42, lesson_id=1, xp_earned=50, success_percent=100)
+            await cache.update(42, **UserMapper.to_user_progress_cache(user))
+
+        resume.set()
+        assert (await fill)['xp'] == user.xp - 50
+        assert await cache.get(42) is None
+
+        profile = await cache.get_or_load(42, load)
+        assert profile['xp'] == user.xp and profile['last_lesson_date'] is not None
+        assert (await cache.get(42))['xp'] == user.xp
+
+    asyncio.run(scenario())
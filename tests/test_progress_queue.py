@@ -0,0 +1,85 @@
+import asyncio
+from contextlib import suppress
+from datetime import datetime, timezone
+
+from src.cache import legacy_progress_stream_keys, global_leaderboard_key
+from src.database.models import UserModel
+from src.services.leaderboards import Leaderboards
+from src.workers import RedisStreamProgressQueue, InMemoryProgressQueue, run_progress_writer
+from tests.helpers import seeded_sessions
+
+
+def completion(user_id: int = 42, lesson_id: int = 1) -> dict:
+    return {
+        'user_id': user_id,
+        'lesson_id': lesson_id,
+        'language_id': 1,
+        'xp_earned': 10,
+        'success_percent': 100,
+        'completed_at': datetime(2026, 1, 1, 12, tzinfo=timezone.utc),
+    }
+
+
+def test_stream_entries_of_older_releases_are_taken_over(fake_redis):
+    async def scenario():
+        redis = fake_redis()
+        legacy_stream = legacy_progress_stream_keys()[0]
+        await redis.xadd(legacy_stream, {**completion(), 'completed_at': completion()['completed_at'].isoformat()})
+
+        queue = RedisStreamProgressQueue(redis)
+        await queue.push(completion(lesson_id=2))
+        entries = await queue.read(10, 10)
+        assert sorted(item['lesson_id'] for _, item in entries) == [1, 2]
+        assert not await redis.exists(legacy_stream)
+
+        await queue.ack([entry_id for entry_id, _ in entries])
+        assert await queue.read(10, 10) == []
+
+    asyncio.run(scenario())
+
+
+def test_unacknowledged_items_are_delivered_again():
+    async def scenario():
+        queue = InMemoryProgressQueue()
+        await queue.push(completion(lesson_id=1))
+        await queue.push(completion(lesson_id=2))
+
+        entries = await queue.read(10, 10)
+        assert [item['lesson_id'] for _, item in entries] == [1, 2]
+        assert await queue.read(10, 10) == entries
+
+        await queue.ack([entries[0][0]])
+        assert await queue.read(10, 10) == entries[1:]
+        await queue.ack([entries[1][0]])
+        assert await queue.read(10, 10) == []
+
+    asyncio.run(scenario())
+
+
+def test_writer_saves_results_and_takes_back_rejected_xp(fake_redis, database):
+    async def scenario():
+        redis = fake_redis()
+        sessions = await seeded_sessions(database)
+        queue = InMemoryProgressQueue()
+        leaderboards = Leaderboards(redis)
+        # the second lesson of the day is rejected by the writer, its XP was credited when it was queued
+        for lesson_id in (1, 2):
+            await queue.push(completion(lesson_id=lesson_id))
+            await leaderboards.add_xp(42, 1, 10)
+
+        writer = asyncio.create_task(run_progress_writer(queue, sessions, redis, block_ms=10))
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if await redis.zscore(global_leaderboard_key(), 42) == 10:
+                break
+        writer.cancel()
+        with suppress(asyncio.CancelledError):
+            await writer
+
+        assert await redis.zscore(global_leaderboard_key(), 42) == 10
+        assert await queue.read(10, 10) == []
+        async with sessions() as session:
+            assert (await session.get(UserModel, 42)).xp == 10
+        await sessions.kw['bind'].dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from tests.helpers import auth_headers
+
+HEADERS = auth_headers(42)
+
+# Most SQL statements one request may run, caches empty. Raise a budget only together with the change that needs it.
+QUERY_BUDGETS = {
+    'start (cold)': (1, lambda client: client.post('/api/lessons/start', json={'user_id': 42, 'lesson_id': 1}, headers=HEADERS)),
+    'auth': (1, lambda client: client.post('/api/user/auth', json={'user_id': 42, 'first_name': 'Test'})),
+    'auth (new user)': (3, lambda client: client.post('/api/user/auth', json={'user_id': 43, 'first_name': 'New'})),
+    'actual-lesson': (2, lambda client: client.get('/api/lessons/actual-lesson/42', headers=HEADERS)),
+    'change-language': (2, lambda client: client.patch('/api/user/42/change-language', json={'language_id': 1}, headers=HEADERS)),
+}
+
+
+@pytest.mark.parametrize('budget, request_', QUERY_BUDGETS.values(), ids=QUERY_BUDGETS.keys())
+def test_endpoint_stays_within_query_budget(api, assert_max_queries, budget, request_):
+    async def scenario():
+        client, engine = await api()
+        with assert_max_queries(engine, budget):
+            response = await request_(client)
+        assert response.status_code == 200, response.text
+
+    asyncio.run(scenario())
+
+
+def test_warm_start_does_not_query(api, assert_max_queries):
+    async def scenario():
+        client, engine = await api()
+        await QUERY_BUDGETS['start (cold)'][1](client)
+        with assert_max_queries(engine, 0):
+            response = await QUERY_BUDGETS['start (cold)'][1](client)
+        assert response.status_code == 200
+
+    asyncio.run(scenario())
@@ -0,0 +1,30 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from src.repository import LessonsRepository, LessonRepository, UserRepository
+from tests.helpers import full_scans
+
+# Queries that run on every request of the lesson flow. None of them may fall back to a full table scan.
+HOT_QUERIES = {
+    'next lesson': lambda session: LessonsRepository(session).get_unfinished_lesson_with_tests(42, 1),
+    'lesson with questions (joined)': lambda session: LessonsRepository(session).get_lesson_by_id(1),
+    'lesson with questions (selectin)': lambda session: LessonRepository(session).get_lesson_by_id(1),
+    'save user progress': lambda session: LessonsRepository(session).save_user_progress(42, 1, 100, 100),
+    'save user progress batch': lambda session: LessonsRepository(session).save_user_progress_batch([{
+        'user_id': 42, 'lesson_id': 2, 'xp_earned': 100, 'success_percent': 100,
+        'completed_at': datetime.now(timezone.utc),
+    }]),
+    'lessons page': lambda session: LessonsRepository(session).get_lessons_page(cursor=1, limit=2),
+    'lessons page of a language': lambda session: LessonsRepository(session).get_lessons_page(1, cursor=1, limit=2),
+    'user by id': lambda session: UserRepository(session).get_user_by_id(42),
+}
+
+
+@pytest.mark.parametrize('action', HOT_QUERIES.values(), ids=HOT_QUERIES.keys())
+def test_hot_query_does_not_scan(explain, action):
+    plans = explain(action)
+
+    assert plans, 'no statements were captured'
+    scans = full_scans(plans)
+    assert not scans, 'full table scans:\n' + '\n'.join(scans)
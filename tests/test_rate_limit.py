@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Request
+
+from src.core.rate_limit import Bucket, RateLimiter, RouteLimits
+from tests.helpers import auth_headers
+
+
+def client_request(host: str = '10.0.0.1', headers: dict[str, str] | None = None) -> Request:
+    return Request({
+        'type': 'http',
+        'client': (host, 1234),
+        'headers': [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    })
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+def test_exhausted_user_is_rejected_before_any_query(api, assert_max_queries):
+    async def scenario():
+        client, engine = await api()
+        start = {'user_id': 42, 'lesson_id': 1}
+        for _ in range(5):
+            response = await client.post('/api/lessons/start', json=start, headers=auth_headers(42))
+            assert response.status_code == 200
+
+        with assert_max_queries(engine, 0):
+            response = await client.post('/api/lessons/start', json=start, headers=auth_headers(42))
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) >= 1
+
+        other_user = await client.post('/api/lessons/start', json={'user_id': 43, 'lesson_id': 1}, headers=auth_headers(43))
+        assert other_user.status_code != 429
+
+    asyncio.run(scenario())
+
+
+def test_bucket_refills_over_time(fake_redis, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr('src.core.rate_limit.time', clock)
+    monkeypatch.setattr('src.core.rate_limit.RATE_LIMITS_PER_IP', True)
+    limiter = RateLimiter('/test', RouteLimits(per_ip=Bucket(rate=1, burst=2)))
+
+    async def scenario():
+        redis = fake_redis()
+        await limiter(client_request(), redis)
+        await limiter(client_request(), redis)
+        with pytest.raises(HTTPException) as rejected:
+            await limiter(client_request(), redis)
+        assert rejected.value.status_code == 429
+        assert rejected.value.headers['Retry-After'] == '1'
+
+        await limiter(client_request('10.0.0.2'), redis)
+        clock.now += 1
+        await limiter(client_request(), redis)
+
+    asyncio.run(scenario())
+
+
+def test_rejected_request_takes_no_tokens(fake_redis, monkeypatch):
+    monkeypatch.setattr('src.core.rate_limit.time', FakeClock())
+    monkeypatch.setattr('src.core.rate_limit.RATE_LIMITS_PER_IP', True)
+    limiter = RateLimiter('/test', RouteLimits(per_user=Bucket(rate=1, burst=1), per_ip=Bucket(rate=1, burst=2)))
+
+    async def scenario():
+        redis = fake_redis()
+        await limiter(client_request(headers=auth_headers(42)), redis)
+        # the exhausted user bucket rejects the request, the IP bucket keeps its token for another user
+        with pytest.raises(HTTPException):
+            await limiter(client_request(headers=auth_headers(42)), redis)
+        await limiter(client_request(headers=auth_headers(43)), redis)
+
+    asyncio.run(scenario())
+
+
+def test_client_addresses_are_not_limited_by_default(fake_redis, monkeypatch):
+    monkeypatch.setattr('src.core.rate_limit.time', FakeClock())
+    limiter = RateLimiter('/test', RouteLimits(per_ip=Bucket(rate=1, burst=1)))
+
+    async def scenario():
+        redis = fake_redis()
+        # behind a reverse proxy every request comes from the proxy address
+        for _ in range(3):
+            await limiter(client_request(), redis)
+
+    asyncio.run(scenario())
+
+
+def test_requests_pass_while_redis_is_down(fake_redis, monkeypatch):
+    monkeypatch.setattr('src.core.rate_limit.RATE_LIMITS_PER_IP', True)
+    limiter = RateLimiter('/test', RouteLimits(per_ip=Bucket(rate=0.001, burst=1)))
+
+    async def scenario():
+        redis = fake_redis()
+        redis.set_latency(1)
+        for _ in range(3):
+            await limiter(client_request(), redis)
+
+    asyncio.run(scenario())
@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+import pytest
+
+from src.cache import CODECS, decode_value, lesson_key, lesson_result_key, session_key
+from src.cache.lesson_cache import clear_local_caches
+from src.repository import LessonsRepository
+from src.schemas.tests_schemas import StartLessonRequest
+from src.services import LessonsService
+from tests.helpers import seeded_sessions
+
+
+@pytest.mark.parametrize('name', CODECS)
+def test_values_of_every_codec_are_decoded(name):
+    value = {'lesson_id': 1, 'questions_json': '[{"text":"Question"}]', 'correct_answers': {1: 2}}
+    encoded = CODECS[name].encode(value)
+    stored = encoded.decode() if isinstance(encoded, bytes) else encoded
+
+    assert decode_value(stored) == json.loads(json.dumps(value))
+    with pytest.raises(ValueError):
+        decode_value(stored[:-1])
+
+
+def test_lessons_read_values_written_before_the_codecs(fake_redis, database):
+    async def scenario():
+        clear_local_caches()
+        sessions = await seeded_sessions(database)
+        redis = fake_redis()
+        lesson = {
+            'lesson_id': 1,
+            'language_id': 1,
+            'questions_json': '[{"text":"Legacy question","question_id":7,"answers":[]}]',
+            'correct_answers': {'7': 28},
+        }
+        await redis.set(lesson_key(1), json.dumps(lesson))
+        await redis.set(lesson_result_key('session'), json.dumps({'xp_earned': 50, 'success_percent': 50}))
+
+        async with sessions() as session:
+            service = LessonsService(LessonsRepository(session), redis)
+            result = await service.start_lesson(StartLessonRequest(user_id=42, lesson_id=1))
+            assert json.loads(result.raw)['questions'][0]['text'] == 'Legacy question'
+            assert await redis.hget(session_key('1:42'), 'q:7') == '28'
+
+            result = await service.get_lesson_result('session')
+            assert result.data.xp_earned == 50
+        clear_local_caches()
+
+    asyncio.run(scenario())
+
+
+def test_malformed_result_is_not_found(fake_redis, database):
+    async def scenario():
+        sessions = await seeded_sessions(database)
+        redis = fake_redis()
+        await redis.set(lesson_result_key('session'), 'o:{"xp_earned"')
+
+        async with sessions() as session:
+            result = await LessonsService(LessonsRepository(session), redis).get_lesson_result('session')
+            assert result.status_code == 404
+
+    asyncio.run(scenario())
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import time
+
+import pytest
+from redis.exceptions import ConnectionError, TimeoutError
+
+from src.cache import CircuitBreaker, CircuitOpenError, UserProfileCache, TaggedCache
+from src.repository import LessonsRepository, UserRepository, PLanguageRepository, QuestionRepository
+from src.schemas import QuestionCreate, QuestionAnswerCreate, CreateLanguageRequest
+from src.schemas.tests_schemas import StartLessonRequest, CheckLessonAnswerRequest, CheckLessonAnswersBatchRequest, \
+    LessonCreateRequest
+from src.services import LessonsService, UserService, QuestionService, PLanguageService
+from tests.helpers import seeded_sessions
+
+SLOW = 0.2  # well above the command timeout of the fake clients
+
+
+def test_breaker_opens_after_timeouts_and_fails_fast(fake_redis):
+    async def scenario():
+        redis = fake_redis()
+        await redis.set('key', 'value')
+        redis.set_latency(SLOW)
+
+        for _ in range(redis.breaker.failure_threshold):
+            with pytest.raises(TimeoutError):
+                await redis.get('key')
+        assert redis.breaker.state == CircuitBreaker.OPEN
+
+        start = time.perf_counter()
+        with pytest.raises(CircuitOpenError):
+            await redis.get('key')
+        assert time.perf_counter() - start < 0.01
+
+        redis.set_latency(0)
+        await asyncio.sleep(redis.breaker.reset_timeout)
+        assert redis.breaker.state == CircuitBreaker.HALF_OPEN
+        assert await redis.get('key') == 'value'
+        assert redis.breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_failed_trial_call_opens_the_circuit_again(fake_redis):
+    async def scenario():
+        redis = fake_redis()
+        redis.set_latency(SLOW)
+        for _ in range(redis.breaker.failure_threshold):
+            with pytest.raises(TimeoutError):
+                await redis.get('key')
+
+        await asyncio.sleep(redis.breaker.reset_timeout)
+        with pytest.raises(TimeoutError):
+            async with redis.pipeline() as pipe:
+                await pipe.get('key').execute()
+        assert redis.breaker.state == CircuitBreaker.OPEN
+
+    asyncio.run(scenario())
+
+
+def test_calls_started_before_the_circuit_opened_do_not_close_it():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05, command_timeout=1)
+
+    async def answer(delay: float):
+        await asyncio.sleep(delay)
+        return 'ok'
+
+    async def fail():
+        raise ConnectionError('Redis is down')
+
+    async def scenario():
+        late = asyncio.create_task(breaker.call(lambda: answer(0.2)))
+        await asyncio.sleep(0)
+        for _ in range(breaker.failure_threshold):
+            with pytest.raises(ConnectionError):
+                await breaker.call(fail)
+        assert breaker.state == CircuitBreaker.OPEN
+
+        await asyncio.sleep(breaker.reset_timeout)
+        trial = asyncio.create_task(breaker.call(lambda: answer(0.3)))
+        await asyncio.sleep(0)
+        assert await late == 'ok'
+        # neither closed by the late success nor letting a second trial through
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(lambda: answer(0))
+
+        assert await trial == 'ok'
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_profiles_are_loaded_from_the_database_while_redis_is_slow(fake_redis):
+    async def scenario():
+        redis = fake_redis()
+        redis.set_latency(SLOW)
+        profile = {'user_id': 42, 'first_name': 'Test'}
+
+        async def loader(user_id):
+            return profile
+
+        cache = UserProfileCache(redis)
+        assert await cache.get_or_load(42, loader) == profile
+        await cache.update(42, xp=10)
+
+    asyncio.run(scenario())
+
+
+def test_lessons_degrade_to_the_database_while_redis_is_down(fake_redis, database):
+    async def scenario():
+        sessions = await seeded_sessions(database)
+        redis = fake_redis()
+        redis.set_latency(SLOW)
+
+        async with sessions() as session:
+            for _ in range(redis.breaker.failure_threshold):
+                result = await UserService(UserRepository(session), PLanguageRepository(session), redis).get_user_by_id(42)
+                assert result.is_success and result.data.user.active_language.language_id == 1
+            assert redis.breaker.state == CircuitBreaker.OPEN
+
+            service = LessonsService(LessonsRepository(session), redis)
+            start = time.perf_counter()
+            result = await service.get_actual_lesson(42)
+            assert result.is_success and result.data.lesson_id == 1
+
+            result = await service.start_lesson(StartLessonRequest(user_id=42, lesson_id=1))
+            assert result.is_success
+            assert time.perf_counter() - start < 0.1
+            started = json.loads(result.raw)
+            session_id = started['session_id']
+            assert session_id.startswith('db')
+
+            *first, last = started['questions']
+            for question in first:
+                answer_id = next(answer['answer_id'] for answer in question['answers'] if answer['answer_text'] == 'Answer 0')
+                checked = await service.check_lesson_answer(
+                    CheckLessonAnswerRequest(session_id=session_id, question_id=question['question_id'], answer_id=answer_id), 42
+                )
+                assert checked.is_success and checked.data.is_correct
+            batch = await service.check_lesson_answers_batch(CheckLessonAnswersBatchRequest(
+                session_id=session_id,
+                # a wrong answer retried within the batch
+                answers=[{'question_id': last['question_id'], 'answer_id': answer['answer_id']}
+                         for answer in sorted(last['answers'], key=lambda answer: answer['answer_text'] == 'Answer 0')]
+            ), 42)
+            assert batch.is_success and batch.data.result is not None
+
+            result = await service.get_lesson_result(session_id, 42)
+            assert result.is_success and result.data.xp_earned == batch.data.result.xp_earned
+            assert (await service.get_lesson_result(session_id, 43)).status_code == 403
+            assert (await UserRepository(session).get_user_by_id(42)).xp >= result.data.xp_earned
+
+    asyncio.run(scenario())
+
+
+def test_content_is_created_when_the_cache_is_not_invalidated(fake_redis, database, monkeypatch):
+    async def failing_invalidate(self, *tags):
+        raise ConnectionError('Redis is down')
+
+    monkeypatch.setattr(TaggedCache, 'invalidate', failing_invalidate)
+
+    async def scenario():
+        sessions = await seeded_sessions(database)
+        async with sessions() as session:
+            created = await LessonsService(LessonsRepository(session), fake_redis()).create_lesson(
+                LessonCreateRequest(title='New', description='', language_id=1)
+            )
+            assert created.is_success, created.error
+
+            answers = [QuestionAnswerCreate(text=f'Answer {number}', is_correct=number == 0) for number in range(4)]
+            question = await QuestionService(QuestionRepository(session), fake_redis()).create_question(
+                QuestionCreate(text='Question', answers=answers, lesson_id=created.data.test_id)
+            )
+            assert question.is_success, question.error
+
+    asyncio.run(scenario())
+
+
+def test_language_is_added_when_the_catalog_is_not_invalidated(fake_redis, database, monkeypatch):
+    async def failing_invalidate(self, *tags):
+        raise ConnectionError('Redis is down')
+
+    monkeypatch.setattr(TaggedCache, 'invalidate', failing_invalidate)
+
+    async def scenario():
+        sessions = await seeded_sessions(database)
+        async with sessions() as session:
+            added = await PLanguageService(PLanguageRepository(session), fake_redis()).add_language(
+                CreateLanguageRequest(name='Go', description='', picture='', level='beginner', popularity=1)
+            )
+            assert added.is_success, added.error
+
+    asyncio.run(scenario())
@@ -0,0 +1,44 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from src.cache import streak_timezones_key
+from src.database.models import UserModel
+from src.repository import UserRepository
+from src.workers.streak_sweeper import sweep_lapsed_streaks
+from tests.helpers import seeded_sessions, count_queries
+
+
+def test_users_without_a_timezone_are_swept_as_utc(fake_redis, database):
+    async def scenario():
+        sessions = await seeded_sessions(database)
+        lapsed = datetime.now(timezone.utc) - timedelta(days=3)
+        async with sessions() as session:
+            user = await session.get(UserModel, 42)
+            user.streak, user.last_lesson_date = 5, lapsed
+            session.add(UserModel(user_id=43, first_name='No timezone', timezone='', streak=3, last_lesson_date=lapsed))
+            await session.commit()
+            assert await UserRepository(session).get_timezones() == ['UTC']
+
+        assert await sweep_lapsed_streaks(sessions, fake_redis()) == 2
+        async with sessions() as session:
+            assert [(await session.get(UserModel, user_id)).streak for user_id in (42, 43)] == [0, 0]
+
+    asyncio.run(scenario())
+
+
+def test_timezones_are_read_once_for_all_workers(fake_redis, database):
+    async def scenario():
+        sessions = await seeded_sessions(database)
+        redis = fake_redis()
+        await sweep_lapsed_streaks(sessions, redis)
+
+        with count_queries(sessions.kw['bind']) as statements:
+            await sweep_lapsed_streaks(sessions, redis)
+        assert not [statement for statement in statements if 'DISTINCT' in statement]
+
+        await redis.delete(streak_timezones_key())
+        with count_queries(sessions.kw['bind']) as statements:
+            await sweep_lapsed_streaks(sessions, redis)
+        assert [statement for statement in statements if 'DISTINCT' in statement]
+
+    asyncio.run(scenario())
@@ -0,0 +1,38 @@
+import asyncio
+
+from src.cache import TaggedCache
+from src.cache.keys import tag_key
+
+
+def test_invalidation_deletes_the_tagged_entries_only(fake_redis):
+    async def scenario():
+        redis = fake_redis()
+        cache = TaggedCache(redis)
+        await cache.set_many([
+            ('lesson-1', 'a', ('lesson:1', 'catalog')),
+            ('lesson-2', 'b', ('lesson:2', 'catalog')),
+            ('languages', 'c', ('language:1',)),
+        ], ex=60)
+
+        assert await cache.invalidate('lesson:1') == 1
+        assert await redis.get('lesson-1') is None
+        assert not await redis.exists(tag_key('lesson:1'))
+
+        assert await cache.invalidate('catalog') == 1
+        assert await redis.get('lesson-2') is None
+        assert await redis.get('languages') == 'c'
+        assert await cache.invalidate('catalog') == 0
+
+    asyncio.run(scenario())
+
+
+def test_large_tags_are_invalidated_in_batches(fake_redis):
+    async def scenario():
+        redis = fake_redis()
+        cache = TaggedCache(redis)
+        await cache.set_many([(f'page-{number}', 'x', ('catalog',)) for number in range(1200)], ex=60)
+
+        assert await cache.invalidate('catalog') == 1200
+        assert await redis.dbsize() == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,35 @@
+import asyncio
+
+from src.cache import global_leaderboard_key, lesson_key
+from src.config import warmup
+from src.repository import LessonsRepository
+from tests.helpers import seeded_sessions
+
+
+def test_warm_up_restores_lost_leaderboards(fake_redis, database, monkeypatch):
+    async def scenario():
+        sessions = await seeded_sessions(database)
+        monkeypatch.setattr(warmup, 'AsyncSessionLocal', sessions)
+        async with sessions() as session:
+            await LessonsRepository(session).save_user_progress(42, 1, 100, 100)
+        redis = fake_redis()
+
+        assert await warmup.warm_up_cache(redis)
+        assert await redis.exists(lesson_key(1))
+        assert await redis.zscore(global_leaderboard_key(), 42) == 100
+
+    asyncio.run(scenario())
+
+
+def test_every_release_warms_the_cache_up(fake_redis, database, monkeypatch):
+    async def scenario():
+        monkeypatch.setattr(warmup, 'AsyncSessionLocal', await seeded_sessions(database))
+        redis = fake_redis()
+        monkeypatch.setattr(warmup, 'RELEASE_ID', 'first')
+        assert await warmup.warm_up_cache(redis)
+        assert not await warmup.warm_up_cache(redis)
+
+        monkeypatch.setattr(warmup, 'RELEASE_ID', 'second')
+        assert await warmup.warm_up_cache(redis)
+
+    asyncio.run(scenario())